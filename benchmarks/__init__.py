@@ -0,0 +1 @@
+"""Benchmarks for the floor assistance tools."""
@@ -0,0 +1,75 @@
+"""
+Cold-start benchmark: time to import the tools and the agent in a fresh interpreter.
+
+Usage:
+    python -m benchmarks.bench_import --iterations 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each scenario runs in its own interpreter; the snippet prints a JSON result
+SCENARIOS = {
+    "import tools": "import tools",
+    "import tools.async_tools": "import tools.async_tools",
+    "import agent package": "importlib.import_module('searcher-agent')",
+    "agent package + root_agent": "importlib.import_module('searcher-agent').root_agent",
+}
+
+HEAVY_MODULES = ("google.cloud.bigquery", "google.adk", "http.server")
+
+_TEMPLATE = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_scenario(statement: str, iterations: int) -> Dict[str, object]:
+    """Import in iterations fresh interpreters and summarize the timings."""
+    code = _TEMPLATE.format(root=REPO_ROOT, statement=statement, heavy=HEAVY_MODULES)
+    timings: List[float] = []
+    loaded: List[str] = []
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    for _ in range(iterations):
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=REPO_ROOT, env=env
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        loaded = result["loaded"]
+    return {
+        "p50_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "heavy_modules": loaded,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    header = f"{'scenario':32} {'p50 ms':>9} {'min ms':>9} {'max ms':>9}  heavy modules loaded"
+    print(header)
+    print("-" * len(header))
+    for label, statement in SCENARIOS.items():
+        stats = run_scenario(statement, args.iterations)
+        print(
+            f"{label:32} {stats['p50_ms']:9.1f} {stats['min_ms']:9.1f} {stats['max_ms']:9.1f}  "
+            + (", ".join(stats["heavy_modules"]) or "-")
+        )
+
+
+if __name__ == "__main__":
+    main()
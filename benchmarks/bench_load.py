@@ -0,0 +1,236 @@
+"""
+End-to-end load test: replay recorded conversations against the agent with a stub model.
+
+The stub model answers each user message with the tool calls recorded for it
+in the corpus (one step per model response; calls within a step are issued
+together) and then the recorded reply. Every turn goes through the real ADK
+runner, tools and the local data backend, without calling Gemini or BigQuery.
+
+Usage:
+    python -m benchmarks.bench_load --concurrency 16 --conversations 200
+    python -m benchmarks.bench_load --concurrency 64 --model-latency-ms 300 --save load.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import statistics
+import time
+import warnings
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from tools.catalog_index import wait_for_catalog_index
+from tools.local_repository import LocalRepository
+from tools.output import estimate_tokens
+from tools.repository import set_repository
+from tools.settings import reset_settings
+
+from .bench_tools import percentile
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "data", "conversations.json")
+
+APP_NAME = "bench_load"
+
+
+def load_corpus(path: str) -> List[Dict[str, Any]]:
+    """
+    Read recorded conversations.
+
+    Each conversation has a store_id and turns; each turn has the user text,
+    the model's tool-call steps and its final reply.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def index_turns(conversations: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Map each user message to its recorded turn; the stub model looks turns up by text."""
+    turns: Dict[str, Dict[str, Any]] = {}
+    for conversation in conversations:
+        for turn in conversation["turns"]:
+            previous = turns.setdefault(turn["user"], turn)
+            if previous is not turn and previous != turn:
+                raise ValueError(f"User message recorded with different turns: {turn['user']!r}")
+    return turns
+
+
+def _position(contents: List[types.Content]) -> Tuple[str, int]:
+    """The latest user message and how many tool-call steps the model has taken since."""
+    step = 0
+    for content in reversed(contents):
+        parts = content.parts or []
+        if content.role == "model" and any(part.function_call for part in parts):
+            step += 1
+        elif content.role == "user" and any(part.text for part in parts):
+            return "".join(part.text or "" for part in parts), step
+    raise ValueError("No user message in the request")
+
+
+class ReplayLlm(BaseLlm):
+    """Deterministic model that replays the corpus' tool calls and replies."""
+
+    turns: Dict[str, Dict[str, Any]]
+    latency: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        user_text, step = _position(llm_request.contents)
+        turn = self.turns[user_text]
+        if step < len(turn["steps"]):
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=call["name"], args=call["args"]))
+                for call in turn["steps"][step]
+            ]
+        else:
+            parts = [types.Part(text=turn["reply"])]
+
+        # Report the prompt size a real model would be billed for
+        prompt = str(llm_request.config.system_instruction or "") + "".join(
+            str(part.to_json_dict()) for content in llm_request.contents for part in content.parts or []
+        )
+        yield LlmResponse(
+            content=types.Content(role="model", parts=parts),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=estimate_tokens(prompt), candidates_token_count=0, total_token_count=estimate_tokens(prompt)
+            ),
+        )
+
+
+async def run_conversation(runner: Runner, conversation: Dict[str, Any], user_id: str) -> List[Dict[str, Any]]:
+    """Play one conversation in a new session and measure each turn."""
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, state={"store_id": conversation["store_id"]}
+    )
+    results = []
+    for turn in conversation["turns"]:
+        message = types.Content(role="user", parts=[types.Part(text=turn["user"])])
+        tool_calls = errors = prompt_tokens = 0
+
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+            tool_calls += len(event.get_function_calls())
+            for response in event.get_function_responses():
+                if str((response.response or {}).get("result", "")).startswith("Error"):
+                    errors += 1
+            if event.usage_metadata is not None:
+                prompt_tokens += event.usage_metadata.prompt_token_count or 0
+        elapsed = time.perf_counter() - start
+
+        results.append({
+            "latency_ms": elapsed * 1000,
+            "tool_calls": tool_calls,
+            "errors": errors,
+            "prompt_tokens": prompt_tokens,
+        })
+    return results
+
+
+async def run_load(
+    runner: Runner, conversations: List[Dict[str, Any]], total: int, concurrency: int
+) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Replay total conversations (cycling through the corpus) with concurrency in flight.
+
+    Returns:
+        Tuple of (per-turn results, wall-clock seconds)
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+    results: List[Dict[str, Any]] = []
+
+    async def worker() -> None:
+        while True:
+            try:
+                i = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            results.extend(await run_conversation(runner, conversations[i % len(conversations)], f"user_{i}"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - start
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float, conversations: int) -> Dict[str, Any]:
+    """Throughput, turn latency percentiles and per-turn averages."""
+    latencies = [result["latency_ms"] for result in results]
+    return {
+        "conversations": conversations,
+        "turns": len(results),
+        "seconds": elapsed,
+        "turns_per_second": len(results) / elapsed,
+        "conversations_per_second": conversations / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "tool_calls_per_turn": statistics.mean(result["tool_calls"] for result in results),
+        "prompt_tokens_per_turn": statistics.mean(result["prompt_tokens"] for result in results),
+        "tool_errors": sum(result["errors"] for result in results),
+    }
+
+
+def build_runner(turns: Dict[str, Dict[str, Any]], latency: float, snapshot: Optional[str]) -> Runner:
+    """The real agent on the local backend, with its model replaced by ReplayLlm."""
+    agent_module = importlib.import_module("searcher-agent.agent")
+    os.environ["DATA_BACKEND"] = "local"
+    if snapshot:
+        os.environ["LOCAL_SNAPSHOT_PATH"] = snapshot
+    reset_settings()
+    set_repository(LocalRepository.from_env())
+
+    agent = agent_module.build_agent()
+    agent.model = ReplayLlm(model="replay", turns=turns, latency=latency)
+    return Runner(agent=agent, app_name=APP_NAME, session_service=InMemorySessionService())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="recorded conversations JSON")
+    parser.add_argument("--snapshot", help="LOCAL_SNAPSHOT_PATH for the data (defaults to the bundled seed)")
+    parser.add_argument("--concurrency", type=int, default=8, help="conversations in flight")
+    parser.add_argument("--conversations", type=int, default=100, help="conversations to replay in total")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="simulated latency per model call")
+    parser.add_argument("--save", help="write the summary as JSON to this path")
+    args = parser.parse_args()
+    # ADK warns about experimental features on every function declaration
+    warnings.filterwarnings("ignore", category=UserWarning, module=r"google\.adk")
+
+    conversations = load_corpus(args.corpus)
+    runner = build_runner(index_turns(conversations), args.model_latency_ms / 1000, args.snapshot)
+
+    # One untimed pass so imports, caches and the catalog index are warm
+    asyncio.run(run_load(runner, conversations, len(conversations), 1))
+    wait_for_catalog_index()
+    results, elapsed = asyncio.run(run_load(runner, conversations, args.conversations, args.concurrency))
+    summary = summarize(results, elapsed, args.conversations)
+
+    print(
+        f"{summary['conversations']} conversations, {summary['turns']} turns in {summary['seconds']:.2f}s "
+        f"at concurrency {args.concurrency}\n"
+    )
+    print(f"{'throughput':24} {summary['turns_per_second']:9.1f} turns/s  {summary['conversations_per_second']:9.1f} conversations/s")
+    print(f"{'turn latency':24} p50 {summary['p50_ms']:.1f} ms  p95 {summary['p95_ms']:.1f} ms  p99 {summary['p99_ms']:.1f} ms")
+    print(f"{'tool calls per turn':24} {summary['tool_calls_per_turn']:9.2f}")
+    print(f"{'prompt tokens per turn':24} {summary['prompt_tokens_per_turn']:9.0f}")
+    print(f"{'tool errors':24} {summary['tool_errors']:9d}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
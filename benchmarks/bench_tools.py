@@ -0,0 +1,204 @@
+"""
+Per-tool latency benchmark against a fake BigQuery client.
+
+Usage:
+    python -m benchmarks.bench_tools --size medium --iterations 50
+    python -m benchmarks.bench_tools --size large --save baseline.json
+    python -m benchmarks.bench_tools --size large --compare baseline.json --threshold 0.25
+    python -m benchmarks.bench_tools --iterations 200 --tail-latency-ms 500 --tail-fraction 0.02
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from tools import cache
+from tools.bigquery_client import set_client
+from tools.bigquery_repository import BigQueryRepository
+from tools.catalog_index import wait_for_catalog_index
+from tools.inventory_mirror import wait_for_inventory_mirror
+from tools.output import estimate_tokens
+from tools.repository import set_repository
+
+from .fake_bigquery import FakeBigQueryClient
+from .synthetic_catalog import generate_catalog
+
+SIZES = {
+    "small": (16, 8),
+    "medium": (1_000, 50),
+    "large": (10_000, 200),
+    "xlarge": (100_000, 500),
+}
+
+
+def tool_scenarios() -> List[Tuple[str, Callable[[], str]]]:
+    """The tool calls to benchmark, as (label, zero-argument callable) pairs."""
+    from tools import (
+        check_multiple_products_availability,
+        check_our_store_inventory,
+        check_product_availability,
+        filter_products,
+        find_products,
+        get_brands_and_products,
+        get_our_store_info,
+        get_product_categories,
+        list_store_ids,
+        search_products,
+    )
+    from tools.get_our_store_info import test_store_exists
+
+    return [
+        ("search_products", lambda: search_products("chair")),
+        ("find_products", lambda: find_products("kichen barstool")),
+        ("filter_products", lambda: filter_products(category="kitchen", color="black", max_price=500)),
+        ("check_our_store_inventory", lambda: check_our_store_inventory()),
+        ("check_our_store_inventory[filtered]", lambda: check_our_store_inventory("table", color="black")),
+        ("check_our_store_inventory[miss]", lambda: check_our_store_inventory("no such product")),
+        ("check_product_availability", lambda: check_product_availability("stool")),
+        ("check_multiple_products_availability", lambda: check_multiple_products_availability(["table", "chair", "bench"])),
+        ("list_store_ids", list_store_ids),
+        ("get_our_store_info", get_our_store_info),
+        ("test_store_exists", test_store_exists),
+        ("get_product_categories", get_product_categories),
+        ("get_brands_and_products", get_brands_and_products),
+    ]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_benchmark(client: FakeBigQueryClient, iterations: int, warm_cache: bool) -> Dict[str, Dict[str, Any]]:
+    """
+    Call every tool scenario repeatedly and collect per-call measurements.
+
+    Formatting time is the tool's wall time minus the time the fake client
+    spent executing queries, i.e. everything the tool does in Python.
+    """
+    results = {}
+    for label, call in tool_scenarios():
+        totals, formatting, queries, rows, output_sizes, output_tokens = [], [], [], [], [], []
+        for _ in range(iterations):
+            if not warm_cache:
+                cache.invalidate()
+            client.reset_stats()
+
+            start = time.perf_counter()
+            output = call()
+            elapsed = time.perf_counter() - start
+
+            if output.startswith("Error"):
+                raise RuntimeError(f"{label} failed: {output}")
+
+            totals.append(elapsed * 1000)
+            formatting.append(max(0.0, elapsed - client.backend_seconds) * 1000)
+            queries.append(client.queries)
+            rows.append(client.rows_fetched)
+            output_sizes.append(len(output))
+            output_tokens.append(estimate_tokens(output))
+
+        results[label] = {
+            "p50_ms": percentile(totals, 50),
+            "p95_ms": percentile(totals, 95),
+            "p99_ms": percentile(totals, 99),
+            "format_p50_ms": percentile(formatting, 50),
+            "format_p95_ms": percentile(formatting, 95),
+            "queries": statistics.mean(queries),
+            "rows_fetched": statistics.mean(rows),
+            "output_chars": statistics.mean(output_sizes),
+            "output_tokens": statistics.mean(output_tokens),
+        }
+    return results
+
+
+def print_report(results: Dict[str, Dict[str, Any]]) -> None:
+    """Print one aligned row per tool scenario."""
+    header = f"{'tool':40} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'fmt p50':>9} {'fmt p95':>9} {'queries':>8} {'rows':>9} {'chars':>9} {'tokens':>8}"
+    print(header)
+    print("-" * len(header))
+    for label, stats in results.items():
+        print(
+            f"{label:40} {stats['p50_ms']:9.3f} {stats['p95_ms']:9.3f} {stats['p99_ms']:9.3f} "
+            f"{stats['format_p50_ms']:9.3f} {stats['format_p95_ms']:9.3f} "
+            f"{stats['queries']:8.1f} {stats['rows_fetched']:9.1f} {stats['output_chars']:9.0f} {stats.get('output_tokens', 0):8.0f}"
+        )
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], threshold: float) -> List[str]:
+    """Return a description of every scenario whose p95 or query count regressed."""
+    regressions = []
+    for label, stats in results.items():
+        base = baseline.get(label)
+        if base is None:
+            continue
+        if stats["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            regressions.append(f"{label}: p95 {base['p95_ms']:.3f} ms -> {stats['p95_ms']:.3f} ms")
+        if stats["queries"] > base["queries"]:
+            regressions.append(f"{label}: queries {base['queries']:.1f} -> {stats['queries']:.1f}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", choices=SIZES, default="small", help="catalog preset (products x stores)")
+    parser.add_argument("--products", type=int, help="override number of products")
+    parser.add_argument("--stores", type=int, help="override number of stores")
+    parser.add_argument("--stores-per-product", type=int, default=4, help="stock rows per product")
+    parser.add_argument("--iterations", type=int, default=20, help="calls per tool")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="simulated per-query network latency")
+    parser.add_argument("--tail-latency-ms", type=float, default=0.0, help="extra time before a slow job finishes")
+    parser.add_argument("--tail-fraction", type=float, default=0.0, help="share of jobs that are slow (0..1)")
+    parser.add_argument("--warm-cache", action="store_true", help="keep tool caches between calls")
+    parser.add_argument("--save", help="write results as JSON to this path")
+    parser.add_argument("--compare", help="baseline JSON from --save to check against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative p95 regression")
+    args = parser.parse_args(argv)
+
+    num_products, num_stores = SIZES[args.size]
+    num_products = args.products or num_products
+    num_stores = args.stores or num_stores
+
+    setup_start = time.perf_counter()
+    snapshot = generate_catalog(num_products, num_stores, args.stores_per_product)
+    client = FakeBigQueryClient(
+        snapshot,
+        latency=args.latency_ms / 1000,
+        tail_latency=args.tail_latency_ms / 1000,
+        tail_fraction=args.tail_fraction,
+    )
+    set_client(client.project, client)
+    set_repository(BigQueryRepository(client.project, "bench"))
+    # The catalog index and inventory mirror are background-refreshed snapshots,
+    # so load them up front (INVENTORY_MIRROR=false benchmarks live queries)
+    wait_for_catalog_index()
+    wait_for_inventory_mirror()
+    print(
+        f"Catalog: {num_products} products x {num_stores} stores, {len(snapshot['stock'])} stock rows "
+        f"(setup {time.perf_counter() - setup_start:.1f}s), {args.iterations} iterations per tool\n"
+    )
+
+    results = run_benchmark(client, args.iterations, args.warm_cache)
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(f"  {line}" for line in regressions))
+            return 1
+        print("\nNo regressions against baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Deterministic stand-in for google.cloud.bigquery.Client.
+
+Queries issued by BigQueryRepository are executed against an in-memory
+SQLite copy of a synthetic catalog after rewriting the few BigQuery-only
+constructs the repository uses. The client counts queries, rows fetched
+and time spent "in BigQuery" so benchmarks can separate backend time from
+tool-side processing.
+"""
+import concurrent.futures
+import itertools
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from tools.local_repository import from_bigquery_sql, load_snapshot
+from tools.repository import Record
+
+_TABLE_REF = re.compile(r"`[\w-]+\.\w+\.(\w+)`")
+_IN_UNNEST = re.compile(r"IN UNNEST\(@(\w+)\)")
+_UNNEST_WITH_OFFSET = re.compile(r"UNNEST\(@(\w+)\) AS (\w+) WITH OFFSET AS (\w+)")
+_STRING_AGG_DISTINCT = re.compile(r"STRING_AGG\(DISTINCT ([\w.]+), '([^']*)'(?: ORDER BY [\w.]+)?\)")
+
+
+def to_sqlite(query: str) -> str:
+    """
+    Rewrite BigQuery SQL emitted by the repository into SQLite SQL.
+
+    Fully qualified table names become bare names, CONCAT becomes ||, and
+    UNNEST over an array parameter (passed as JSON) reads it through json_each,
+    and STRING_AGG(DISTINCT ...) becomes GROUP_CONCAT.
+    """
+    query = from_bigquery_sql(query)
+    query = _STRING_AGG_DISTINCT.sub(r"REPLACE(GROUP_CONCAT(DISTINCT \1), ',', '\2')", query)
+    query = _UNNEST_WITH_OFFSET.sub(r"(SELECT value AS \2, key AS \3 FROM json_each(@\1))", query)
+    return _IN_UNNEST.sub(r"IN (SELECT value FROM json_each(@\1))", query)
+
+
+def _parameters(job_config: Any) -> Dict[str, Any]:
+    """Extract named parameter values from a QueryJobConfig, arrays as JSON."""
+    params = {}
+    for param in getattr(job_config, "query_parameters", None) or []:
+        if hasattr(param, "values"):
+            params[param.name] = json.dumps(list(param.values))
+        else:
+            params[param.name] = param.value
+    return params
+
+
+class FakeRowIterator:
+    """Subset of bigquery.table.RowIterator used by the tools."""
+
+    def __init__(self, client: "FakeBigQueryClient", rows: List[Record], page_size: Optional[int] = None):
+        self._client = client
+        self._rows = rows
+        self._page_size = page_size or max(len(rows), 1)
+        self.total_rows = len(rows)
+
+    def __iter__(self) -> Iterator[Record]:
+        for row in self._rows:
+            self._client._count_rows(1)
+            yield row
+
+    @property
+    def pages(self) -> Iterator[List[Record]]:
+        for start in range(0, len(self._rows), self._page_size):
+            page = self._rows[start:start + self._page_size]
+            self._client._count_rows(len(page))
+            yield page
+
+    def to_arrow(self, create_bqstorage_client: bool = True, **kwargs) -> Any:
+        """
+        The rows as a pyarrow.Table.
+
+        Building it counts as backend time: BigQuery sends Arrow record
+        batches, so the client does no per-row work.
+        """
+        import pyarrow
+
+        start = time.perf_counter()
+        table = pyarrow.Table.from_pylist(self._rows)
+        self._client.backend_seconds += time.perf_counter() - start
+        self._client._count_rows(len(self._rows))
+        return table
+
+
+class FakeQueryJob:
+    """
+    Subset of bigquery.QueryJob used by the tools.
+
+    A job with a delay only finishes that many seconds after it was created,
+    and a job with an error raises it from result(), like a failed BigQuery job.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        client: "FakeBigQueryClient",
+        query: str,
+        rows: List[Record],
+        elapsed: float,
+        delay: float = 0.0,
+        error: Optional[Exception] = None,
+    ):
+        self._client = client
+        self._rows = rows
+        self._ready_at = time.monotonic() + delay
+        self._error = error
+        self.query = query
+        self.job_id = f"fake_job_{next(self._ids)}"
+        self.cache_hit = False
+        self.cancelled = False
+        self.error_result = {"reason": "backendError", "message": str(error)} if error is not None else None
+        self.slot_millis = int(elapsed * 1000)
+        self.total_bytes_processed = sum(len(str(value)) for row in rows for value in row.values())
+        self.total_bytes_billed = self.total_bytes_processed
+
+    @property
+    def state(self) -> str:
+        return "DONE" if self.done() else "RUNNING"
+
+    def done(self, *args, **kwargs) -> bool:
+        return self.cancelled or time.monotonic() >= self._ready_at
+
+    def cancel(self) -> bool:
+        self.cancelled = True
+        return True
+
+    def result(
+        self,
+        timeout: Optional[float] = None,
+        page_size: Optional[int] = None,
+        max_results: Optional[int] = None,
+        start_index: Optional[int] = None,
+        **kwargs,
+    ) -> FakeRowIterator:
+        wait = 0.0 if self.done() else self._ready_at - time.monotonic()
+        if timeout is not None and wait > timeout:
+            time.sleep(timeout)
+            self._client.backend_seconds += timeout
+            raise concurrent.futures.TimeoutError(f"{self.job_id} still running after {timeout:.2f}s")
+        if wait > 0:
+            time.sleep(wait)
+            self._client.backend_seconds += wait
+        if self._error is not None:
+            raise self._error
+        rows = self._rows[start_index or 0:]
+        if max_results is not None:
+            rows = rows[:max_results]
+        return FakeRowIterator(self._client, rows, page_size)
+
+
+class FakeBigQueryClient:
+    """
+    Executes repository queries against a synthetic catalog.
+
+    Args:
+        snapshot: Catalog in the LocalRepository snapshot format
+        latency: Extra seconds added to every query to model network/queueing time
+        tail_latency: Extra seconds before a slow job finishes
+        tail_fraction: Share of jobs that are slow (0..1)
+        failure_rate: Share of jobs that fail with 503 Service Unavailable (0..1)
+        seed: Seed for picking slow and failing jobs, so runs are repeatable
+    """
+
+    def __init__(
+        self,
+        snapshot: Dict[str, List[Dict[str, Any]]],
+        latency: float = 0.0,
+        project: str = "bench-project",
+        tail_latency: float = 0.0,
+        tail_fraction: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.project = project
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_fraction = tail_fraction
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        load_snapshot(self._conn, snapshot)
+        # Dry runs estimate a full scan of every referenced table
+        self._table_bytes = {
+            table: sum(len(str(value)) for row in rows for value in row.values())
+            for table, rows in snapshot.items()
+        }
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the query, row and backend-time counters."""
+        self.queries = 0
+        self.dry_runs = 0
+        self.rows_fetched = 0
+        self.backend_seconds = 0.0
+
+    def _count_rows(self, count: int) -> None:
+        self.rows_fetched += count
+
+    def query(self, query: str, job_config: Any = None, **kwargs) -> FakeQueryJob:
+        if getattr(job_config, "dry_run", False):
+            self.dry_runs += 1
+            job = FakeQueryJob(self, query, [], 0.0)
+            job.total_bytes_processed = sum(self._table_bytes.get(table, 0) for table in set(_TABLE_REF.findall(query)))
+            return job
+
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            cursor = self._conn.execute(to_sqlite(query), _parameters(job_config))
+            rows = [Record(zip(row.keys(), row)) for row in cursor.fetchall()]
+        elapsed = time.perf_counter() - start
+
+        self.queries += 1
+        self.backend_seconds += elapsed
+        delay = self.tail_latency if self._random.random() < self.tail_fraction else 0.0
+        error = None
+        if self._random.random() < self.failure_rate:
+            from google.api_core.exceptions import ServiceUnavailable
+            error = ServiceUnavailable("backend error (injected by FakeBigQueryClient)")
+        return FakeQueryJob(self, query, rows, elapsed, delay, error)
+
+    def close(self) -> None:
+        self._conn.close()
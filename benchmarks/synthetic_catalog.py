@@ -0,0 +1,93 @@
+"""Deterministic synthetic catalogs in the LocalRepository snapshot format."""
+import random
+from typing import Any, Dict, List
+
+CATEGORIES = {
+    "Kitchen": ["Chairs", "Tables", "Stools", "Storage"],
+    "Bedroom": ["Beds", "Dressers", "Nightstands", "Storage"],
+    "Living Room": ["Sofas", "Tables", "Chairs", "Storage"],
+    "Office": ["Chairs", "Desks", "Storage"],
+}
+NOUNS = {
+    "Chairs": "Chair", "Tables": "Table", "Stools": "Bar Stool", "Storage": "Cabinet",
+    "Beds": "Bed", "Dressers": "Dresser", "Nightstands": "Nightstand", "Sofas": "Sofa",
+    "Desks": "Desk",
+}
+ADJECTIVES = ["Modern", "Classic", "Industrial", "Rustic", "Compact", "Deluxe", "Nordic", "Vintage"]
+MATERIALS = ["Oak", "Pine", "Walnut", "Steel", "Aluminum", "Leather", "Fabric", "Velvet", "Glass", "Marble"]
+COLORS = ["Black", "White", "Gray", "Natural", "Walnut", "Navy", "Green", "Brown"]
+BRANDS = ["NordHaus", "Oakline", "Forge & Co", "SpaceWise", "Casa Marmo", "WorkWell", "Luminar", "DreamWorks"]
+CITIES = [("New York", "NY", "100"), ("Brooklyn", "NY", "112"), ("Bronx", "NY", "104"), ("Jersey City", "NJ", "073")]
+STORE_TYPES = ["retail", "showroom", "warehouse", "outlet"]
+
+
+def generate_catalog(
+    num_products: int = 16,
+    num_stores: int = 8,
+    stores_per_product: int = 4,
+    seed: int = 42,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate stores, products and stock rows.
+
+    Args:
+        num_products: Number of products in the catalog
+        num_stores: Number of stores
+        stores_per_product: How many stores stock each product (capped at num_stores)
+        seed: Random seed, so the same arguments always produce the same catalog
+
+    Returns:
+        Dict with "stores", "products" and "stock" row lists
+    """
+    rng = random.Random(seed)
+
+    stores = []
+    for i in range(1, num_stores + 1):
+        city, state, zip_prefix = CITIES[i % len(CITIES)]
+        stores.append({
+            "store_id": f"STORE_{i:03d}",
+            "store_name": f"{city} Furniture {i}",
+            "address": f"{100 + i} Main St",
+            "city": city,
+            "state": state,
+            "zip_code": f"{zip_prefix}{i % 100:02d}",
+            "phone": f"(212) 555-{i % 10000:04d}",
+            "manager": f"Manager {i}",
+            "store_type": STORE_TYPES[i % len(STORE_TYPES)],
+        })
+
+    products = []
+    category_names = list(CATEGORIES)
+    for i in range(1, num_products + 1):
+        category = category_names[i % len(category_names)]
+        subcategory = rng.choice(CATEGORIES[category])
+        materials = rng.sample(MATERIALS, 2)
+        colors = rng.sample(COLORS, 3)
+        products.append({
+            "product_id": f"PROD_{i:06d}",
+            "product_name": f"{rng.choice(ADJECTIVES)} {category} {NOUNS[subcategory]} {i}",
+            "category": category,
+            "subcategory": subcategory,
+            "brand": rng.choice(BRANDS),
+            "description": f"{rng.choice(ADJECTIVES)} {NOUNS[subcategory].lower()} in {materials[0].lower()}",
+            "base_price": round(rng.uniform(49, 1999), 2),
+            "materials": ", ".join(materials),
+            "colors_available": ", ".join(colors),
+            "warranty_months": rng.choice([12, 24, 36, 60]),
+        })
+
+    stock = []
+    stores_per_product = min(stores_per_product, num_stores)
+    for product in products:
+        colors = product["colors_available"].split(", ")
+        for store in rng.sample(stores, stores_per_product):
+            stock.append({
+                "store_id": store["store_id"],
+                "product_id": product["product_id"],
+                "color": rng.choice(colors),
+                "available_quantity": rng.choice([0, 1, 2, 5, 10, 20]),
+                "location_in_store": f"Aisle {rng.choice('ABCDEF')}-{rng.randint(1, 9)}",
+                "last_updated": "2025-01-01T00:00:00",
+            })
+
+    return {"stores": stores, "products": products, "stock": stock}
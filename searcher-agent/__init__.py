@@ -1,15 +1,17 @@
 import os
 
-from dotenv import load_dotenv
+from tools.settings import load_settings
 
-load_dotenv()
+# Load .env once for the whole process; the agent's own .env takes precedence
+load_settings(env_file=os.path.join(os.path.dirname(__file__), ".env"))
 
-agent_env_path = os.path.join(os.path.dirname(__file__), ".env")
-if os.path.exists(agent_env_path):
-    load_dotenv(dotenv_path=agent_env_path, override=True)
 
-
-from .agent import root_agent
+def __getattr__(name: str):
+    """Expose root_agent without building it at import time."""
+    if name == "root_agent":
+        from .agent import root_agent
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ["root_agent"]
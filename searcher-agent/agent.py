@@ -1,50 +1,126 @@
 """Floor assistance agent for furniture store with BigQuery database access."""
-import os
-from dotenv import load_dotenv
-from google.adk import Agent
-from tools.check_our_store_inventory import check_our_store_inventory
-from tools.check_product_availability import check_product_availability
-from tools.list_store_ids import list_store_ids
-from tools.search_products import search_products
-from tools.get_our_store_info import get_our_store_info, test_store_exists
-from tools.get_product_categories import get_product_categories
-from tools.get_brands_and_products import get_brands_and_products
-load_dotenv()
-
-def get_analysis_prompt() -> str:
-    """Get the instruction prompt for the agent."""
-    return """You are a furniture store floor assistant with access to inventory data across all stores.
-
-You are currently working at STORE_001 (Downtown Kitchen Gallery). When customers say "at our store", "our store", "this store", or "here", they are referring to STORE_001.
+import logging
+import threading
+from typing import Any, Optional
+
+from tools.async_tools import (
+    check_multiple_products_availability,
+    check_our_store_inventory,
+    check_product_availability,
+    filter_products,
+    find_products,
+    get_brands_and_products,
+    get_our_store_info,
+    get_product_categories,
+    list_store_ids,
+    make_async,
+    search_products,
+    test_store_exists,
+)
+from tools.instrumentation import start_metrics_server
+from tools.agent_context import agent_context, warm_agent_context
+from tools.settings import get_settings
+from tools.store_context import bind_session_store, session_store_id, store_details
+from tools.yaml_tools import load_yaml_tools
+
+logger = logging.getLogger(__name__)
+
+_store_details = make_async(store_details)
+_agent_context = make_async(agent_context)
+
+
+def get_analysis_prompt(store_id: str, store_name: Optional[str] = None, context: Optional[str] = None) -> str:
+    """Get the instruction prompt for the agent working at store_id, with optional reference data."""
+    our_store = f"{store_id} ({store_name})" if store_name else store_id
+    prompt = f"""You are a furniture store floor assistant with access to inventory data across all stores.
+
+You are currently working at {our_store}. When customers say "at our store", "our store", "this store", or "here", they are referring to {store_id}.
 
 Key context:
-- Our store = STORE_001 (Downtown Kitchen Gallery)
+- Our store = {our_store}
 - Use check_our_store_inventory() when customers ask about products "at our store" or "here"
-- When products aren't available at our store, suggest alternatives from other locations
+- Use find_products() for descriptive or misspelled requests; it ranks matches and tolerates typos
+- Use filter_products() when a request names a price range, category, brand, color, material or store (e.g. "dining tables under $500"); it applies all of them in one lookup, so there is no need to list the whole catalog and filter it yourself
+- Use check_multiple_products_availability() when a customer asks about several products at once
+- When products aren't available at our store, suggest alternatives from other locations; check_our_store_inventory() already lists them nearest first with their distance, so there is no need to look up store locations
 - Always be helpful and provide complete information about product availability
 
 Help customers find products and check availability across all store locations."""
+    if context:
+        prompt += f"""
+
+Answer questions about our store's details, other store locations and the product categories from the reference data below without calling get_our_store_info, list_store_ids or get_product_categories. Always use the tools for stock and availability.
 
+{context}"""
+    return prompt
 
-def build_agent() -> Agent:
+
+async def session_instruction(context: Any) -> str:
+    """Instruction provider: the prompt for the store in the session's state (STORE_ID by default)."""
+    store_id = session_store_id(context.state)
+    try:
+        row = await _store_details(store_id)
+    except Exception:
+        logger.warning("Could not look up store %s for the prompt", store_id, exc_info=True)
+        row = None
+
+    reference = None
+    if get_settings().agent_context:
+        try:
+            reference = await _agent_context(store_id)
+        except Exception:
+            logger.warning("Reference data unavailable; the prompt goes without it", exc_info=True)
+    return get_analysis_prompt(store_id, row.store_name if row is not None else None, reference)
+
+
+def build_agent():
     """Factory for the autoloader in main.py."""
-    model = os.getenv("ROOT_AGENT_MODEL", "gemini-2.0-flash")
+    # ADK pulls in google.genai and friends; import it only when the agent is built
+    from google.adk import Agent
+
+    settings = get_settings()
+    start_metrics_server()
+    if settings.agent_context:
+        # Load the reference data in the background so the first prompt finds it ready
+        threading.Thread(target=warm_agent_context, name="agent-context-warm", daemon=True).start()
+    tools = [
+        check_our_store_inventory,
+        find_products,
+        filter_products,
+        search_products,
+        check_product_availability,
+        check_multiple_products_availability,
+        list_store_ids,
+        get_our_store_info,
+        test_store_exists,
+        get_product_categories,
+        get_brands_and_products,
+    ]
+    if settings.yaml_tools:
+        # tools.yaml entries that have no hand-written equivalent
+        existing = {tool.__name__ for tool in tools}
+        tools += [make_async(tool) for tool in load_yaml_tools(exclude=existing)]
     return Agent(
-        name=os.getenv("AGENT_NAME", "searcher_agent"),
-        model=model,
-        tools=[
-            check_our_store_inventory,
-            search_products,
-            check_product_availability,
-            list_store_ids,
-            get_our_store_info,
-            test_store_exists,
-            get_product_categories,
-            get_brands_and_products,
-        ],
-        instruction=get_analysis_prompt(),
+        name=settings.agent_name,
+        model=settings.root_agent_model,
+        tools=tools,
+        instruction=session_instruction,
+        # Tools answer for the session's store; see tools.store_context
+        before_tool_callback=bind_session_store,
     )
 
 
-# Expose both patterns the autoloader might look for
-root_agent = build_agent()
+_root_agent = None
+_root_agent_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    """Build root_agent on first access instead of at import time."""
+    global _root_agent
+    if name != "root_agent":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _root_agent is None:
+        with _root_agent_lock:
+            if _root_agent is None:
+                _root_agent = build_agent()
+    return _root_agent
@@ -0,0 +1,11 @@
+"""Shared fixtures: every test sees settings rebuilt from its own environment."""
+import pytest
+
+from tools.settings import reset_settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_settings():
+    reset_settings()
+    yield
+    reset_settings()
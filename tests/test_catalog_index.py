@@ -0,0 +1,58 @@
+"""Substring and keyword lookups of the in-process catalog index."""
+from tools import catalog_index
+from tools.catalog_index import CatalogIndex
+from tools.repository import Record
+from tools.settings import reset_settings
+
+PRODUCTS = [
+    Record(product_id="P1", product_name="Modern Comfort Kitchen Chair", description="Padded seat",
+           materials="Oak, Fabric", colors_available="Black"),
+    Record(product_id="P2", product_name="Industrial Bar Stool", description="Counter height",
+           materials="Steel", colors_available=None),
+    Record(product_id="P3", product_name="Ergonomic Office Chair", description="Desk chair",
+           materials="Mesh", colors_available="Gray"),
+]
+STOCK = [
+    Record(product_id="P2", store_id="S1", color="Teal"),
+    Record(product_id="P2", store_id="S2", color=None),
+]
+
+
+def test_substring_matches_like_case_insensitively():
+    index = CatalogIndex(PRODUCTS, STOCK)
+    assert index.substring("CHAIR") == {"P1", "P3"}
+    assert index.substring("en ch") == {"P1"}
+    assert index.substring("sofa") == set()
+
+
+def test_short_substrings_scan_every_value():
+    index = CatalogIndex(PRODUCTS, STOCK)
+    assert index.substring("ba") == {"P2"}
+
+
+def test_stock_colors_are_indexed_with_the_product():
+    index = CatalogIndex(PRODUCTS, STOCK)
+    assert index.substring("teal", field="colors") == {"P2"}
+
+
+def test_keywords_need_every_token_in_some_field():
+    index = CatalogIndex(PRODUCTS, STOCK)
+    assert index.keywords("oak chair") == {"P1"}
+    assert index.keywords("chair steel") == set()
+
+
+def test_match_product_ids_falls_back_above_the_id_limit(monkeypatch):
+    monkeypatch.setattr(catalog_index, "_index", CatalogIndex(PRODUCTS, STOCK))
+    monkeypatch.setattr(catalog_index, "_refresher", object())
+    assert catalog_index.match_product_ids("chair") == ["P1", "P3"]
+    assert catalog_index.match_product_ids(None) is None
+
+    monkeypatch.setenv("CATALOG_INDEX_MAX_IDS", "1")
+    reset_settings()
+    assert catalog_index.match_product_ids("chair") is None
+
+
+def test_no_index_means_remote_search(monkeypatch):
+    monkeypatch.setattr(catalog_index, "_index", None)
+    monkeypatch.setattr(catalog_index, "_refresher", object())
+    assert catalog_index.match_product_ids("chair") is None
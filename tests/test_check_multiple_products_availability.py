@@ -0,0 +1,63 @@
+"""Grouping and output limits of the batched availability tool."""
+import importlib
+
+import pytest
+
+from tools import catalog_index
+from tools.catalog_index import CatalogIndex
+from tools.local_repository import LocalRepository
+from tools.repository import LimitedRows, set_repository
+
+tool_module = importlib.import_module("tools.check_multiple_products_availability")
+
+SNAPSHOT = {
+    "stores": [{"store_id": f"S{i}", "store_name": f"Store {i}"} for i in range(1, 4)],
+    "products": [
+        {"product_id": "P1", "product_name": "Kitchen Chair", "base_price": 149.99},
+        {"product_id": "P2", "product_name": "Office Chair", "base_price": 329.0},
+        {"product_id": "P3", "product_name": "Dining Table", "base_price": 899.0},
+    ],
+    "stock": [
+        {"store_id": f"S{i}", "product_id": product_id, "color": "Black", "available_quantity": 4}
+        for i in range(1, 4) for product_id in ("P1", "P2")
+    ],
+}
+
+
+@pytest.fixture(params=["index", "remote"])
+def repository(request, monkeypatch):
+    repository = LocalRepository(SNAPSHOT)
+    set_repository(repository)
+    index = CatalogIndex(repository.fetch_table("products"), []) if request.param == "index" else None
+    monkeypatch.setattr(catalog_index, "_index", index)
+    monkeypatch.setattr(catalog_index, "_refresher", object())
+    yield repository
+    set_repository(None)
+
+
+def test_rows_are_grouped_per_requested_name(repository):
+    grouped = tool_module._fetch_grouped(["kitchen chair", "chair", "sofa"], None)
+    assert [sorted({row.product_id for row in group}) for group in grouped] == [["P1"], ["P1", "P2"], []]
+
+
+def test_store_filter_applies_to_every_name(repository):
+    grouped = tool_module._fetch_grouped(["kitchen chair", "office chair"], "S2")
+    assert [{row.store_id for row in group} for group in grouped] == [{"S2"}, {"S2"}]
+
+
+def test_text_output_caps_rows_per_product(repository, monkeypatch):
+    monkeypatch.setenv("TOOL_PAGE_SIZE", "2")
+    output = tool_module.check_multiple_products_availability(["chair", "dining table"])
+    assert output.count("• Store") == 2
+    assert "...and 4 more rows; check 'chair' on its own" in output
+    assert "**dining table**: No available stock found" in output
+
+
+def test_names_missing_from_a_cut_short_lookup_are_not_checked(repository, monkeypatch):
+    def limited(names, store_id):
+        return LimitedRows([[] for _ in names], 100)
+
+    monkeypatch.setattr(tool_module, "_fetch_grouped", limited)
+    output = tool_module.check_multiple_products_availability(["chair"])
+    assert "**chair**: Not checked" in output
+    assert "No available stock found" not in output
@@ -0,0 +1,151 @@
+"""Which tool calls are coalesced, and how waiting calls are released."""
+import threading
+import time
+
+import pytest
+
+from tools.coalesce import coalesced, normalize
+from tools.instrumentation import instrumented
+from tools.store_context import store_scope
+
+
+def test_normalize_ignores_case_and_spacing():
+    assert normalize("  Kitchen   CHAIR ") == normalize("kitchen chair")
+    assert normalize(["A", "b"]) == normalize(("a", "B"))
+    assert normalize(["a", "b"]) != normalize(["b", "a"])
+    assert normalize({"x": "Oak "}) == normalize({"x": "oak"})
+    assert normalize(3) == 3
+
+
+class Gate:
+    """A tool whose first call blocks until released, counting its executions."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = []
+
+        @coalesced
+        def tool(product_name: str, store_id=None, cursor=None):
+            self.calls.append((product_name, cursor))
+            self.started.set()
+            self.release.wait(5)
+            return f"{product_name}|{cursor}"
+
+        self.tool = tool
+
+    def in_thread(self, *args, store=None, **kwargs):
+        result = {}
+
+        def run():
+            with store_scope(store):
+                result["value"] = self.tool(*args, **kwargs)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread, result
+
+
+def wait_for_waiters():
+    time.sleep(0.05)
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    gate = Gate()
+    leader, first = gate.in_thread("Chair")
+    gate.started.wait(5)
+    follower, second = gate.in_thread("  chair ")
+    wait_for_waiters()
+    gate.release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert gate.calls == [("Chair", None)]
+    assert first["value"] == second["value"] == "Chair|None"
+
+
+@pytest.mark.parametrize("kwargs, store", [
+    ({"product_name": "table", "cursor": "abc"}, None),
+    ({"product_name": "chair", "store_id": "STORE_002", "cursor": "abc"}, None),
+    # Cursors are opaque, so case matters
+    ({"product_name": "chair", "cursor": "aBc"}, None),
+    ({"product_name": "chair", "cursor": "abc"}, "STORE_009"),
+])
+def test_different_calls_run_separately(kwargs, store):
+    gate = Gate()
+    leader, _ = gate.in_thread("chair", cursor="abc")
+    gate.started.wait(5)
+    other, _ = gate.in_thread(store=store, **kwargs)
+    wait_for_waiters()
+    gate.release.set()
+    leader.join(5)
+    other.join(5)
+
+    assert len(gate.calls) == 2
+
+
+def test_followers_receive_the_leaders_exception():
+    release = threading.Event()
+    calls = []
+
+    @coalesced
+    def failing(name: str):
+        calls.append(name)
+        release.wait(5)
+        raise RuntimeError("backend down")
+
+    errors = []
+
+    def run():
+        try:
+            failing("x")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+        wait_for_waiters()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ["x"]
+    assert errors == ["backend down"] * 3
+
+
+def test_follower_stops_waiting_at_its_deadline(monkeypatch):
+    monkeypatch.setenv("TOOL_DEADLINE_SECONDS", "0.2")
+    release = threading.Event()
+    calls = []
+
+    @instrumented
+    @coalesced
+    def hanging(name: str) -> str:
+        calls.append(name)
+        if len(calls) == 1:
+            release.wait(5)
+        return f"done {len(calls)}"
+
+    leader = threading.Thread(target=hanging, args=("x",))
+    leader.start()
+    wait_for_waiters()
+    started = time.monotonic()
+    assert hanging("x") == "done 2"
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join(5)
+
+
+def test_disabled_coalescing_always_runs(monkeypatch):
+    monkeypatch.setenv("TOOL_COALESCING", "false")
+    gate = Gate()
+    leader, _ = gate.in_thread("chair")
+    gate.started.wait(5)
+    other, _ = gate.in_thread("chair")
+    wait_for_waiters()
+    gate.release.set()
+    leader.join(5)
+    other.join(5)
+
+    assert len(gate.calls) == 2
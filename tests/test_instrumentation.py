@@ -0,0 +1,23 @@
+"""Smoke tests for the Prometheus metrics endpoint."""
+import urllib.request
+
+from tools.instrumentation import render_metrics, start_metrics_server
+
+
+def test_metrics_server_serves_metrics():
+    server = start_metrics_server(port=0)
+    assert server is not None
+    port = server.server_address[1]
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+        assert response.status == 200
+        assert response.headers["Content-Type"].startswith("text/plain")
+        assert response.read().decode() == render_metrics()
+
+
+def test_metrics_server_disabled_without_port(monkeypatch):
+    monkeypatch.delenv("METRICS_PORT", raising=False)
+    from tools import settings
+
+    monkeypatch.setattr(settings, "_settings", None)
+    assert start_metrics_server() is None
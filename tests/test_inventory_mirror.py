@@ -0,0 +1,65 @@
+"""Watermarks and delta syncs of the inventory mirror."""
+import datetime
+
+from tools.inventory_mirror import InventoryMirror, _watermark
+from tools.local_repository import LocalRepository
+
+SNAPSHOT = {
+    "stores": [{"store_id": "S1", "store_name": "Downtown"}],
+    "products": [
+        {"product_id": "P1", "product_name": "Kitchen Chair", "base_price": 149.99},
+        {"product_id": "P2", "product_name": "Bar Stool", "base_price": 89.0},
+    ],
+    "stock": [
+        {"store_id": "S1", "product_id": "P1", "color": "Black", "available_quantity": 5,
+         "location_in_store": "A1", "last_updated": "2025-01-01T00:00:00"},
+        {"store_id": "S1", "product_id": "P2", "color": "Black", "available_quantity": 2,
+         "location_in_store": "A2", "last_updated": "2025-01-02T00:00:00"},
+    ],
+}
+
+
+def quantities(repository):
+    return {row.product_id: row.available_quantity for row in repository.fetch_table("stock")}
+
+
+def test_watermark_is_the_latest_timestamp_and_never_moves_back():
+    rows = [{"last_updated": "2025-01-02T00:00:00"}, {"last_updated": None},
+            {"last_updated": datetime.datetime(2025, 1, 3)}]
+    assert _watermark(rows) == "2025-01-03T00:00:00"
+    assert _watermark([{"last_updated": "2025-01-01T00:00:00"}], "2025-01-05T00:00:00") == "2025-01-05T00:00:00"
+    assert _watermark([]) is None
+
+
+def test_delta_sync_applies_only_changed_rows():
+    source = LocalRepository(SNAPSHOT)
+    mirror = InventoryMirror(source)
+    mirror.full_sync()
+    assert mirror.watermark == "2025-01-02T00:00:00"
+    assert mirror.loaded.is_set() and mirror.delta_sync
+
+    source.upsert_stock([dict(SNAPSHOT["stock"][0], available_quantity=9, last_updated="2025-01-03T00:00:00")])
+    mirror.sync()
+
+    assert quantities(mirror.repository) == {"P1": 9, "P2": 2}
+    assert mirror.watermark == "2025-01-03T00:00:00"
+    assert mirror.staleness() < 5
+
+
+def test_large_deltas_resync_fully(monkeypatch):
+    monkeypatch.setenv("MIRROR_MAX_DELTA_ROWS", "0")
+    source = LocalRepository(SNAPSHOT)
+    mirror = InventoryMirror(source)
+    mirror.full_sync()
+    first = mirror.repository
+
+    mirror.sync()
+    assert mirror.repository is not first
+
+
+def test_stock_without_last_updated_cannot_delta_sync():
+    stock = [{key: value for key, value in row.items() if key != "last_updated"} for row in SNAPSHOT["stock"]]
+    mirror = InventoryMirror(LocalRepository(dict(SNAPSHOT, stock=stock)))
+    mirror.full_sync()
+    assert not mirror.delta_sync
+    assert mirror.watermark is None
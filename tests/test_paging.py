@@ -0,0 +1,77 @@
+"""Continuation cursors: round trips, refusal of foreign cursors and page sizes."""
+import pytest
+
+from tools.paging import InvalidCursor, Pager
+from tools.repository import Page
+from tools.settings import reset_settings
+
+
+def test_cursor_round_trips_to_its_offset():
+    first = Pager("search_products", {"product_name": "chair"})
+    assert first.offset == 0
+    cursor = first.cursor(40)
+
+    assert Pager("search_products", {"product_name": "chair"}, cursor).offset == 40
+
+
+def test_cursor_accepts_arguments_differing_only_in_case_and_spacing():
+    cursor = Pager("search_products", {"product_name": "Kitchen  Chair"}).cursor(20)
+    assert Pager("search_products", {"product_name": " kitchen chair"}, cursor).offset == 20
+
+
+def test_cursor_ignores_page_size():
+    cursor = Pager("search_products", {"product_name": "chair"}, page_size=5).cursor(5)
+    assert Pager("search_products", {"product_name": "chair"}, cursor, page_size=50).offset == 5
+
+
+@pytest.mark.parametrize("tool, arguments", [
+    ("search_products", {"product_name": "table"}),
+    ("check_product_availability", {"product_name": "chair"}),
+])
+def test_cursor_for_other_arguments_is_refused(tool, arguments):
+    cursor = Pager("search_products", {"product_name": "chair"}).cursor(20)
+    with pytest.raises(InvalidCursor, match="different arguments"):
+        Pager(tool, arguments, cursor)
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "@@@", Pager("t", {}).cursor(1)[:-2]])
+def test_malformed_cursor_is_refused(cursor):
+    with pytest.raises(InvalidCursor):
+        Pager("t", {}, cursor)
+
+
+def test_page_size_defaults_and_caps(monkeypatch):
+    assert Pager("t", {}).size == 20
+    assert Pager("t", {}, page_size=1000).size == 100
+    assert Pager("t", {}, page_size=-3).size == 1
+
+    monkeypatch.setenv("TOOL_PAGE_SIZE_SEARCH_PRODUCTS", "7")
+    reset_settings()
+    assert Pager("search_products", {}).size == 7
+
+
+def test_note_links_the_next_page():
+    pager = Pager("t", {}, page_size=2)
+    page = Page(["a", "b"], 0, 5)
+
+    note = pager.note(page)
+    assert "Showing results 1-2 of 5" in note
+    assert Pager("t", {}, note.split('cursor="')[1].split('"')[0]).offset == 2
+
+    assert "last page" in pager.note(Page(["e"], 4, 5))
+    assert pager.note(Page(["a"], 0, 1)) == ""
+
+
+def test_compact_fields_resume_after_the_rows_shown():
+    pager = Pager("t", {}, page_size=10)
+    fields = pager.compact_fields(Page(list(range(10)), 0, 30), shown=6)
+
+    assert fields["total"] == 30
+    assert Pager("t", {}, fields["next_cursor"]).offset == 6
+    assert "next_cursor" not in pager.compact_fields(Page([1, 2], 28, 30), shown=2)
+
+
+def test_past_end_only_after_the_first_page():
+    pager = Pager("t", {})
+    assert pager.past_end(Page([], 40, None))
+    assert not pager.past_end(Page([], 0, 0))
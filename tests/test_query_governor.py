@@ -0,0 +1,104 @@
+"""Byte budgets and cached dry-run estimates of the query governor."""
+import itertools
+
+import pytest
+
+from tools.query_governor import QueryBudgetExceeded, QueryGovernor
+from tools.repository import LimitedRows
+
+QUERY = "SELECT * FROM stock ORDER BY product_id"
+
+_datasets = itertools.count()
+
+
+class StubJob:
+    def __init__(self, rows, bytes_processed):
+        self._rows = rows
+        self.total_bytes_processed = bytes_processed
+        self.error_result = None
+
+    def result(self, timeout=None):
+        return self._rows
+
+    def done(self):
+        return True
+
+    def cancel(self):
+        return True
+
+
+class StubClient:
+    """Answers dry runs with a fixed estimate and queries with up to `rows` rows."""
+
+    def __init__(self, estimate, rows=10):
+        self.estimate = estimate
+        self.rows = rows
+        self.dry_runs = 0
+        self.queries = []
+
+    def query(self, query, job_config=None):
+        if job_config.dry_run:
+            self.dry_runs += 1
+            return StubJob([], self.estimate)
+        self.queries.append(query)
+        limit = int(query.rsplit("LIMIT", 1)[1]) if "LIMIT" in query else self.rows
+        return StubJob([{"row": i} for i in range(min(limit, self.rows))], self.estimate)
+
+
+@pytest.fixture
+def budgets(monkeypatch):
+    monkeypatch.setenv("QUERY_BYTES_BUDGET", "1000")
+    monkeypatch.setenv("QUERY_MAX_BYTES_BILLED", "5000")
+    monkeypatch.setenv("DEGRADED_ROW_LIMIT", "3")
+    monkeypatch.setenv("QUERY_HEDGING", "false")
+
+
+def run(governor, client, limitable=False):
+    # A fresh dataset per call keeps circuit breakers from other tests out of the way
+    return governor.run(client, QUERY, [], limitable=limitable, dataset=f"test.{next(_datasets)}")
+
+
+def test_within_budget_runs_unchanged(budgets):
+    client = StubClient(estimate=500)
+    rows = run(QueryGovernor(), client, limitable=True)
+    assert client.queries == [QUERY]
+    assert len(rows) == 10 and not isinstance(rows, LimitedRows)
+
+
+def test_estimates_are_cached_per_query_shape(budgets):
+    governor, client = QueryGovernor(), StubClient(estimate=500)
+    run(governor, client)
+    run(governor, client)
+    assert client.dry_runs == 1
+
+
+def test_over_the_hard_limit_is_refused_without_a_job(budgets):
+    client = StubClient(estimate=6000)
+    with pytest.raises(QueryBudgetExceeded, match="over the 5.0 KB limit"):
+        run(QueryGovernor(), client)
+    assert client.queries == []
+
+
+def test_over_budget_limitable_queries_are_degraded(budgets):
+    client = StubClient(estimate=2000)
+    rows = run(QueryGovernor(), client, limitable=True)
+    assert client.queries[0].endswith("LIMIT 3")
+    assert isinstance(rows, LimitedRows) and rows.limit == 3 and len(rows) == 3
+
+
+def test_degraded_results_under_the_limit_are_complete(budgets):
+    rows = run(QueryGovernor(), StubClient(estimate=2000, rows=2), limitable=True)
+    assert not isinstance(rows, LimitedRows)
+
+
+def test_over_budget_queries_that_cannot_be_limited_run_in_full(budgets):
+    client = StubClient(estimate=2000)
+    assert len(run(QueryGovernor(), client)) == 10
+    assert client.queries == [QUERY]
+
+
+def test_dry_runs_can_be_disabled(budgets, monkeypatch):
+    monkeypatch.setenv("QUERY_DRY_RUN", "false")
+    client = StubClient(estimate=6000)
+    assert len(run(QueryGovernor(), client)) == 10
+    assert client.dry_runs == 0
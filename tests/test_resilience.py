@@ -0,0 +1,99 @@
+"""Circuit breaker state changes, failure classification and latency percentiles."""
+import concurrent.futures
+
+import pytest
+
+from tools.resilience import (
+    BackendUnavailable,
+    CircuitBreaker,
+    DeadlineExceeded,
+    LatencyTracker,
+    is_backend_failure,
+)
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    monkeypatch.setenv("BREAKER_FAILURE_THRESHOLD", "3")
+    monkeypatch.setenv("BREAKER_RESET_SECONDS", "30")
+    return CircuitBreaker("project.dataset")
+
+
+def expire(breaker):
+    """Move the breaker's open period into the past."""
+    breaker.opened_at -= 31
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.check()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(BackendUnavailable, match="project.dataset"):
+        breaker.check()
+
+
+def test_success_resets_the_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through(breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    expire(breaker)
+    assert breaker.state == "half_open"
+
+    breaker.check()
+    with pytest.raises(BackendUnavailable):
+        breaker.check()
+
+
+def test_trial_success_closes_the_circuit(breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    expire(breaker)
+    breaker.check()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.check()
+
+
+def test_trial_failure_reopens_the_circuit(breaker):
+    for _ in range(3):
+        breaker.record_failure()
+    expire(breaker)
+    breaker.check()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+@pytest.mark.parametrize("error, expected", [
+    (DeadlineExceeded("late"), True),
+    (concurrent.futures.TimeoutError(), True),
+    (ConnectionError("reset"), True),
+    (ValueError("bad SQL"), False),
+    (KeyError("column"), False),
+])
+def test_only_backend_failures_count(error, expected):
+    assert is_backend_failure(error) is expected
+
+
+def test_latency_percentile_needs_enough_samples():
+    tracker = LatencyTracker(window=10)
+    assert tracker.percentile("shape", 95) is None
+    for seconds in range(1, 21):
+        tracker.record("shape", float(seconds))
+
+    # Only the last ten samples are kept
+    assert tracker.percentile("shape", 50) == 15.0
+    assert tracker.percentile("shape", 100) == 20.0
+    assert tracker.percentile("shape", 95, min_samples=11) is None
@@ -0,0 +1,66 @@
+"""Ranking and query expansion of the BM25 product search."""
+import pytest
+
+from tools.catalog_index import CatalogIndex
+from tools.repository import Record
+from tools.search_engine import SearchEngine, edit_distance, max_edits
+
+PRODUCTS = [
+    Record(product_id="P1", product_name="Modern Comfort Kitchen Chair", category="Kitchen",
+           description="Padded chair for the kitchen table", materials="Oak", colors_available="Black"),
+    Record(product_id="P2", product_name="Industrial Bar Stool", category="Kitchen",
+           description="Counter height stool", materials="Steel", colors_available="Black"),
+    Record(product_id="P3", product_name="Ergonomic Office Chair", category="Office",
+           description="Adjustable desk chair", materials="Mesh", colors_available="Gray"),
+    Record(product_id="P4", product_name="Marble Top Dining Table", category="Dining",
+           description="Seats six", materials="Marble", colors_available="White"),
+    Record(product_id="P5", product_name="Oak Barstool", category="Kitchen",
+           description="Solid wood seat", materials="Oak", colors_available="Natural"),
+]
+
+
+@pytest.fixture
+def engine():
+    return SearchEngine(CatalogIndex(PRODUCTS, []))
+
+
+def ids(results):
+    return [product_id for _, product_id in results]
+
+
+def test_exact_terms_rank_the_best_match_first(engine):
+    results, corrections = engine.search("kitchen chair")
+    assert ids(results)[0] == "P1"
+    assert corrections == {}
+
+
+def test_typo_is_expanded_and_reported(engine):
+    results, corrections = engine.search("kichen chair")
+    assert ids(results)[0] == "P1"
+    assert corrections == {"kichen": "kitchen"}
+
+
+def test_compound_spellings_match_both_ways(engine):
+    assert {"P2", "P5"} <= set(ids(engine.search("barstool")[0]))
+    assert {"P2", "P5"} <= set(ids(engine.search("bar stool")[0]))
+
+
+def test_plurals_match_singular_names(engine):
+    assert set(ids(engine.search("chairs")[0])) >= {"P1", "P3"}
+
+
+def test_short_tokens_are_not_fuzzy_matched(engine):
+    # "oat" is one edit from "oak", but three-letter words allow no typos
+    assert engine.search("oat")[0] == []
+
+
+def test_top_k_limits_results(engine):
+    assert len(engine.search("chair stool table", top_k=2)[0]) == 2
+
+
+def test_edit_distance_stops_past_the_limit():
+    assert edit_distance("kichen", "kitchen", 2) == 1
+    assert edit_distance("table", "chair", 1) == 2
+    assert max_edits("oak") == 0
+    assert max_edits("chair") == 1
+    assert max_edits("kitchens") == 2
@@ -0,0 +1,137 @@
+"""Encoding, mapping and publishing of the shared snapshot file."""
+import os
+import sqlite3
+
+import pytest
+
+from tools.local_repository import LocalRepository
+from tools.shared_snapshot import CURRENT_FILE, MappedSnapshot, encode_snapshot, write_snapshot
+
+TABLES = {
+    "stores": [
+        {"store_id": "S1", "store_name": "Downtown", "city": "New York"},
+        {"store_id": "S2", "store_name": "Brooklyn", "city": None},
+    ],
+    "products": [
+        {"product_id": "P1", "product_name": "Kitchen Chair", "base_price": 149.99, "warranty_months": 12},
+        {"product_id": "P2", "product_name": "Bar Stool", "base_price": 89.0, "warranty_months": None},
+    ],
+    "stock": [
+        {"store_id": "S1", "product_id": "P1", "color": "Black", "available_quantity": 5,
+         "discontinued": False, "last_updated": "2025-01-01T00:00:00"},
+        {"store_id": "S2", "product_id": "P1", "color": None, "available_quantity": 0,
+         "discontinued": True, "last_updated": "2025-01-02T00:00:00"},
+        {"store_id": "S1", "product_id": "P2", "color": "Black", "available_quantity": 7,
+         "discontinued": False, "last_updated": "2025-01-01T00:00:00"},
+    ],
+}
+
+
+@pytest.fixture
+def published(tmp_path):
+    version = write_snapshot(TABLES, str(tmp_path))
+    with open(tmp_path / CURRENT_FILE) as f:
+        return version, MappedSnapshot(str(tmp_path / f.read()))
+
+
+def test_rows_decode_to_what_was_encoded(published):
+    _, snapshot = published
+    for name, rows in TABLES.items():
+        table = snapshot.table(name)
+        assert len(table) == len(rows)
+        assert [dict(row) for row in table.row_views()] == rows
+
+
+def test_column_types_and_nulls_survive(published):
+    _, snapshot = published
+    stock = snapshot.table("stock")
+    assert stock.column("discontinued")[1] is True
+    assert stock.column("available_quantity")[:] == [5, 0, 7]
+    assert stock.column("color")[1] is None
+    assert snapshot.table("products").column("warranty_months")[1] is None
+    assert snapshot.table("products").column("base_price")[0] == pytest.approx(149.99)
+
+
+def test_rows_support_attribute_access(published):
+    _, snapshot = published
+    row = snapshot.table("products").row_views()[0]
+    assert row.product_name == "Kitchen Chair"
+    with pytest.raises(AttributeError):
+        row.missing
+
+
+def test_repeated_strings_are_stored_once():
+    def size(colors):
+        _, chunks = encode_snapshot({"stock": [{"color": color} for color in colors]})
+        return sum(len(chunk) for chunk in chunks)
+
+    repeated = size(["Black-000"] * 1000)
+    distinct = size([f"Black-{i:03}" for i in range(1000)])
+    assert distinct - repeated >= 999 * len("Black-000")
+
+
+def test_version_depends_only_on_the_data():
+    assert encode_snapshot(TABLES)[0] == encode_snapshot(TABLES)[0]
+    changed = dict(TABLES, stores=TABLES["stores"][:1])
+    assert encode_snapshot(changed)[0] != encode_snapshot(TABLES)[0]
+
+
+def test_unchanged_data_is_not_rewritten(tmp_path, published):
+    version, snapshot = published
+    mtime = os.path.getmtime(snapshot.path)
+    assert write_snapshot(TABLES, os.path.dirname(snapshot.path)) == version
+    assert os.path.getmtime(snapshot.path) == mtime
+
+
+def test_only_the_current_and_previous_snapshots_are_kept(tmp_path):
+    versions = []
+    for count in (1, 2, 3):
+        versions.append(write_snapshot(dict(TABLES, stock=TABLES["stock"][:count]), str(tmp_path)))
+
+    files = sorted(name for name in os.listdir(tmp_path) if name.startswith("snapshot-"))
+    assert files == sorted(
+        f"snapshot-{version}.{extension}" for version in versions[1:] for extension in ("bin", "db")
+    )
+    assert (tmp_path / CURRENT_FILE).read_text() == f"snapshot-{versions[-1]}.bin"
+
+
+def test_published_database_serves_the_same_rows(published):
+    _, snapshot = published
+    repository = LocalRepository.from_database(snapshot.database_path)
+    assert [row.product_id for row in repository.product_availability("chair")] == ["P1"]
+    assert repository.sync_state() == (None, None)
+
+    with pytest.raises(sqlite3.OperationalError):
+        repository.upsert_stock([dict(TABLES["stock"][0], available_quantity=1)])
+
+
+def test_writer_updates_stock_and_sync_state_for_readers(published):
+    _, snapshot = published
+    writer = LocalRepository.from_database(snapshot.database_path, read_only=False)
+    reader = LocalRepository.from_database(snapshot.database_path)
+
+    writer.upsert_stock([dict(TABLES["stock"][0], available_quantity=42)])
+    writer.set_sync_state("2025-01-03T00:00:00", 123.0)
+
+    quantities = {(row.store_id, row.product_id): row.available_quantity for row in reader.fetch_table("stock")}
+    assert quantities[("S1", "P1")] == 42
+    assert reader.sync_state() == ("2025-01-03T00:00:00", 123.0)
+
+
+def test_first_use_does_not_publish_in_the_caller(tmp_path, monkeypatch):
+    from tools import shared_snapshot
+
+    monkeypatch.setenv("SHARED_SNAPSHOT_DIR", str(tmp_path))
+    monkeypatch.setattr(shared_snapshot, "_snapshot", None)
+    monkeypatch.setattr(shared_snapshot, "_pointer", None)
+    started = []
+    monkeypatch.setattr(shared_snapshot.threading.Thread, "start", lambda thread: started.append(thread.name))
+    monkeypatch.setattr(shared_snapshot, "_refresher", None)
+
+    assert shared_snapshot.get_shared_snapshot() is None
+    assert started == ["shared-snapshot-refresh"]
+    assert not any(name.startswith("snapshot-") for name in os.listdir(tmp_path))
+
+    write_snapshot(TABLES, str(tmp_path))
+    monkeypatch.setattr(shared_snapshot, "_checked_at", 0.0)
+    assert shared_snapshot.get_shared_snapshot().table("stores").rows == 2
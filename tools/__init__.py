@@ -2,18 +2,24 @@
 
 from .check_our_store_inventory import check_our_store_inventory
 from .check_product_availability import check_product_availability
+from .check_multiple_products_availability import check_multiple_products_availability
 from .list_store_ids import list_store_ids
 from .search_products import search_products
 from .get_our_store_info import get_our_store_info
 from .get_product_categories import get_product_categories
 from .get_brands_and_products import get_brands_and_products
+from .find_products import find_products
+from .filter_products import filter_products
 
 __all__ = [
     "check_our_store_inventory",
     "check_product_availability",
+    "check_multiple_products_availability",
     "list_store_ids",
     "search_products",
     "get_our_store_info",
     "get_product_categories",
     "get_brands_and_products",
+    "find_products",
+    "filter_products",
 ]
\ No newline at end of file
@@ -0,0 +1,184 @@
+"""Reference data placed in the agent's instruction so static questions need no tool call."""
+import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .columnar import runs
+from .inventory_mirror import inventory_source
+from .output import estimate_tokens
+from .repository import Record, get_repository
+from .settings import get_settings
+from .store_proximity import nearest_stores
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the rendered layout changes, so logged versions stay comparable
+FORMAT_VERSION = 1
+
+STORE_FIELDS = ("store_id", "store_name", "address", "city", "state", "zip_code", "phone", "manager", "store_type")
+
+
+class ContextSnapshot:
+    """
+    Stores and category tree at one point in time.
+
+    version combines FORMAT_VERSION with a hash of the data, so it only
+    changes when the rendered context would. built_at is logged, not rendered.
+    """
+
+    def __init__(self, stores: List[Record], categories: Dict[str, List[List[Any]]]):
+        self.stores = {store["store_id"]: store for store in stores}
+        self.categories = categories
+        self.built_at = datetime.datetime.now(datetime.timezone.utc)
+        digest = hashlib.sha1(
+            json.dumps([stores, categories], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        self.version = f"v{FORMAT_VERSION}-{digest[:8]}"
+        self._rendered: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def render(self, store_id: str) -> str:
+        """The context text for a store's sessions, memoized per snapshot."""
+        text = self._rendered.get(store_id)
+        if text is None:
+            text = _render(self, store_id, get_settings().agent_context_max_tokens)
+            with self._lock:
+                self._rendered[store_id] = text
+        return text
+
+
+def _store_line(store: Record, distance: Optional[float] = None) -> str:
+    away = f", {distance:.1f} mi" if distance is not None else ""
+    return f"- {store['store_id']} {store['store_name']}: {store['address']}, {store['city']} {store['state']}{away}, {store['phone']}"
+
+
+def _render(snapshot: ContextSnapshot, store_id: str, max_tokens: int) -> str:
+    """
+    Lay out the snapshot for one store within max_tokens.
+
+    When over the cap, the farthest stores are dropped from the directory
+    first, then subcategory counts; what was left out is named so the model
+    knows to use the tool instead.
+    """
+    # No timestamp: the text only changes with the data, which keeps the prompt prefix stable
+    header = f"Reference data (version {snapshot.version}):"
+
+    our_store = snapshot.stores.get(store_id)
+    ours = ["Our store:"]
+    if our_store is not None:
+        ours.append(
+            "- " + ", ".join(f"{field}: {our_store[field]}" for field in STORE_FIELDS if our_store.get(field))
+        )
+    else:
+        ours.append(f"- {store_id} (not in the store list; use get_our_store_info)")
+
+    others = [store for key, store in snapshot.stores.items() if key != store_id]
+    others = nearest_stores(store_id, others, limit=len(others))
+    directory = [_store_line(store, store.distance_miles) for store in others]
+
+    detailed = [
+        f"- {category}: " + ", ".join(f"{subcategory or 'General'} ({count})" for subcategory, count in subcategories)
+        for category, subcategories in snapshot.categories.items()
+    ]
+    brief = ["- " + ", ".join(snapshot.categories)]
+
+    def layout(shown: int, categories: List[str]) -> str:
+        lines = [header, *ours, "Other stores (nearest first):", *directory[:shown]]
+        if shown < len(directory):
+            lines.append(f"- ...and {len(directory) - shown} more; use list_store_ids for the full list")
+        lines += ["Product categories (products per subcategory):" if categories is detailed else "Product categories:", *categories]
+        return "\n".join(lines)
+
+    shown = len(directory)
+    text = layout(shown, detailed)
+    while shown > 0 and estimate_tokens(text) > max_tokens:
+        shown -= 1
+        text = layout(shown, detailed)
+    if estimate_tokens(text) > max_tokens:
+        text = layout(0, brief)
+    return text
+
+
+_snapshot: Optional[ContextSnapshot] = None
+_lock = threading.Lock()
+_refresher: Optional[threading.Thread] = None
+
+
+def refresh_agent_context() -> ContextSnapshot:
+    """Load the stores and category tree and make them the current snapshot."""
+    global _snapshot
+    repository, _ = inventory_source()
+    stores = [Record((field, _jsonable(store[field])) for field in STORE_FIELDS) for store in repository.list_stores()]
+
+    columns = get_repository().product_categories_columns()
+    categories: Dict[str, List[List[Any]]] = {}
+    if len(columns):
+        subcategories, counts = columns["subcategory"], columns["product_count"]
+        for category, start, stop in runs(columns["category"]):
+            categories[category] = [[subcategory, count] for subcategory, count in zip(subcategories[start:stop], counts[start:stop])]
+
+    snapshot = ContextSnapshot(stores, categories)
+    if _snapshot is None or snapshot.version != _snapshot.version:
+        logger.info("Agent context %s: %d stores, %d categories", snapshot.version, len(stores), len(categories))
+        _snapshot = snapshot
+    return _snapshot
+
+
+def _refresh_loop() -> None:
+    while True:
+        time.sleep(get_settings().agent_context_refresh_seconds)
+        try:
+            refresh_agent_context()
+        except Exception:
+            logger.exception("Agent context refresh failed; keeping previous snapshot")
+
+
+def get_context_snapshot() -> ContextSnapshot:
+    """
+    Get the current snapshot, loading it on first use.
+
+    The first call also starts a daemon thread that reloads it every
+    AGENT_CONTEXT_REFRESH_SECONDS. An unchanged reload keeps the previous
+    snapshot, so its version and rendered text stay the same.
+    """
+    global _refresher
+    if _snapshot is not None:
+        return _snapshot
+
+    with _lock:
+        if _snapshot is None:
+            refresh_agent_context()
+        if _refresher is None:
+            _refresher = threading.Thread(target=_refresh_loop, name="agent-context-refresh", daemon=True)
+            _refresher.start()
+    return _snapshot
+
+
+def warm_agent_context() -> None:
+    """Load the snapshot ahead of the first prompt (e.g. in a thread), logging instead of raising."""
+    try:
+        get_context_snapshot()
+    except Exception:
+        logger.exception("Agent context unavailable; it will be retried on the next prompt")
+
+
+def _jsonable(value: Any) -> Any:
+    return value if value is None or isinstance(value, (str, int, float)) else str(value)
+
+
+def agent_context(store_id: str) -> str:
+    """
+    Reference data for a store's sessions, for the agent instruction.
+
+    Args:
+        store_id: The session's store
+
+    Returns:
+        Text within AGENT_CONTEXT_MAX_TOKENS: our store's details, the other
+        stores nearest first, and the category tree
+    """
+    return get_context_snapshot().render(store_id)
@@ -0,0 +1,81 @@
+"""Async variants of the tools for use on the agent's event loop."""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Coroutine
+
+from .check_multiple_products_availability import (
+    check_multiple_products_availability as _check_multiple_products_availability,
+)
+from .check_our_store_inventory import check_our_store_inventory as _check_our_store_inventory
+from .check_product_availability import check_product_availability as _check_product_availability
+from .filter_products import filter_products as _filter_products
+from .find_products import find_products as _find_products
+from .get_brands_and_products import get_brands_and_products as _get_brands_and_products
+from .get_our_store_info import get_our_store_info as _get_our_store_info
+from .get_our_store_info import test_store_exists as _test_store_exists
+from .get_product_categories import get_product_categories as _get_product_categories
+from .list_store_ids import list_store_ids as _list_store_ids
+from .search_products import search_products as _search_products
+from .settings import get_settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Shared executor, created on first tool call.
+
+    It bounds how many tool calls run at once across all sessions; further
+    calls wait in its queue without blocking the event loop.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_settings().tool_max_concurrency,
+                    thread_name_prefix="tool",
+                )
+    return _executor
+
+
+def make_async(func: Callable[..., Any]) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """
+    Wrap a blocking tool so it runs on the shared tool executor.
+
+    The wrapper keeps the tool's name, docstring and signature, so the model
+    sees the same function declaration, and the caller's context variables
+    are carried into the worker thread.
+
+    Args:
+        func: Synchronous tool function
+
+    Returns:
+        Coroutine function with the same signature
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            _get_executor(), functools.partial(context.run, func, *args, **kwargs)
+        )
+
+    return wrapper
+
+
+check_our_store_inventory = make_async(_check_our_store_inventory)
+check_product_availability = make_async(_check_product_availability)
+check_multiple_products_availability = make_async(_check_multiple_products_availability)
+find_products = make_async(_find_products)
+filter_products = make_async(_filter_products)
+get_brands_and_products = make_async(_get_brands_and_products)
+get_our_store_info = make_async(_get_our_store_info)
+test_store_exists = make_async(_test_store_exists)
+get_product_categories = make_async(_get_product_categories)
+list_store_ids = make_async(_list_store_ids)
+search_products = make_async(_search_products)
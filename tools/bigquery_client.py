@@ -0,0 +1,65 @@
+"""Shared BigQuery clients for all tools."""
+import threading
+from typing import Dict
+
+from google.cloud import bigquery
+from requests.adapters import HTTPAdapter
+
+from .settings import get_settings
+
+_clients: Dict[str, bigquery.Client] = {}
+_lock = threading.Lock()
+
+
+def _pool_size() -> int:
+    """Number of pooled HTTP connections per client (BIGQUERY_POOL_SIZE)."""
+    return get_settings().bigquery_pool_size
+
+
+def _create_client(project_id: str) -> bigquery.Client:
+    """Create a client whose HTTP session keeps a larger connection pool."""
+    client = bigquery.Client(project=project_id)
+    pool_size = _pool_size()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    client._http.mount("https://", adapter)
+    client._http.mount("http://", adapter)
+    return client
+
+
+def get_client(project_id: str) -> bigquery.Client:
+    """
+    Get the process-wide BigQuery client for a project.
+
+    Clients are created lazily on first use and then shared by every tool,
+    so credential discovery and TLS setup happen once per project.
+
+    Args:
+        project_id: GCP project to run queries in
+
+    Returns:
+        Shared bigquery.Client instance
+    """
+    client = _clients.get(project_id)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(project_id)
+        if client is None:
+            client = _create_client(project_id)
+            _clients[project_id] = client
+        return client
+
+
+def close_clients() -> None:
+    """Close and forget all shared clients (e.g. on shutdown or in tests)."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def set_client(project_id: str, client) -> None:
+    """Register a client for a project, e.g. a fake client in benchmarks."""
+    with _lock:
+        _clients[project_id] = client
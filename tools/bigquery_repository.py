@@ -0,0 +1,534 @@
+"""BigQuery implementation of the inventory repository."""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from google.cloud import bigquery
+
+from .bigquery_client import get_client
+from .columnar import Columns
+from .query_governor import QueryGovernor
+from .repository import PRODUCT_ORDERS, InventoryRepository, Page
+from .settings import get_settings
+
+INVENTORY_COLUMNS = """
+        st.store_name,
+        st.store_id,
+        st.address,
+        st.city,
+        st.state,
+        st.zip_code,
+        st.phone,
+        p.product_id,
+        p.product_name,
+        p.category,
+        p.subcategory,
+        p.brand,
+        p.description,
+        p.base_price,
+        p.materials,
+        p.colors_available,
+        p.warranty_months,
+        s.color,
+        s.available_quantity,
+        s.location_in_store"""
+
+STORE_COLUMNS = """
+        store_id,
+        store_name,
+        address,
+        city,
+        state,
+        zip_code,
+        phone,
+        manager,
+        store_type"""
+
+
+# Total matches on every row of a page; window functions run before LIMIT
+TOTAL_ROWS = """,
+            COUNT(*) OVER () AS total_rows"""
+
+
+def _page_clause(limit: Optional[int], offset: int, query_parameters: list) -> Tuple[str, list]:
+    """
+    Build the LIMIT/OFFSET clause for one page.
+
+    Both are bound as parameters so every page of a lookup has the same query
+    shape, and with it the same cached estimate.
+
+    Returns:
+        Tuple of (clause, query_parameters with the page bounds), or ("",
+        query_parameters) without a limit
+    """
+    if limit is None:
+        return "", query_parameters
+    return "LIMIT @page_limit OFFSET @page_offset", query_parameters + [
+        bigquery.ScalarQueryParameter("page_limit", "INT64", int(limit)),
+        bigquery.ScalarQueryParameter("page_offset", "INT64", int(offset)),
+    ]
+
+
+def _single_query_enabled() -> bool:
+    """Whether the our-store and other-store lookups run as one BigQuery job."""
+    return get_settings().inventory_single_query
+
+
+def _product_filter(product_name: Optional[str], product_ids: Optional[Sequence[str]]):
+    """
+    Build the product match condition and its parameter.
+
+    Returns:
+        Tuple of (condition, query_parameter), or (None, None) without a filter
+    """
+    if product_ids is not None:
+        return (
+            "p.product_id IN UNNEST(@product_ids)",
+            bigquery.ArrayQueryParameter("product_ids", "STRING", list(product_ids)),
+        )
+    if product_name:
+        return (
+            "LOWER(p.product_name) LIKE LOWER(@product_name)",
+            bigquery.ScalarQueryParameter("product_name", "STRING", f"%{product_name}%"),
+        )
+    return None, None
+
+
+def _build_filters(
+    product_name: Optional[str],
+    color: Optional[str],
+    material: Optional[str],
+    product_ids: Optional[Sequence[str]] = None,
+):
+    """
+    Build the WHERE conditions for our store and for other stores.
+
+    Our store matches color and material as stored; other stores match
+    case-insensitively and also accept any color the product comes in.
+
+    Returns:
+        Tuple of (our_conditions, other_conditions, query_parameters)
+    """
+    our_conditions = []
+    other_conditions = []
+    query_parameters = []
+
+    product_condition, product_parameter = _product_filter(product_name, product_ids)
+    if product_condition:
+        query_parameters.append(product_parameter)
+        our_conditions.append(product_condition)
+        other_conditions.append(product_condition)
+
+    if color:
+        query_parameters.append(bigquery.ScalarQueryParameter("color", "STRING", f"%{color}%"))
+        our_conditions.append("s.color LIKE @color")
+        other_conditions.append("(LOWER(s.color) LIKE LOWER(@color) OR LOWER(p.colors_available) LIKE LOWER(@color))")
+
+    if material:
+        query_parameters.append(bigquery.ScalarQueryParameter("material", "STRING", f"%{material}%"))
+        our_conditions.append("p.materials LIKE @material")
+        other_conditions.append("LOWER(p.materials) LIKE LOWER(@material)")
+
+    return our_conditions, other_conditions, query_parameters
+
+
+class BigQueryRepository(InventoryRepository):
+    """Runs every lookup as a parameterized BigQuery job on the shared client, within the query governor's budgets."""
+
+    name = "bigquery"
+
+    def __init__(self, project_id: str, dataset: str):
+        self.project_id = project_id
+        self.dataset = dataset
+        self.governor = QueryGovernor()
+
+    @classmethod
+    def from_env(cls) -> "BigQueryRepository":
+        """Create a repository from BIGQUERY_PROJECT / BIGQUERY_DATASET."""
+        settings = get_settings()
+        return cls(project_id=settings.bigquery_project, dataset=settings.bigquery_dataset)
+
+    def _table(self, name: str) -> str:
+        return f"`{self.project_id}.{self.dataset}.{name}`"
+
+    def _run(
+        self, query: str, query_parameters: Optional[list] = None, limitable: bool = False, columnar: bool = False
+    ) -> Any:
+        """Run a query within the calling tool's budgets and deadline and return all rows (or Columns when columnar)."""
+        client = get_client(self.project_id)
+        return self.governor.run(
+            client,
+            query,
+            query_parameters or [],
+            limitable=limitable,
+            columnar=columnar,
+            dataset=f"{self.project_id}.{self.dataset}",
+        )
+
+    def fetch_table(self, table: str) -> List[Any]:
+        if table not in ("stores", "products", "stock"):
+            raise ValueError(f"Unknown table '{table}'")
+        return self._run(f"SELECT * FROM {self._table(table)}")
+
+    def list_stores(self) -> List[Any]:
+        query = f"""
+        SELECT {STORE_COLUMNS}
+        FROM {self._table("stores")}
+        ORDER BY store_id
+        """
+        return self._run(query)
+
+    def get_store(self, store_id: str) -> Optional[Any]:
+        query = f"""
+        SELECT {STORE_COLUMNS}
+        FROM {self._table("stores")}
+        WHERE store_id = @store_id
+        """
+        rows = self._run(query, [bigquery.ScalarQueryParameter("store_id", "STRING", store_id)])
+        return rows[0] if rows else None
+
+    def store_diagnostics(self, store_id: str, sample_size: int = 5) -> Dict[str, Any]:
+        stores = self._table("stores")
+        total = self._run(f"SELECT COUNT(*) as total FROM {stores}")[0].total
+        sample = self._run(f"SELECT store_id FROM {stores} LIMIT {int(sample_size)}")
+        found = self._run(
+            f"SELECT COUNT(*) as found FROM {stores} WHERE store_id = @store_id",
+            [bigquery.ScalarQueryParameter("store_id", "STRING", store_id)],
+        )[0].found
+        return {
+            "total_stores": total,
+            "sample_store_ids": [row.store_id for row in sample],
+            "found": found > 0,
+        }
+
+    def our_store_inventory(
+        self,
+        store_id: str,
+        product_name: Optional[str] = None,
+        color: Optional[str] = None,
+        material: Optional[str] = None,
+        product_ids: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Any], List[Any]]:
+        our_conditions, other_conditions, query_parameters = _build_filters(product_name, color, material, product_ids)
+        query_parameters = [bigquery.ScalarQueryParameter("store_id", "STRING", store_id)] + query_parameters
+
+        if not other_conditions:
+            return self._fetch_our_store(our_conditions, query_parameters, limit, offset), []
+
+        if _single_query_enabled():
+            return self._fetch_single_query(our_conditions, other_conditions, query_parameters, limit, offset)
+
+        our_rows = self._fetch_our_store(our_conditions, query_parameters, limit, offset)
+        # A page past the end is empty without our store lacking a match
+        if our_rows or offset:
+            return our_rows, []
+        return our_rows, self._fetch_other_stores(other_conditions, query_parameters)
+
+    def _fetch_single_query(self, our_conditions, other_conditions, query_parameters, limit=None, offset=0):
+        """
+        Fetch our-store rows and other-store alternatives in one BigQuery job.
+
+        Other stores are only returned when our store has no match, one row per
+        store; the caller ranks them (see store_proximity). With limit, only
+        one page of our-store rows is returned.
+        """
+        page, query_parameters = _page_clause(limit, offset, query_parameters)
+        ours = "SELECT * FROM matches WHERE is_our_store"
+        if page:
+            ours = f"""SELECT *{TOTAL_ROWS}
+            FROM matches
+            WHERE is_our_store
+            ORDER BY category, product_name, product_id, color
+            {page}"""
+        query = f"""
+        WITH matches AS (
+            SELECT
+                s.store_id = @store_id AS is_our_store,{INVENTORY_COLUMNS},
+                ROW_NUMBER() OVER (PARTITION BY s.store_id ORDER BY p.product_name) AS store_rank
+            FROM {self._table("stock")} s
+            JOIN {self._table("stores")} st ON s.store_id = st.store_id
+            JOIN {self._table("products")} p ON s.product_id = p.product_id
+            WHERE s.available_quantity > 0
+                AND (
+                    (s.store_id = @store_id AND {" AND ".join(our_conditions)})
+                    OR (s.store_id != @store_id AND {" AND ".join(other_conditions)})
+                )
+        )
+        SELECT * FROM ({ours})
+        UNION ALL
+        SELECT *{", NULL AS total_rows" if page else ""}
+        FROM matches
+        WHERE store_rank = 1 AND NOT EXISTS (SELECT 1 FROM matches WHERE is_our_store)
+        ORDER BY is_our_store DESC, category, product_name, product_id, color, store_name
+        """
+
+        our_rows = []
+        other_rows = []
+        for row in self._run(query, query_parameters):
+            (our_rows if row.is_our_store else other_rows).append(row)
+        other_rows.sort(key=lambda row: row.store_name)
+
+        return (Page.from_rows(our_rows, offset) if page else our_rows), other_rows
+
+    def _fetch_our_store(self, our_conditions, query_parameters, limit=None, offset=0):
+        """Fetch in-stock rows for our store only, one page of them with limit."""
+        conditions = ["s.store_id = @store_id", "s.available_quantity > 0"] + our_conditions
+        page, query_parameters = _page_clause(limit, offset, query_parameters)
+
+        query = f"""
+        SELECT {INVENTORY_COLUMNS}{TOTAL_ROWS if page else ""}
+        FROM {self._table("stock")} s
+        JOIN {self._table("stores")} st ON s.store_id = st.store_id
+        JOIN {self._table("products")} p ON s.product_id = p.product_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY p.category, p.product_name, p.product_id, s.color
+        {page}
+        """
+        rows = self._run(query, query_parameters)
+        return Page.from_rows(rows, offset) if page else rows
+
+    def _fetch_other_stores(self, other_conditions, query_parameters):
+        """Fetch one row per other store that has a match in stock."""
+        conditions = ["s.store_id != @store_id", "s.available_quantity > 0"] + other_conditions
+
+        query = f"""
+        SELECT *
+        FROM (
+            SELECT {INVENTORY_COLUMNS},
+                ROW_NUMBER() OVER (PARTITION BY st.store_id ORDER BY p.product_name) AS store_rank
+            FROM {self._table("stock")} s
+            JOIN {self._table("stores")} st ON s.store_id = st.store_id
+            JOIN {self._table("products")} p ON s.product_id = p.product_id
+            WHERE {" AND ".join(conditions)}
+        )
+        WHERE store_rank = 1
+        ORDER BY store_name
+        """
+        return self._run(query, query_parameters)
+
+    def product_availability(
+        self,
+        product_name: str,
+        product_ids: Optional[Sequence[str]] = None,
+        store_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Any]:
+        product_condition, product_parameter = _product_filter(product_name, product_ids)
+        conditions = [product_condition, "s.available_quantity > 0"]
+        query_parameters = [product_parameter]
+        if store_id:
+            conditions.append("s.store_id = @store_id")
+            query_parameters.append(bigquery.ScalarQueryParameter("store_id", "STRING", store_id))
+        page, query_parameters = _page_clause(limit, offset, query_parameters)
+
+        query = f"""
+        SELECT
+            st.store_name,
+            st.store_id,
+            st.address,
+            st.city,
+            st.state,
+            st.zip_code,
+            st.phone,
+            p.product_id,
+            p.product_name,
+            p.category,
+            p.base_price,
+            s.color,
+            s.available_quantity,
+            s.location_in_store{TOTAL_ROWS if page else ""}
+        FROM {self._table("stock")} s
+        JOIN {self._table("stores")} st ON s.store_id = st.store_id
+        JOIN {self._table("products")} p ON s.product_id = p.product_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY st.store_name, p.product_name, st.store_id, p.product_id, s.color
+        {page}
+        """
+        # A page is already bounded, so it is not degraded to DEGRADED_ROW_LIMIT
+        rows = self._run(query, query_parameters, limitable=not page)
+        return Page.from_rows(rows, offset) if page else rows
+
+    def batch_availability(self, product_names: Sequence[str], store_id: Optional[str] = None) -> List[Any]:
+        conditions = ["s.available_quantity > 0"]
+        query_parameters = [
+            bigquery.ArrayQueryParameter("patterns", "STRING", [f"%{name}%" for name in product_names]),
+        ]
+        if store_id:
+            conditions.append("s.store_id = @store_id")
+            query_parameters.append(bigquery.ScalarQueryParameter("store_id", "STRING", store_id))
+
+        query = f"""
+        SELECT
+            item_index,
+            st.store_name,
+            st.store_id,
+            st.address,
+            st.city,
+            st.state,
+            st.zip_code,
+            st.phone,
+            p.product_id,
+            p.product_name,
+            p.category,
+            p.base_price,
+            s.color,
+            s.available_quantity,
+            s.location_in_store
+        FROM UNNEST(@patterns) AS pattern WITH OFFSET AS item_index
+        JOIN {self._table("products")} p ON LOWER(p.product_name) LIKE LOWER(pattern)
+        JOIN {self._table("stock")} s ON s.product_id = p.product_id
+        JOIN {self._table("stores")} st ON s.store_id = st.store_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY item_index, st.store_name, p.product_name
+        """
+        return self._run(query, query_parameters, limitable=True)
+
+    def search_products(
+        self, product_name: str, limit: int = 50, product_ids: Optional[Sequence[str]] = None, offset: int = 0
+    ) -> Page:
+        product_condition, product_parameter = _product_filter(product_name, product_ids)
+        page, query_parameters = _page_clause(limit, offset, [product_parameter])
+        query = f"""
+        SELECT
+            st.store_name,
+            st.store_id,
+            st.address,
+            st.city,
+            st.state,
+            st.zip_code,
+            st.phone,
+            p.product_id,
+            p.product_name,
+            p.category,
+            p.subcategory,
+            p.brand,
+            p.base_price,
+            s.available_quantity,
+            s.color,
+            s.location_in_store{TOTAL_ROWS}
+        FROM {self._table("stock")} s
+        JOIN {self._table("stores")} st ON s.store_id = st.store_id
+        JOIN {self._table("products")} p ON s.product_id = p.product_id
+        WHERE {product_condition}
+            AND s.available_quantity > 0
+        ORDER BY p.product_name, st.store_name, st.store_id, p.product_id, s.color
+        {page}
+        """
+        return Page.from_rows(self._run(query, query_parameters), offset)
+
+    def filter_products(
+        self,
+        product_name: Optional[str] = None,
+        product_ids: Optional[Sequence[str]] = None,
+        category: Optional[str] = None,
+        subcategory: Optional[str] = None,
+        brand: Optional[str] = None,
+        color: Optional[str] = None,
+        material: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        store_id: Optional[str] = None,
+        in_stock_only: bool = True,
+        order_by: str = "price",
+        limit: int = 10,
+    ) -> List[Any]:
+        product_condition, product_parameter = _product_filter(product_name, product_ids)
+        product_conditions = [product_condition] if product_condition else []
+        query_parameters = [product_parameter] if product_parameter else []
+        for column, value in (("category", category), ("subcategory", subcategory), ("brand", brand), ("materials", material)):
+            if value:
+                product_conditions.append(f"LOWER(p.{column}) LIKE LOWER(@{column})")
+                query_parameters.append(bigquery.ScalarQueryParameter(column, "STRING", f"%{value}%"))
+        if min_price is not None:
+            product_conditions.append("p.base_price >= @min_price")
+            query_parameters.append(bigquery.ScalarQueryParameter("min_price", "FLOAT64", float(min_price)))
+        if max_price is not None:
+            product_conditions.append("p.base_price <= @max_price")
+            query_parameters.append(bigquery.ScalarQueryParameter("max_price", "FLOAT64", float(max_price)))
+
+        stock_conditions = ["s.product_id = p.product_id", "s.available_quantity > 0"]
+        if store_id:
+            stock_conditions.append("s.store_id = @store_id")
+            query_parameters.append(bigquery.ScalarQueryParameter("store_id", "STRING", store_id))
+        if color:
+            stock_conditions.append("LOWER(s.color) LIKE LOWER(@color)")
+            query_parameters.append(bigquery.ScalarQueryParameter("color", "STRING", f"%{color}%"))
+            if not in_stock_only:
+                product_conditions.append("LOWER(p.colors_available) LIKE LOWER(@color)")
+
+        query = f"""
+        SELECT
+            p.product_id,
+            p.product_name,
+            p.category,
+            p.subcategory,
+            p.brand,
+            p.base_price,
+            p.materials,
+            p.colors_available,
+            COALESCE(SUM(s.available_quantity), 0) AS available_quantity,
+            COUNT(DISTINCT s.store_id) AS stores_with_stock,
+            STRING_AGG(DISTINCT s.color, ', ' ORDER BY s.color) AS colors_in_stock,
+            MIN(s.location_in_store) AS location_in_store
+        FROM {self._table("products")} p
+        {"JOIN" if in_stock_only else "LEFT JOIN"} {self._table("stock")} s
+            ON {" AND ".join(stock_conditions)}
+        WHERE {" AND ".join(product_conditions) or "TRUE"}
+        GROUP BY p.product_id, p.product_name, p.category, p.subcategory, p.brand, p.base_price, p.materials, p.colors_available
+        ORDER BY {PRODUCT_ORDERS[order_by]}
+        LIMIT @limit
+        """
+        query_parameters.append(bigquery.ScalarQueryParameter("limit", "INT64", int(limit)))
+        return self._run(query, query_parameters)
+
+    def _categories_query(self) -> str:
+        return f"""
+        SELECT DISTINCT
+            category,
+            subcategory,
+            COUNT(*) as product_count
+        FROM {self._table("products")}
+        WHERE category IS NOT NULL
+        GROUP BY category, subcategory
+        ORDER BY category, subcategory
+        """
+
+    def _brands_query(self) -> str:
+        return f"""
+        SELECT
+            brand,
+            product_name,
+            category,
+            subcategory,
+            base_price
+        FROM {self._table("products")}
+        WHERE brand IS NOT NULL
+        ORDER BY brand, product_name
+        """
+
+    def product_categories(self) -> List[Any]:
+        return self._run(self._categories_query())
+
+    def brands_and_products(self) -> List[Any]:
+        return self._run(self._brands_query(), limitable=True)
+
+    def product_categories_columns(self) -> Columns:
+        return self._run(self._categories_query(), columnar=True)
+
+    def brands_and_products_columns(self) -> Columns:
+        return self._run(self._brands_query(), limitable=True, columnar=True)
+
+    def run_statement(self, statement: str, parameters: Sequence[Tuple[str, str, Any]] = ()) -> List[Any]:
+        query_parameters = [
+            bigquery.ScalarQueryParameter(name, param_type, value) for name, param_type, value in parameters
+        ]
+        return self._run(statement, query_parameters)
+
+    def stock_changes(self, since: Any) -> List[Any]:
+        query = f"""
+        SELECT *
+        FROM {self._table("stock")}
+        WHERE last_updated >= @since
+        """
+        return self._run(query, [bigquery.ScalarQueryParameter("since", "TIMESTAMP", since)])
@@ -0,0 +1,142 @@
+"""TTL + LRU caching for tools that read slowly-changing reference data."""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .instrumentation import current_call
+from .settings import get_settings
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, name: str, ttl: float, max_entries: int):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or _MISSING if absent or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one entry, or every entry when key is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_caches: Dict[str, TTLCache] = {}
+
+
+def ttl_cache(name: str, default_ttl: float = 3600.0) -> Callable:
+    """
+    Cache a function's return value per positional arguments.
+
+    Exceptions and stale results served while the backend was degraded are
+    never cached, so a failed lookup is retried on the next call.
+    The wrapped function gains invalidate(*args) and refresh(*args) helpers.
+
+    Args:
+        name: Cache name, used for the CACHE_TTL_<NAME> override and in stats
+        default_ttl: TTL in seconds when no environment override is set
+
+    Returns:
+        Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(name, ttl=default_ttl, max_entries=256)
+        _caches[name] = cache
+        configured = threading.Event()
+
+        def configure() -> None:
+            # Applied on first use rather than at import, after settings are loaded
+            settings = get_settings()
+            cache.ttl = settings.cache_ttl(name, default_ttl)
+            cache.max_entries = settings.cache_max_entries
+            configured.set()
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            if not configured.is_set():
+                configure()
+            value = cache.get(args)
+            if value is _MISSING:
+                call = current_call()
+                stale = call.stale_seconds if call is not None else None
+                value = func(*args)
+                # Last known good results served during an outage are not kept for the TTL
+                if call is None or call.stale_seconds == stale:
+                    cache.set(args, value)
+            return value
+
+        def invalidate(*args) -> None:
+            cache.invalidate(args if args else None)
+
+        def refresh(*args) -> Any:
+            if not configured.is_set():
+                configure()
+            value = func(*args)
+            cache.set(args, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.invalidate = invalidate
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
+
+
+def invalidate(name: Optional[str] = None) -> None:
+    """Clear one named cache, or all caches when name is None."""
+    for cache_name, cache in _caches.items():
+        if name is None or cache_name == name:
+            cache.invalidate()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return stats for every registered cache, keyed by cache name."""
+    return {cache_name: cache.stats() for cache_name, cache in _caches.items()}
@@ -0,0 +1,219 @@
+"""In-process catalog snapshot with trigram and token indexes for product search."""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .repository import get_repository
+from .settings import get_settings
+from .shared_snapshot import get_shared_snapshot
+
+logger = logging.getLogger(__name__)
+
+INDEXED_FIELDS = ("product_name", "description", "materials", "colors")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of a string."""
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def trigrams(text: str) -> Set[str]:
+    """All three-character substrings of an already lowercased string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CatalogIndex:
+    """
+    Immutable snapshot of the products and stock tables.
+
+    Each indexed field (product name, description, materials, and colors from
+    both the product and its stock rows) gets a trigram index answering
+    substring queries the way LIKE '%text%' does, and a token index answering
+    keyword queries.
+    """
+
+    def __init__(self, products: Iterable[Any], stock: Iterable[Any], version: Optional[str] = None):
+        self.loaded_at = time.time()
+        self.version = version
+        self.products: Dict[str, Any] = {row.product_id: row for row in products}
+
+        stock_colors: Dict[str, Set[str]] = defaultdict(set)
+        for row in stock:
+            if row.color:
+                stock_colors[row.product_id].add(row.color)
+
+        self._values: Dict[str, Dict[str, str]] = {field: {} for field in INDEXED_FIELDS}
+        self._trigrams: Dict[str, Dict[str, Set[str]]] = {field: defaultdict(set) for field in INDEXED_FIELDS}
+        self._tokens: Dict[str, Set[str]] = defaultdict(set)
+
+        for product_id, row in self.products.items():
+            colors = ", ".join([row.colors_available or ""] + sorted(stock_colors.get(product_id, ())))
+            values = {
+                "product_name": row.product_name or "",
+                "description": row.description or "",
+                "materials": row.materials or "",
+                "colors": colors,
+            }
+            for field, value in values.items():
+                lowered = value.lower()
+                self._values[field][product_id] = lowered
+                for gram in trigrams(lowered):
+                    self._trigrams[field][gram].add(product_id)
+                for token in tokenize(lowered):
+                    self._tokens[token].add(product_id)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def substring(self, text: str, field: str = "product_name") -> Set[str]:
+        """
+        Product IDs whose field contains text, case-insensitively.
+
+        Args:
+            text: Substring to look for
+            field: One of INDEXED_FIELDS
+
+        Returns:
+            Set of matching product IDs
+        """
+        needle = text.lower()
+        values = self._values[field]
+        if len(needle) < 3:
+            return {product_id for product_id, value in values.items() if needle in value}
+
+        postings = sorted((self._trigrams[field].get(gram, set()) for gram in trigrams(needle)), key=len)
+        if not postings[0]:
+            return set()
+        candidates = postings[0].intersection(*postings[1:])
+        return {product_id for product_id in candidates if needle in values[product_id]}
+
+    def keywords(self, text: str) -> Set[str]:
+        """Product IDs where every token of text appears in some indexed field."""
+        tokens = tokenize(text)
+        if not tokens:
+            return set()
+        postings = sorted((self._tokens.get(token, set()) for token in tokens), key=len)
+        return postings[0].intersection(*postings[1:])
+
+
+# How long after a failed first load the refresh thread tries again
+LOAD_RETRY_SECONDS = 60.0
+
+_index: Optional[CatalogIndex] = None
+_lock = threading.Lock()
+_refresher: Optional[threading.Thread] = None
+_loaded = threading.Event()
+
+
+def _enabled() -> bool:
+    return get_settings().catalog_index
+
+
+def _refresh_interval() -> float:
+    settings = get_settings()
+    if settings.shared_snapshot_dir:
+        # Rebuilding is skipped until a new shared snapshot is published, so check it often
+        return settings.shared_snapshot_check_seconds
+    return settings.catalog_refresh_seconds
+
+
+def refresh_catalog_index() -> Optional[CatalogIndex]:
+    """
+    Load a fresh snapshot and make it the current index.
+
+    With SHARED_SNAPSHOT_DIR set the rows are views into the shared snapshot
+    file instead of copies fetched from the repository, and the index is
+    only rebuilt when a new version has been published; until the first
+    one is, there is no index.
+    """
+    global _index
+    shared = get_shared_snapshot()
+    if shared is None and get_settings().shared_snapshot_dir:
+        return _index
+    if shared is not None:
+        if _index is not None and _index.version == shared.version:
+            return _index
+        index = CatalogIndex(
+            shared.table("products").row_views(), shared.table("stock").row_views(), version=shared.version
+        )
+    else:
+        repository = get_repository()
+        index = CatalogIndex(repository.fetch_table("products"), repository.fetch_table("stock"))
+    _index = index
+    logger.info("Catalog index refreshed: %d products", len(index))
+    return index
+
+
+def _refresh_loop() -> None:
+    while True:
+        delay = _refresh_interval()
+        try:
+            refresh_catalog_index()
+        except Exception:
+            if _index is None:
+                delay = min(delay, LOAD_RETRY_SECONDS)
+                logger.exception("Catalog index unavailable; falling back to remote search, retrying in %.0fs", delay)
+            else:
+                logger.exception("Catalog index refresh failed; keeping previous snapshot")
+        if _index is not None:
+            _loaded.set()
+        time.sleep(delay)
+
+
+def get_catalog_index() -> Optional[CatalogIndex]:
+    """
+    Get the current catalog index.
+
+    The first call starts a daemon thread that loads the snapshot and then
+    reloads it every CATALOG_REFRESH_SECONDS, retrying a failed first load
+    after LOAD_RETRY_SECONDS; tool calls never wait on a load.
+
+    Returns:
+        The index, or None when disabled (CATALOG_INDEX=false) or while it
+        is not loaded yet
+    """
+    global _refresher
+    if not _enabled():
+        return None
+    if _refresher is None:
+        with _lock:
+            if _refresher is None:
+                _refresher = threading.Thread(target=_refresh_loop, name="catalog-index-refresh", daemon=True)
+                _refresher.start()
+    return _index
+
+
+def wait_for_catalog_index(timeout: float = 60.0) -> Optional[CatalogIndex]:
+    """Start loading the index if needed and wait up to timeout for it, e.g. to warm up a benchmark."""
+    if get_catalog_index() is None and _enabled():
+        _loaded.wait(timeout)
+    return get_catalog_index()
+
+
+def match_product_ids(product_name: Optional[str]) -> Optional[List[str]]:
+    """
+    Resolve a product-name substring to product IDs using the local index.
+
+    Args:
+        product_name: Text the product name must contain
+
+    Returns:
+        Sorted matching IDs (possibly empty), or None when the caller should
+        fall back to a remote LIKE search: no name given, index unavailable,
+        or more matches than CATALOG_INDEX_MAX_IDS
+    """
+    if not product_name:
+        return None
+    index = get_catalog_index()
+    if index is None:
+        return None
+
+    product_ids = index.substring(product_name)
+    if len(product_ids) > get_settings().catalog_index_max_ids:
+        return None
+    return sorted(product_ids)
@@ -0,0 +1,112 @@
+"""Check availability of several products at once."""
+from typing import List, Optional
+from .catalog_index import match_product_ids
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .output import compact_mode, limited_note, render_compact
+from .repository import LimitedRows, Record, get_repository
+from .settings import get_settings
+
+MAX_ITEMS = 20
+
+
+def _fetch_grouped(product_names: List[str], store_id: Optional[str]) -> List[list]:
+    """
+    Fetch in-stock rows for every name with a single query, grouped per name.
+    
+    Names are resolved to product IDs by the local catalog index when possible;
+    otherwise the repository matches all name patterns in one batched query.
+    When that query was cut short by its budget, the groups come back as
+    LimitedRows carrying the limit.
+    """
+    id_lists = [match_product_ids(name) for name in product_names]
+    
+    if all(product_ids is not None for product_ids in id_lists):
+        all_ids = sorted(set().union(*id_lists))
+        rows = get_repository().product_availability(None, product_ids=all_ids, store_id=store_id) if all_ids else []
+        grouped = []
+        for product_ids in id_lists:
+            wanted = set(product_ids)
+            grouped.append([row for row in rows if row.product_id in wanted])
+    else:
+        rows = get_repository().batch_availability(product_names, store_id=store_id)
+        grouped = [[] for _ in product_names]
+        for row in rows:
+            grouped[row.item_index].append(row)
+    
+    return LimitedRows(grouped, rows.limit) if isinstance(rows, LimitedRows) else grouped
+
+
+@instrumented
+@coalesced
+def check_multiple_products_availability(product_names: List[str], store_id: Optional[str] = None) -> str:
+    """
+    Check availability of several products in one lookup, e.g. when a customer
+    asks about "the table, four chairs and a bench".
+    
+    Args:
+        product_names: Product names to check (up to 20)
+        store_id: Optional store ID to limit the check to one store
+        
+    Returns:
+        String with availability grouped per requested product
+    """
+    names = [name.strip() for name in product_names or [] if name and name.strip()]
+    if not names:
+        return "Please provide at least one product name to check."
+    
+    skipped = names[MAX_ITEMS:]
+    names = names[:MAX_ITEMS]
+    
+    try:
+        grouped = _fetch_grouped(names, store_id)
+        
+        if compact_mode():
+            rows = [Record(row, item=name) for name, group in zip(names, grouped) for row in group]
+            missing = [name for name, group in zip(names, grouped) if not group]
+            extra = {}
+            if isinstance(grouped, LimitedRows):
+                # A cut-short result proves nothing about the names it left empty
+                extra["not_checked"] = missing + skipped
+                extra["limited_to"] = grouped.limit
+            else:
+                extra["not_found"] = missing
+                if skipped:
+                    extra["not_checked"] = skipped
+            return render_compact(
+                f"Availability for {len(names)} products",
+                rows,
+                ["item", "product_name", "color", "available_quantity", "base_price"],
+                store_columns=("store_name",),
+                extra=extra,
+            )
+        
+        # Rows listed per product; the rest are paged by check_product_availability
+        per_item = get_settings().for_tool("tool_page_size", "check_multiple_products_availability")
+        sections = []
+        for name, rows in zip(names, grouped):
+            if not rows and isinstance(grouped, LimitedRows):
+                sections.append(f"**{name}**: Not checked, the combined lookup was cut short; check this product on its own")
+                continue
+            if not rows:
+                sections.append(f"**{name}**: No available stock found")
+                continue
+            
+            lines = [f"**{name}**:"]
+            for row in rows[:per_item]:
+                lines.append(
+                    f"• {row.store_name} (Store {row.store_id}): {row.product_name} - {row.available_quantity} available, ${row.base_price:.2f}"
+                    + (f" - {row.color}" if row.color else "")
+                )
+            if len(rows) > per_item:
+                lines.append(f"• ...and {len(rows) - per_item} more rows; check '{name}' on its own with check_product_availability to page through them")
+            sections.append("\n".join(lines))
+        
+        where = f" at store {store_id}" if store_id else ""
+        result = f"Availability for {len(names)} products{where}:\n\n" + "\n\n".join(sections) + limited_note(grouped)
+        if skipped:
+            result += f"\n\nNot checked (limit is {MAX_ITEMS} products per call): " + ", ".join(skipped)
+        return result
+        
+    except Exception as e:
+        return f"Error checking product availability: {str(e)}"
@@ -1,12 +1,38 @@
 """Check inventory for our specific store."""
-import os
+import functools
 from typing import Optional
-from google.cloud import bigquery
-from dotenv import load_dotenv
+from .catalog_index import match_product_ids
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .inventory_mirror import inventory_source, staleness_note
+from .output import compact_mode, render_compact
+from .paging import Pager
+from .repository import Page
+from .store_context import current_store_id, store_details
+from .store_proximity import nearest_stores
 
-load_dotenv()
+def _criteria_text(product_name: Optional[str], color: Optional[str], material: Optional[str]) -> str:
+    """Describe the search criteria for the "not in stock" messages."""
+    search_criteria = []
+    if product_name:
+        search_criteria.append(f"'{product_name}'")
+    if color:
+        search_criteria.append(f"color '{color}'")
+    if material:
+        search_criteria.append(f"material '{material}'")
+    
+    return " with " + " and ".join(search_criteria) if search_criteria else ""
 
-def check_our_store_inventory(product_name: Optional[str] = None, color: Optional[str] = None, material: Optional[str] = None) -> str:
+
+@instrumented
+@coalesced
+def check_our_store_inventory(
+    product_name: Optional[str] = None,
+    color: Optional[str] = None,
+    material: Optional[str] = None,
+    page_size: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> str:
     """
     Check inventory for our specific store.
     
@@ -14,139 +40,79 @@ def check_our_store_inventory(product_name: Optional[str] = None, color: Optiona
         product_name: Optional product name to filter by
         color: Optional color to filter by
         material: Optional material to filter by
+        page_size: Optional number of items per page (default 20)
+        cursor: Optional cursor from the previous page's output, to get the next page
         
     Returns:
-        String with inventory information for our store
+        String with inventory information for our store, one page at a time
     """
-    project_id = os.getenv("BIGQUERY_PROJECT", "adk-demo-469711")
-    dataset = os.getenv("BIGQUERY_DATASET", "mobilis")
-    store_id = os.getenv("STORE_ID", "STORE_001")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query_parameters = [
-        bigquery.ScalarQueryParameter("store_id", "STRING", store_id),
-    ]
-    
-    conditions = [
-        f"s.store_id = @store_id",
-        "s.available_quantity > 0",
-    ]
-    
-    if product_name:
-        query_parameters.append(bigquery.ScalarQueryParameter("product_name", "STRING", f"%{product_name}%"))
-        conditions.append(f"LOWER(p.product_name) LIKE LOWER(@product_name)")
-    
-    if color:
-        query_parameters.append(bigquery.ScalarQueryParameter("color", "STRING", f"%{color}%"))
-        conditions.append(f"s.color LIKE @color")
-    
-    if material:
-        query_parameters.append(bigquery.ScalarQueryParameter("material", "STRING", f"%{material}%"))
-        conditions.append(f"p.materials LIKE @material")
-    
-    query = f"""
-    SELECT 
-        st.store_name,
-        st.store_id,
-        p.product_name,
-        p.category,
-        p.subcategory,
-        p.brand,
-        p.description,
-        p.base_price,
-        p.materials,
-        p.colors_available,
-        p.warranty_months,
-        s.color,
-        s.available_quantity,
-        s.location_in_store
-    FROM `{project_id}.{dataset}.stock` s
-    JOIN `{project_id}.{dataset}.stores` st ON s.store_id = st.store_id
-    JOIN `{project_id}.{dataset}.products` p ON s.product_id = p.product_id
-    WHERE {" AND ".join(conditions)}
-    ORDER BY p.category, p.product_name
-    """
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=query_parameters
-    )
+    store_id = current_store_id()
     
     try:
-        results = client.query(query, job_config=job_config).result()
+        pager = Pager(
+            "check_our_store_inventory",
+            {"store_id": store_id, "product_name": product_name, "color": color, "material": material},
+            cursor,
+            page_size,
+        )
+        # Resolve the name locally; an empty match means no store can have it
+        product_ids = match_product_ids(product_name)
+        repository, staleness = inventory_source()
+        results, other_results = Page([], pager.offset, 0), []
+        if product_ids != []:
+            results, other_results = repository.our_store_inventory(
+                store_id, product_name, color, material, product_ids=product_ids, limit=pager.size, offset=pager.offset
+            )
+            if other_results:
+                # Nearest stores with a match first, from the precomputed distances
+                other_results = nearest_stores(store_id, other_results)
         
-        if not results.total_rows:
-            # If no items found in our store, check other stores
-            if product_name or color or material:
-                # Build WHERE conditions for other stores search
-                other_where_conditions = ["s.store_id != @store_id", "s.available_quantity > 0"]
-                other_query_params = [bigquery.ScalarQueryParameter("store_id", "STRING", store_id)]
-                
-                if product_name:
-                    other_where_conditions.append("LOWER(p.product_name) LIKE LOWER(@product_name)")
-                    other_query_params.append(bigquery.ScalarQueryParameter("product_name", "STRING", f"%{product_name}%"))
-                
-                if color:
-                    other_where_conditions.append("(LOWER(s.color) LIKE LOWER(@color) OR LOWER(p.colors_available) LIKE LOWER(@color))")
-                    other_query_params.append(bigquery.ScalarQueryParameter("color", "STRING", f"%{color}%"))
-                
-                if material:
-                    other_where_conditions.append("LOWER(p.materials) LIKE LOWER(@material)")
-                    other_query_params.append(bigquery.ScalarQueryParameter("material", "STRING", f"%{material}%"))
-                
-                other_where_clause = " AND ".join(other_where_conditions)
-                
-                # Search for the product in other stores
-                other_stores_query = f"""
-                SELECT 
-                    st.store_name,
-                    st.store_id,
-                    st.address,
-                    st.city,
-                    st.state,
-                    st.zip_code,
-                    st.phone
-                FROM `{project_id}.{dataset}.stock` s
-                JOIN `{project_id}.{dataset}.stores` st ON s.store_id = st.store_id
-                JOIN `{project_id}.{dataset}.products` p ON s.product_id = p.product_id
-                WHERE {other_where_clause}
-                ORDER BY st.store_name
-                LIMIT 5
-                """
-                
-                other_stores_config = bigquery.QueryJobConfig(query_parameters=other_query_params)
-                
-                other_results = client.query(other_stores_query, other_stores_config).result()
-                
-                if other_results.total_rows > 0:
-                    suggestions = []
-                    for row in other_results:
-                        store_info = f"• {row.store_name} (Store {row.store_id}): {row.address}, {row.city}, {row.state} {row.zip_code}, Phone: {row.phone}"
-                        suggestions.append(store_info)
-                    
-                    search_criteria = []
-                    if product_name:
-                        search_criteria.append(f"'{product_name}'")
-                    if color:
-                        search_criteria.append(f"color '{color}'")
-                    if material:
-                        search_criteria.append(f"material '{material}'")
-                    
-                    criteria_text = " with " + " and ".join(search_criteria) if search_criteria else ""
-                    
-                    return f"Sorry, we don't have items{criteria_text} in stock at our store (Downtown Kitchen Gallery).\n\nHowever, I found these options at other locations:\n\n" + "\n\n".join(suggestions)
-                else:
-                    search_criteria = []
-                    if product_name:
-                        search_criteria.append(f"'{product_name}'")
-                    if color:
-                        search_criteria.append(f"color '{color}'")
-                    if material:
-                        search_criteria.append(f"material '{material}'")
-                    
-                    criteria_text = " with " + " and ".join(search_criteria) if search_criteria else ""
-                    return f"Sorry, we don't have items{criteria_text} in stock at our store, and they're not available at other locations either."
-            else:
+        if compact_mode():
+            freshness = {"stale_seconds": int(staleness)} if staleness is not None else {}
+            if results or pager.past_end(results):
+                return render_compact(
+                    f"Inventory for our store {store_id}",
+                    results,
+                    ["product_name", "category", "subcategory", "brand", "materials", "color",
+                     "available_quantity", "location_in_store", "base_price"],
+                    extra={"store_id": store_id, "store_name": results[0].store_name if results else None, **freshness},
+                    paging=functools.partial(pager.compact_fields, results),
+                )
+            return render_compact(
+                f"Not in stock at our store {store_id}; other stores with matches",
+                other_results,
+                ["store_id", "store_name", "distance_miles", "address", "city", "state", "zip_code", "phone"],
+                extra={
+                    "store_id": store_id,
+                    "criteria": {
+                        key: value
+                        for key, value in (("product_name", product_name), ("color", color), ("material", material))
+                        if value
+                    },
+                    **freshness,
+                },
+            )
+        
+        if pager.past_end(results):
+            return f"No more items in stock at our store after the first {pager.offset}; call again without cursor to start over" + staleness_note(staleness)
+        
+        if not results:
+            if not (product_name or color or material):
                 return f"No inventory found for store {store_id}"
+            
+            criteria_text = _criteria_text(product_name, color, material)
+            if other_results:
+                suggestions = []
+                for row in other_results:
+                    distance = f", {row.distance_miles:.1f} mi away" if row.distance_miles is not None else ""
+                    store_info = f"• {row.store_name} (Store {row.store_id}{distance}): {row.address}, {row.city}, {row.state} {row.zip_code}, Phone: {row.phone}"
+                    suggestions.append(store_info)
+                
+                our_store = store_details(store_id)
+                store_name = f" ({our_store.store_name})" if our_store is not None else ""
+                return f"Sorry, we don't have items{criteria_text} in stock at our store{store_name}.\n\nHowever, I found these options at the nearest other locations:\n\n" + "\n\n".join(suggestions) + staleness_note(staleness)
+            
+            return f"Sorry, we don't have items{criteria_text} in stock at our store, and they're not available at other locations either." + staleness_note(staleness)
         
         inventory_list = []
         store_name = None
@@ -164,7 +130,7 @@ def check_our_store_inventory(product_name: Optional[str] = None, color: Optiona
                 + f"  - Base Price: ${row.base_price:.2f}"
             )
         
-        return f"Inventory for {store_name} (Store {store_id}):\n" + "\n".join(inventory_list)
+        return f"Inventory for {store_name} (Store {store_id}):\n" + "\n".join(inventory_list) + pager.note(results) + staleness_note(staleness)
         
     except Exception as e:
         return f"Error checking inventory: {str(e)}"
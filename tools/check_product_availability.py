@@ -1,58 +1,52 @@
 """Check product availability across all stores."""
-import os
-from google.cloud import bigquery
-from dotenv import load_dotenv
+import functools
+from typing import Optional
+from .catalog_index import match_product_ids
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .inventory_mirror import inventory_source, staleness_note
+from .output import compact_mode, render_compact
+from .paging import Pager
+from .repository import Page
 
-load_dotenv()
-
-def check_product_availability(product_name: str) -> str:
+@instrumented
+@coalesced
+def check_product_availability(product_name: str, page_size: Optional[int] = None, cursor: Optional[str] = None) -> str:
     """
     Check product availability across all stores.
     
     Args:
         product_name: Product name to check availability for
+        page_size: Optional number of results per page (default 20)
+        cursor: Optional cursor from the previous page's output, to get the next page
         
     Returns:
-        String with availability information across all stores
+        String with availability information across all stores, one page at a time
     """
-    project_id = os.getenv("BIGQUERY_PROJECT", "adk-demo-469711")
-    dataset = os.getenv("BIGQUERY_DATASET", "mobilis")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT 
-        st.store_name,
-        st.store_id,
-        st.address,
-        st.city,
-        st.state,
-        st.zip_code,
-        st.phone,
-        p.product_name,
-        p.category,
-        p.base_price,
-        s.color,
-        s.available_quantity,
-        s.location_in_store
-    FROM `{project_id}.{dataset}.stock` s
-    JOIN `{project_id}.{dataset}.stores` st ON s.store_id = st.store_id
-    JOIN `{project_id}.{dataset}.products` p ON s.product_id = p.product_id
-    WHERE LOWER(p.product_name) LIKE LOWER(@product_name)
-        AND s.available_quantity > 0
-    ORDER BY st.store_name, p.product_name
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("product_name", "STRING", f"%{product_name}%"),
-        ]
-    )
-    
     try:
-        results = client.query(query, job_config=job_config).result()
+        pager = Pager("check_product_availability", {"product_name": product_name}, cursor, page_size)
+        product_ids = match_product_ids(product_name)
+        repository, staleness = inventory_source()
+        results = Page([], pager.offset, 0)
+        if product_ids != []:
+            results = repository.product_availability(
+                product_name, product_ids=product_ids, limit=pager.size, offset=pager.offset
+            )
+        
+        if compact_mode():
+            return render_compact(
+                f"Availability for '{product_name}'",
+                results,
+                ["product_name", "color", "available_quantity", "base_price"],
+                store_columns=("store_name",),
+                extra={"stale_seconds": int(staleness)} if staleness is not None else None,
+                paging=functools.partial(pager.compact_fields, results),
+            )
+        
+        if pager.past_end(results):
+            return f"No more results for '{product_name}' after the first {pager.offset}; call again without cursor to start over"
         
-        if not results.total_rows:
+        if not results:
             return f"No available stock found for products matching '{product_name}'"
         
         availability_list = []
@@ -62,7 +56,7 @@ def check_product_availability(product_name: str) -> str:
                 + (f" - {row.color}" if row.color else "")
             )
         
-        return f"Product availability for '{product_name}':\n" + "\n".join(availability_list)
+        return f"Product availability for '{product_name}':\n" + "\n".join(availability_list) + pager.note(results) + staleness_note(staleness)
         
     except Exception as e:
         return f"Error checking product availability: {str(e)}"
@@ -0,0 +1,106 @@
+"""Single-flight coalescing: identical concurrent tool calls share one execution."""
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .instrumentation import COALESCED, JOBS_SAVED, current_call, time_remaining
+from .settings import get_settings
+from .store_context import current_store_id
+
+
+# Arguments holding opaque tokens, such as paging cursors, where case and spacing matter
+OPAQUE_ARGUMENTS = frozenset({"cursor"})
+
+
+def normalize(value: Any) -> Hashable:
+    """
+    Reduce an argument to a hashable key that ignores case and spacing.
+
+    Lists keep their order because tools answer per item in order.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, normalize(item)) for key, item in value.items()))
+    return value
+
+
+class _Flight:
+    """One in-progress execution that later callers wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.jobs = 0
+        self.stale_seconds: Optional[float] = None
+
+
+def coalesced(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Share one execution among identical concurrent calls of a tool.
+
+    Calls are identical when they are for the same store (see store_context)
+    and their arguments, bound to the tool's signature with defaults applied,
+    normalize to the same key (OPAQUE_ARGUMENTS are compared as given). The
+    first caller runs the tool; callers arriving before it finishes wait and
+    receive the same result (or exception). A caller waits no longer than its
+    own deadline; if the first call has not finished by then, it runs the
+    tool itself, which answers from the last known good result or with the
+    deadline error. Nothing is kept once the call completes, so this never
+    serves stale data; see cache.ttl_cache for that.
+    """
+    tool = func.__name__
+    signature = inspect.signature(func)
+    flights: Dict[Tuple, _Flight] = {}
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not get_settings().tool_coalescing:
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (current_store_id(),) + tuple(
+            (name, value if name in OPAQUE_ARGUMENTS else normalize(value)) for name, value in bound.arguments.items()
+        )
+
+        with lock:
+            flight = flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = flights[key] = _Flight()
+
+        if not leader:
+            remaining = time_remaining()
+            if not flight.done.wait(None if remaining is None else max(0.0, remaining)):
+                return func(*args, **kwargs)
+            COALESCED.inc(tool)
+            JOBS_SAVED.inc(tool, amount=flight.jobs)
+            call = current_call()
+            if call is not None:
+                call.coalesced = True
+                call.stale_seconds = flight.stale_seconds
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            call = current_call()
+            flight.jobs = len(call.jobs) if call is not None else 0
+            flight.stale_seconds = call.stale_seconds if call is not None else None
+            with lock:
+                del flights[key]
+            flight.done.set()
+        return flight.result
+
+    return wrapper
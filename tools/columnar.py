@@ -0,0 +1,86 @@
+"""Column-oriented query results, downloaded as Arrow tables when pyarrow is installed."""
+import functools
+import importlib.util
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .repository import Record
+
+
+@functools.lru_cache(maxsize=None)
+def arrow_available() -> bool:
+    """Whether pyarrow is installed, so BigQuery results can be fetched as Arrow tables."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def storage_api_available() -> bool:
+    """Whether the BigQuery Storage Read API client is installed for parallel bulk downloads."""
+    try:
+        return importlib.util.find_spec("google.cloud.bigquery_storage") is not None
+    except ImportError:
+        return False
+
+
+class Columns:
+    """
+    A result set held as one list per column.
+
+    Built from an Arrow table, which converts each column in a single call,
+    or by transposing rows when pyarrow is not installed. Tools aggregate and
+    format it column by column instead of handling one row object at a time.
+
+    Like LimitedRows, limit is set when the query was cut short by its budget.
+    """
+
+    def __init__(self, data: Dict[str, List[Any]], limit: Optional[int] = None):
+        self.data = data
+        self.limit = limit
+
+    @classmethod
+    def from_arrow(cls, table: Any, limit: Optional[int] = None) -> "Columns":
+        """Columns of a pyarrow.Table."""
+        return cls(table.to_pydict(), limit)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any], names: Optional[Sequence[str]] = None) -> "Columns":
+        """
+        Transpose rows into columns.
+
+        Args:
+            rows: Rows supporting row[name] (bigquery.Row, Record)
+            names: Columns to keep; defaults to every column of the first row
+        """
+        limit = getattr(rows, "limit", None)
+        rows = list(rows)
+        if names is None:
+            names = list(rows[0].keys()) if rows else []
+        return cls({name: [row[name] for row in rows] for name in names}, limit)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.data.values()), ()))
+
+    def __getitem__(self, name: str) -> List[Any]:
+        return self.data[name]
+
+    def head(self, count: int) -> List[Record]:
+        """The first count rows as Records, e.g. for render_compact."""
+        names = list(self.data)
+        values = zip(*(column[:count] for column in self.data.values()))
+        return [Record(zip(names, row)) for row in values]
+
+
+def runs(keys: Sequence[Any]) -> Iterator[Tuple[Any, int, int]]:
+    """
+    Split a column into runs of equal consecutive values.
+
+    Grouping a column the query sorted by needs no hash table: every group
+    is one run.
+
+    Yields:
+        (value, start, stop) for each run, as slice bounds into the columns
+    """
+    start = 0
+    for i in range(1, len(keys) + 1):
+        if i == len(keys) or keys[i] != keys[start]:
+            yield keys[start], start, i
+            start = i
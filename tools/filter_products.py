@@ -0,0 +1,155 @@
+"""Search the catalog by any combination of filters in one lookup."""
+from typing import Optional
+from .catalog_index import match_product_ids
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .inventory_mirror import inventory_source, staleness_note
+from .output import compact_mode, render_compact
+from .repository import PRODUCT_ORDERS
+
+MAX_TOP_K = 50
+
+SORT_LABELS = {
+    "price": "cheapest first",
+    "price_desc": "most expensive first",
+    "stock": "most in stock first",
+    "name": "by name",
+}
+
+
+def _describe_filters(filters: dict) -> str:
+    """Describe the filters for headers and "not found" messages."""
+    labels = {"product_name": "name", "store_id": "store"}
+    parts = []
+    for key, value in filters.items():
+        if key == "min_price":
+            parts.append(f"from ${value:.2f}")
+        elif key == "max_price":
+            parts.append(f"up to ${value:.2f}")
+        else:
+            parts.append(f"{labels.get(key, key)} '{value}'")
+    return ", ".join(parts) if parts else "any"
+
+
+@instrumented
+@coalesced
+def filter_products(
+    product_name: Optional[str] = None,
+    category: Optional[str] = None,
+    subcategory: Optional[str] = None,
+    brand: Optional[str] = None,
+    color: Optional[str] = None,
+    material: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    store_id: Optional[str] = None,
+    in_stock_only: bool = True,
+    sort_by: str = "price",
+    top_k: int = 10,
+) -> str:
+    """
+    Find products by any combination of name, category, subcategory, brand,
+    color, material, price range and store, e.g. "dining tables under $500"
+    or "black leather chairs at our store". Every filter is applied in a
+    single lookup.
+    
+    Args:
+        product_name: Optional words from the product name
+        category: Optional category, e.g. "Kitchen" or "Living Room"
+        subcategory: Optional subcategory, e.g. "Tables" or "Sofas"
+        brand: Optional brand name
+        color: Optional color the product must be in stock in
+        material: Optional material, e.g. "Oak" or "Leather"
+        min_price: Optional lowest price in dollars
+        max_price: Optional highest price in dollars
+        store_id: Optional store ID to count stock at that store only (our store's ID for "here")
+        in_stock_only: Only products with matching stock (default True)
+        sort_by: "price" (cheapest first, default), "price_desc", "stock" or "name"
+        top_k: Maximum number of products to return (default 10, at most 50)
+        
+    Returns:
+        String with the matching products, their prices and matching stock
+    """
+    try:
+        if sort_by not in PRODUCT_ORDERS:
+            return f"Error filtering products: unknown sort_by '{sort_by}'; use one of " + ", ".join(PRODUCT_ORDERS)
+        
+        filters = {
+            key: value
+            for key, value in (
+                ("product_name", product_name), ("category", category), ("subcategory", subcategory),
+                ("brand", brand), ("color", color), ("material", material),
+                ("min_price", min_price), ("max_price", max_price), ("store_id", store_id),
+            )
+            if value is not None and value != ""
+        }
+        top_k = max(1, min(int(top_k), MAX_TOP_K))
+        
+        product_ids = match_product_ids(product_name)
+        repository, staleness = inventory_source()
+        results = []
+        if product_ids != []:
+            results = repository.filter_products(
+                product_name,
+                product_ids=product_ids,
+                category=category,
+                subcategory=subcategory,
+                brand=brand,
+                color=color,
+                material=material,
+                min_price=min_price,
+                max_price=max_price,
+                store_id=store_id,
+                in_stock_only=in_stock_only,
+                order_by=sort_by,
+                # One extra row tells whether there are more than top_k
+                limit=top_k + 1,
+            )
+        more = len(results) > top_k
+        results = results[:top_k]
+        
+        if compact_mode():
+            columns = ["product_name", "category", "subcategory", "brand", "base_price",
+                       "available_quantity", "stores_with_stock", "colors_in_stock"]
+            if store_id:
+                columns.append("location_in_store")
+            extra = {"filters": filters, "sort_by": sort_by}
+            if more:
+                extra["more_results"] = True
+            if staleness is not None:
+                extra["stale_seconds"] = int(staleness)
+            return render_compact("Products matching filters", results, columns, extra=extra)
+        
+        if not results:
+            stock = " in stock" if in_stock_only else ""
+            return f"No products{stock} found matching {_describe_filters(filters)}" + staleness_note(staleness)
+        
+        products_list = []
+        for position, row in enumerate(results, 1):
+            if not row.available_quantity:
+                availability = "Currently out of stock" + (f" at store {store_id}" if store_id else "")
+            elif store_id:
+                availability = f"{row.available_quantity} available at store {store_id} ({row.location_in_store})"
+            else:
+                availability = f"{row.available_quantity} available across {row.stores_with_stock} store(s)"
+            if row.colors_in_stock:
+                availability += f" in {row.colors_in_stock}"
+            products_list.append(
+                f"{position}. {row.product_name} ({row.category} - {row.subcategory}, {row.brand}) - ${row.base_price:.2f}\n"
+                f"   Materials: {row.materials}\n"
+                f"   {availability}"
+            )
+        
+        footer = ""
+        if more:
+            footer = f"\n\n(Showing the top {top_k}; " + (
+                "narrow the filters or raise top_k to see more.)" if top_k < MAX_TOP_K else "narrow the filters to see more.)"
+            )
+        
+        return (
+            f"Products matching {_describe_filters(filters)} ({SORT_LABELS[sort_by]}):\n"
+            + "\n".join(products_list) + footer + staleness_note(staleness)
+        )
+        
+    except Exception as e:
+        return f"Error filtering products: {str(e)}"
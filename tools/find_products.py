@@ -0,0 +1,75 @@
+"""Ranked, typo-tolerant product search across the catalog."""
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .output import compact_mode, render_compact
+from .repository import Record, get_repository
+from .search_engine import get_search_engine
+
+@instrumented
+@coalesced
+def find_products(query: str, top_k: int = 10) -> str:
+    """
+    Find the best matching products for a free-text description, tolerating
+    typos and spelling variants (e.g. "kichen chair", "barstool").
+    
+    Args:
+        query: What the customer is looking for, in their own words
+        top_k: Maximum number of products to return (default 10)
+        
+    Returns:
+        String with ranked products, prices and current stock across stores
+    """
+    try:
+        engine = get_search_engine()
+        if engine is None:
+            return "Ranked search is unavailable right now; use search_products instead."
+        
+        ranked, corrections = engine.search(query, top_k=max(1, min(int(top_k), 50)))
+        if not ranked:
+            return f"No products found matching '{query}'"
+        
+        # One query confirms live stock for all ranked products, aggregated per
+        # product so no row limit can leave a stocked product out
+        product_ids = [product_id for _, product_id in ranked]
+        stock = {
+            row.product_id: {"quantity": row.available_quantity, "stores": row.stores_with_stock}
+            for row in get_repository().filter_products(product_ids=product_ids, limit=len(product_ids))
+        }
+        
+        if compact_mode():
+            rows = []
+            for product_id in product_ids:
+                entry = stock.get(product_id)
+                rows.append(Record(
+                    engine.index.products[product_id],
+                    available_quantity=entry["quantity"] if entry else 0,
+                    stores_with_stock=entry["stores"] if entry else 0,
+                ))
+            return render_compact(
+                f"Best matches for '{query}'",
+                rows,
+                ["product_name", "category", "subcategory", "brand", "base_price", "available_quantity", "stores_with_stock"],
+                extra={"interpreted": corrections} if corrections else None,
+            )
+        
+        products_list = []
+        for position, product_id in enumerate(product_ids, 1):
+            product = engine.index.products[product_id]
+            entry = stock.get(product_id)
+            availability = (
+                f"{entry['quantity']} available across {entry['stores']} store(s)"
+                if entry else "Currently out of stock"
+            )
+            products_list.append(
+                f"{position}. {product.product_name} ({product.category} - {product.subcategory}, {product.brand}) - ${product.base_price:.2f}\n"
+                f"   {availability}"
+            )
+        
+        header = f"Best matches for '{query}'"
+        if corrections:
+            header += " (interpreted " + ", ".join(f"'{word}' as '{term}'" for word, term in corrections.items()) + ")"
+        
+        return header + ":\n" + "\n".join(products_list)
+        
+    except Exception as e:
+        return f"Error finding products: {str(e)}"
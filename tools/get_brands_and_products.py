@@ -1,10 +1,19 @@
-import os
-from google.cloud import bigquery
+from .cache import ttl_cache
+from .coalesce import coalesced
+from .columnar import Columns, runs
+from .instrumentation import instrumented
+from .output import compact_mode, limited_note, render_compact
+from .repository import get_repository
 from typing import Optional
-from dotenv import load_dotenv
 
-load_dotenv()
+@ttl_cache("get_brands_and_products")
+def _fetch_brands() -> Columns:
+    """Fetch products with their brands, cached because the catalog rarely changes."""
+    return get_repository().brands_and_products_columns()
 
+
+@instrumented
+@coalesced
 def get_brands_and_products() -> str:
     """
     Get all brands and their associated products from the database.
@@ -12,59 +21,35 @@ def get_brands_and_products() -> str:
     Returns:
         String with all brands and their products grouped by brand
     """
-    project_id = os.getenv("PROJECT_ID", "adk-demo-469711")
-    dataset = os.getenv("DATASET", "mobilis")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT 
-        brand,
-        product_name,
-        category,
-        subcategory,
-        base_price
-    FROM `{project_id}.{dataset}.products`
-    WHERE brand IS NOT NULL
-    ORDER BY brand, product_name
-    """
-    
     try:
-        results = client.query(query).result()
+        results = _fetch_brands()
         
-        if not results.total_rows:
-            return "No brands found in the database."
+        if compact_mode():
+            return render_compact(
+                "Brands and their products",
+                results,
+                ["brand", "product_name", "category", "subcategory", "base_price"],
+            )
         
-        # Group products by brand
-        brands = {}
-        for row in results:
-            brand = row.brand
-            product_info = {
-                'name': row.product_name,
-                'category': row.category,
-                'subcategory': row.subcategory,
-                'price': row.base_price
-            }
-            
-            if brand not in brands:
-                brands[brand] = []
-            brands[brand].append(product_info)
+        if not len(results):
+            return "No brands found in the database."
         
-        # Format output
+        # Rows arrive sorted by brand, so each brand is one run of the columns
+        names, categories = results["product_name"], results["category"]
+        subcategories, prices = results["subcategory"], results["base_price"]
         brand_list = []
-        for brand, products in brands.items():
-            brand_list.append(f"**{brand}** ({len(products)} products)")
-            
-            for product in products:
-                product_line = f"  • {product['name']} ({product['category']}"
-                if product['subcategory']:
-                    product_line += f" - {product['subcategory']}"
-                product_line += f") - ${product['price']:.2f}"
-                brand_list.append(product_line)
-            
+        for brand, start, stop in runs(results["brand"]):
+            brand_list.append(f"**{brand}** ({stop - start} products)")
+            brand_list.extend(
+                f"  • {name} ({category} - {subcategory}) - ${price:.2f}" if subcategory
+                else f"  • {name} ({category}) - ${price:.2f}"
+                for name, category, subcategory, price in zip(
+                    names[start:stop], categories[start:stop], subcategories[start:stop], prices[start:stop]
+                )
+            )
             brand_list.append("")  # Add spacing between brands
         
-        return "Available Brands and Their Products:\n\n" + "\n".join(brand_list[:-1])  # Remove last empty line
+        return "Available Brands and Their Products:\n\n" + "\n".join(brand_list[:-1]) + limited_note(results)  # Remove last empty line
         
     except Exception as e:
         return f"Error retrieving brands and products: {str(e)}"
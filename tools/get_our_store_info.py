@@ -1,44 +1,31 @@
 """Get information about our specific store."""
-import os
-from google.cloud import bigquery
-from dotenv import load_dotenv
-
-load_dotenv()
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .output import compact_mode, render_compact
+from .repository import get_repository
+from .store_context import current_store_id, store_details
 
+@instrumented
+@coalesced
 def test_store_exists() -> str:
     """Test if our store ID exists in the database."""
-    project_id = os.getenv("BIGQUERY_PROJECT", "adk-demo-469711")
-    dataset = os.getenv("BIGQUERY_DATASET", "mobilis")
-    store_id = os.getenv("STORE_ID", "STORE_001")
-    
-    client = bigquery.Client(project=project_id)
+    store_id = current_store_id()
     
     try:
-        # Test 1: Check if any stores exist
-        query1 = f"SELECT COUNT(*) as total FROM `{project_id}.{dataset}.stores`"
-        results1 = client.query(query1).result()
-        total_stores = list(results1)[0].total
-        
-        # Test 2: List first 5 store IDs
-        query2 = f"SELECT store_id FROM `{project_id}.{dataset}.stores` LIMIT 5"
-        results2 = client.query(query2).result()
-        existing_stores = [row.store_id for row in results2]
-        
-        # Test 3: Check if our specific store exists
-        query3 = f"SELECT COUNT(*) as found FROM `{project_id}.{dataset}.stores` WHERE store_id = '{store_id}'"
-        results3 = client.query(query3).result()
-        store_found = list(results3)[0].found
+        diagnostics = get_repository().store_diagnostics(store_id, sample_size=5)
         
         return f"""Store Test Results:
-• Total stores in database: {total_stores}
-• Sample store IDs: {existing_stores}
+• Total stores in database: {diagnostics["total_stores"]}
+• Sample store IDs: {diagnostics["sample_store_ids"]}
 • Looking for store: {store_id}
-• Store found: {'YES' if store_found > 0 else 'NO'}"""
+• Store found: {'YES' if diagnostics["found"] else 'NO'}"""
         
     except Exception as e:
         return f"Error testing store: {str(e)}"
 
 
+@instrumented
+@coalesced
 def get_our_store_info() -> str:
     """
     Get information about our specific store.
@@ -46,37 +33,19 @@ def get_our_store_info() -> str:
     Returns:
         String with store information
     """
-    project_id = os.getenv("BIGQUERY_PROJECT", "adk-demo-469711")
-    dataset = os.getenv("BIGQUERY_DATASET", "mobilis")
-    store_id = os.getenv("STORE_ID", "STORE_001")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT 
-        store_id,
-        store_name,
-        address,
-        city,
-        state,
-        zip_code,
-        phone,
-        manager,
-        store_type
-    FROM `{project_id}.{dataset}.stores`
-    WHERE store_id = @store_id
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("store_id", "STRING", store_id),
-        ]
-    )
+    store_id = current_store_id()
     
     try:
-        results = client.query(query, job_config=job_config).result()
+        row = store_details(store_id)
+        
+        if compact_mode():
+            return render_compact(
+                f"Our store {store_id}",
+                [row] if row is not None else [],
+                ["store_id", "store_name", "address", "city", "state", "zip_code", "phone", "manager", "store_type"],
+            )
         
-        for row in results:
+        if row is not None:
             return f"""Store {row.store_id} Information:
 • Store Name: {row.store_name}
 • Address: {row.address}
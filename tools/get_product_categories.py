@@ -1,10 +1,19 @@
-import os
-from google.cloud import bigquery
+from .cache import ttl_cache
+from .coalesce import coalesced
+from .columnar import Columns, runs
+from .instrumentation import instrumented
+from .output import compact_mode, render_compact
+from .repository import get_repository
 from typing import Optional
-from dotenv import load_dotenv
 
-load_dotenv()
+@ttl_cache("get_product_categories")
+def _fetch_categories() -> Columns:
+    """Fetch category/subcategory counts, cached because the catalog rarely changes."""
+    return get_repository().product_categories_columns()
 
+
+@instrumented
+@coalesced
 def get_product_categories() -> str:
     """
     Get all product categories and subcategories available in the database.
@@ -12,45 +21,24 @@ def get_product_categories() -> str:
     Returns:
         String with all available product categories and subcategories
     """
-    project_id = os.getenv("PROJECT_ID", "adk-demo-469711")
-    dataset = os.getenv("DATASET", "mobilis")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT DISTINCT 
-        category,
-        subcategory,
-        COUNT(*) as product_count
-    FROM `{project_id}.{dataset}.products`
-    WHERE category IS NOT NULL
-    GROUP BY category, subcategory
-    ORDER BY category, subcategory
-    """
-    
     try:
-        results = client.query(query).result()
+        results = _fetch_categories()
         
-        if not results.total_rows:
-            return "No product categories found in the database."
+        if compact_mode():
+            return render_compact("Product categories", results, ["category", "subcategory", "product_count"])
         
-        # Group by category
-        categories = {}
-        for row in results:
-            category = row.category
-            subcategory = row.subcategory or "General"
-            product_count = row.product_count
-            
-            if category not in categories:
-                categories[category] = []
-            categories[category].append(f"  • {subcategory} ({product_count} products)")
+        if not len(results):
+            return "No product categories found in the database."
         
-        # Format output
+        # Rows arrive sorted by category, so each category is one run of the columns
+        subcategories, counts = results["subcategory"], results["product_count"]
         category_list = []
-        for category, subcategories in categories.items():
-            total_products = sum(int(sub.split('(')[1].split(' ')[0]) for sub in subcategories)
-            category_list.append(f"**{category}** ({total_products} total products)")
-            category_list.extend(subcategories)
+        for category, start, stop in runs(results["category"]):
+            category_list.append(f"**{category}** ({sum(counts[start:stop])} total products)")
+            category_list.extend(
+                f"  • {subcategory or 'General'} ({count} products)"
+                for subcategory, count in zip(subcategories[start:stop], counts[start:stop])
+            )
             category_list.append("")  # Add spacing
         
         return "Available Product Categories:\n\n" + "\n".join(category_list[:-1])  # Remove last empty line
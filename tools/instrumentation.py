@@ -0,0 +1,279 @@
+"""Per-tool call metrics: timing, BigQuery job statistics and output size."""
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .output import mark_stale
+from .settings import get_settings
+
+logger = logging.getLogger("tools.metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9, 1e10, 1e11)
+COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 100000)
+SLOT_BUCKETS = (10, 100, 1e3, 1e4, 1e5, 1e6)
+OUTPUT_BUCKETS = (100, 500, 1e3, 5e3, 1e4, 5e4, 1e5)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label value."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], label: str = "tool"):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._series: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float) -> None:
+        with self._lock:
+            # Per-bucket counts, then sum and count
+            series = self._series.setdefault(label_value, [0.0] * (len(self.buckets) + 3))
+            series[bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                labels = f'{self.label}="{label_value}"'
+                cumulative = 0.0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    lines.append(f'{self.name}_bucket{{{labels},le="{bound:g}"}} {cumulative:g}')
+                lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {series[-1]:g}')
+                lines.append(f"{self.name}_sum{{{labels}}} {series[-2]:g}")
+                lines.append(f"{self.name}_count{{{labels}}} {series[-1]:g}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                labels = ",".join(f'{label}="{value_}"' for label, value_ in zip(self.labels, label_values))
+                lines.append(f"{self.name}{{{labels}}} {value:g}")
+        return lines
+
+
+CALL_SECONDS = Histogram("tool_call_duration_seconds", "Wall time of a tool call", LATENCY_BUCKETS)
+BYTES_PROCESSED = Histogram("tool_bigquery_bytes_processed", "BigQuery bytes processed per tool call", BYTES_BUCKETS)
+SLOT_MILLIS = Histogram("tool_bigquery_slot_milliseconds", "BigQuery slot milliseconds per tool call", SLOT_BUCKETS)
+ROWS = Histogram("tool_rows_fetched", "Rows read from the data backend per tool call", COUNT_BUCKETS)
+OUTPUT_BYTES = Histogram("tool_output_bytes", "Size of the text returned to the model", OUTPUT_BUCKETS)
+CALLS = Counter("tool_calls_total", "Tool calls by outcome", ("tool", "status"))
+JOBS = Counter("tool_bigquery_jobs_total", "BigQuery jobs started by tool calls", ("tool", "cache_hit"))
+COALESCED = Counter("tool_coalesced_calls_total", "Calls answered by an identical call already in flight", ("tool",))
+JOBS_SAVED = Counter("tool_bigquery_jobs_saved_total", "BigQuery jobs avoided by coalescing identical calls", ("tool",))
+HEDGED = Counter("tool_bigquery_hedged_jobs_total", "Duplicate jobs started for queries slower than their p95", ("tool",))
+
+METRICS = [CALL_SECONDS, BYTES_PROCESSED, SLOT_MILLIS, ROWS, OUTPUT_BYTES, CALLS, JOBS, COALESCED, JOBS_SAVED, HEDGED]
+
+
+class CallStats:
+    """Backend work attributed to one tool call."""
+
+    def __init__(self, tool: str, deadline: Optional[float] = None):
+        self.tool = tool
+        self.deadline = deadline
+        self.jobs: List[Dict[str, Any]] = []
+        self.rows = 0
+        self.coalesced = False
+        self.stale_seconds: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_ids": [job["job_id"] for job in self.jobs if job["job_id"]],
+            "bytes_processed": sum(job["bytes_processed"] for job in self.jobs),
+            "slot_millis": sum(job["slot_millis"] for job in self.jobs),
+            "cache_hits": sum(1 for job in self.jobs if job["cache_hit"]),
+            "rows": self.rows,
+            "coalesced": self.coalesced,
+            "stale_seconds": round(self.stale_seconds, 1) if self.stale_seconds is not None else None,
+        }
+
+
+_current: contextvars.ContextVar[Optional[CallStats]] = contextvars.ContextVar("tool_call_stats", default=None)
+
+
+def current_call() -> Optional[CallStats]:
+    """Stats of the tool call in progress, or None outside tool calls."""
+    return _current.get()
+
+
+def current_tool() -> Optional[str]:
+    """Name of the tool whose call is in progress, or None outside tool calls."""
+    stats = _current.get()
+    return stats.tool if stats is not None else None
+
+
+def time_remaining() -> Optional[float]:
+    """Seconds left before the deadline of the tool call in progress, or None without one."""
+    stats = _current.get()
+    if stats is None or stats.deadline is None:
+        return None
+    return stats.deadline - time.monotonic()
+
+
+def record_stale(age: float) -> None:
+    """Note that the tool call in progress used a result age seconds old instead of a fresh query."""
+    stats = _current.get()
+    if stats is not None:
+        stats.stale_seconds = max(age, stats.stale_seconds or 0.0)
+
+
+def record_query(job: Any, row_count: int) -> None:
+    """
+    Attribute a finished query to the tool call in progress, if any.
+
+    Args:
+        job: The bigquery.QueryJob, or None for backends without jobs
+        row_count: Rows the query returned
+    """
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.rows += row_count
+    if job is not None:
+        stats.jobs.append({
+            "job_id": getattr(job, "job_id", None),
+            "bytes_processed": getattr(job, "total_bytes_processed", None) or 0,
+            "slot_millis": getattr(job, "slot_millis", None) or 0,
+            "cache_hit": bool(getattr(job, "cache_hit", False)),
+        })
+
+
+def instrumented(func: Callable[..., str]) -> Callable[..., str]:
+    """
+    Record metrics and a structured log line for every call of a tool.
+
+    Tools report failures as strings starting with "Error", so the status is
+    taken from the returned text as well as from raised exceptions. The call
+    gets TOOL_DEADLINE_SECONDS (or TOOL_DEADLINE_SECONDS_<TOOL>; 0 for none)
+    that its queries must finish within, and output built from last known
+    good results is marked stale.
+    """
+    tool = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        budget = get_settings().for_tool("tool_deadline_seconds", tool)
+        stats = CallStats(tool, time.monotonic() + budget if budget > 0 else None)
+        token = _current.set(stats)
+        status = "ok"
+        output = ""
+        start = time.perf_counter()
+        try:
+            output = func(*args, **kwargs)
+            if isinstance(output, str) and output.startswith("Error"):
+                status = "error"
+            elif isinstance(output, str) and stats.stale_seconds is not None:
+                status = "stale"
+                output = mark_stale(output, stats.stale_seconds)
+            return output
+        except Exception:
+            status = "exception"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            _observe(stats, status, elapsed, len(output.encode("utf-8")) if isinstance(output, str) else 0)
+
+    return wrapper
+
+
+def _observe(stats: CallStats, status: str, elapsed: float, output_bytes: int) -> None:
+    summary = stats.to_dict()
+    CALL_SECONDS.observe(stats.tool, elapsed)
+    ROWS.observe(stats.tool, summary["rows"])
+    OUTPUT_BYTES.observe(stats.tool, output_bytes)
+    CALLS.inc(stats.tool, status)
+    if stats.jobs:
+        BYTES_PROCESSED.observe(stats.tool, summary["bytes_processed"])
+        SLOT_MILLIS.observe(stats.tool, summary["slot_millis"])
+    for job in stats.jobs:
+        JOBS.inc(stats.tool, "true" if job["cache_hit"] else "false")
+
+    logger.info(json.dumps({
+        "event": "tool_call",
+        "tool": stats.tool,
+        "status": status,
+        "duration_ms": round(elapsed * 1000, 3),
+        "jobs": len(stats.jobs),
+        **summary,
+        "output_bytes": output_bytes,
+    }))
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+_server: Any = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None) -> Any:
+    """
+    Serve /metrics on a daemon thread (once per process).
+
+    Args:
+        port: Port to listen on (0 picks a free one); defaults to
+            METRICS_PORT, and nothing is started when that is unset
+
+    Returns:
+        The running ThreadingHTTPServer, or None when no port is configured
+    """
+    global _server
+    if port is None:
+        port = get_settings().metrics_port
+        if not port:
+            return None
+
+    # Only imported when metrics are actually served, to keep cold start lean
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+            logger.info("Serving tool metrics on :%d/metrics", _server.server_address[1])
+        return _server
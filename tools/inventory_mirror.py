@@ -0,0 +1,295 @@
+"""Local mirror of the inventory kept current by watermark-based delta sync."""
+import logging
+import threading
+import time
+from typing import Any, Iterable, List, Optional, Tuple
+
+from .local_repository import LocalRepository, copy_snapshot
+from .repository import InventoryRepository, get_repository
+from .settings import get_settings
+from .shared_snapshot import get_shared_snapshot, holds_refresh_lock
+
+logger = logging.getLogger(__name__)
+
+
+def _enabled() -> bool:
+    return get_settings().inventory_mirror
+
+
+def _sync_interval() -> float:
+    return get_settings().mirror_sync_seconds
+
+
+def _full_sync_interval() -> float:
+    return get_settings().mirror_full_sync_seconds
+
+
+def _max_staleness() -> float:
+    return get_settings().mirror_max_staleness_seconds
+
+
+def _max_delta_rows() -> int:
+    return get_settings().mirror_max_delta_rows
+
+
+def _latest(values: Iterable[Any], current: Optional[str] = None) -> Optional[str]:
+    """Latest of the last_updated values as an ISO string, never moving backwards from current."""
+    latest = max(
+        (value.isoformat() if hasattr(value, "isoformat") else value for value in values if value is not None),
+        default=None,
+    )
+    if current is not None and (latest is None or current > latest):
+        return current
+    return latest
+
+
+def _watermark(rows: List[Any], current: Optional[str] = None) -> Optional[str]:
+    """Latest last_updated among rows as an ISO string, never moving backwards from current."""
+    return _latest((row.get("last_updated") for row in rows), current)
+
+
+class InventoryMirror:
+    """
+    Copy of the stores, products and stock tables served from embedded SQLite.
+
+    A full sync copies every table, or with SHARED_SNAPSHOT_DIR set opens
+    the database shared by every worker. Delta syncs then pull only stock rows
+    whose last_updated is at or after the watermark (the newest last_updated
+    seen so far) and upsert them. Rows at the watermark itself are re-read
+    every time, so a row written later with that same timestamp is not lost.
+    Deleted rows and catalog changes are picked up by the periodic full sync.
+
+    Args:
+        source: Repository holding the live data
+    """
+
+    def __init__(self, source: InventoryRepository):
+        self.source = source
+        self.repository: Optional[LocalRepository] = None
+        self.watermark: Optional[str] = None
+        self.synced_at: Optional[float] = None
+        self.full_synced_at: Optional[float] = None
+        # Shared snapshot database in use, and whether this process writes stock changes to it
+        self.database_path: Optional[str] = None
+        self.writer = False
+        # False when stock has no last_updated column, so delta syncs are impossible
+        self.delta_sync = True
+        self.loaded = threading.Event()
+        self._lock = threading.Lock()
+
+    def staleness(self) -> Optional[float]:
+        """Seconds since the data was last known to match the source, or None before the first sync."""
+        if self.synced_at is None:
+            return None
+        return time.time() - self.synced_at
+
+    def full_sync(self) -> None:
+        """
+        Replace the mirror with a fresh copy of every table.
+
+        With SHARED_SNAPSHOT_DIR set nothing is copied; see _open_shared().
+        """
+        if get_settings().shared_snapshot_dir:
+            self._open_shared()
+            return
+
+        started = time.time()
+        snapshot = copy_snapshot(self.source)
+        repository = LocalRepository(snapshot)
+        with self._lock:
+            self.repository = repository
+            self.watermark = _watermark(snapshot["stock"])
+            self.synced_at = self.full_synced_at = started
+            self.delta_sync = not snapshot["stock"] or "last_updated" in snapshot["stock"][0]
+        self.loaded.set()
+        logger.info("Inventory mirror loaded: %d stock rows", len(snapshot["stock"]))
+
+    def _open_shared(self) -> None:
+        """
+        Open the database published with the current shared snapshot.
+
+        Every worker reads the same file, so none holds its own copy. Only the
+        process holding the refresh lock reads stock changes from the source
+        and writes them to the database, with the watermark and sync time
+        stored next to them for the other workers. Until the first snapshot
+        is published the mirror stays unloaded.
+        """
+        shared = get_shared_snapshot()
+        if shared is None:
+            logger.debug("Inventory mirror waiting for the first shared snapshot")
+            return
+        stock = shared.table("stock")
+        writer = holds_refresh_lock()
+        repository = LocalRepository.from_database(shared.database_path, read_only=not writer)
+        watermark, synced_at = repository.sync_state()
+        has_watermark = "last_updated" in stock.names
+        if writer and has_watermark:
+            started = time.time()
+            watermark = watermark or _latest(stock.column("last_updated"))
+            if watermark is not None:
+                rows = self.source.stock_changes(watermark)
+                repository.upsert_stock(rows)
+                watermark = _watermark(rows, watermark)
+            repository.set_sync_state(watermark, started)
+            synced_at = started
+        with self._lock:
+            self.repository = repository
+            self.database_path = shared.database_path
+            self.writer = writer
+            self.watermark = watermark
+            # Before the first delta sync the data is as fresh as the snapshot
+            self.synced_at = synced_at or shared.created_at
+            self.full_synced_at = time.time()
+            self.delta_sync = not len(stock) or has_watermark
+        self.loaded.set()
+        logger.info("Inventory mirror opened shared snapshot %s (%s)", shared.version, "writer" if writer else "reader")
+
+    def _full_sync_due(self) -> bool:
+        if self.repository is None or time.time() - self.full_synced_at >= _full_sync_interval():
+            return True
+        if self.database_path is None:
+            return False
+        # A newer shared snapshot, or the refresh lock changed hands
+        shared = get_shared_snapshot()
+        return shared is None or shared.database_path != self.database_path or self.writer != holds_refresh_lock()
+
+    def sync(self) -> None:
+        """Apply stock changes since the watermark, or resync fully when due."""
+        if self._full_sync_due():
+            self.full_sync()
+            return
+        if self.database_path is not None and not self.writer:
+            # Another worker writes the changes; pick up how far it got
+            watermark, synced_at = self.repository.sync_state()
+            with self._lock:
+                self.watermark = watermark
+                self.synced_at = synced_at or self.synced_at
+            return
+        if self.watermark is None:
+            # No stock rows yet; the next full sync picks them up
+            return
+
+        started = time.time()
+        rows = self.source.stock_changes(self.watermark)
+        if len(rows) > _max_delta_rows() and self.database_path is None:
+            logger.info("Inventory mirror delta of %d rows; resyncing fully", len(rows))
+            self.full_sync()
+            return
+
+        self.repository.upsert_stock(rows)
+        watermark = _watermark(rows, self.watermark)
+        if self.writer:
+            self.repository.set_sync_state(watermark, started)
+        with self._lock:
+            self.watermark = watermark
+            self.synced_at = started
+        logger.debug("Inventory mirror applied %d changed stock rows", len(rows))
+
+
+_mirror: Optional[InventoryMirror] = None
+_lock = threading.Lock()
+_syncer: Optional[threading.Thread] = None
+_wake = threading.Event()
+# Source whose stock has no last_updated column; it is queried directly instead
+_unsupported_source: Optional[InventoryRepository] = None
+
+
+def _disable(mirror: InventoryMirror) -> None:
+    global _mirror, _unsupported_source
+    with _lock:
+        if _mirror is mirror:
+            _mirror = None
+        _unsupported_source = mirror.source
+    logger.warning(
+        "stock has no last_updated column, so the inventory mirror cannot be kept current; "
+        "it is disabled and lookups query the source (set INVENTORY_MIRROR=false to skip the copy)"
+    )
+
+
+def _sync_loop() -> None:
+    delay = 0.0
+    failures = 0
+    while True:
+        _wake.wait(delay)
+        _wake.clear()
+        delay = _sync_interval()
+        mirror = _mirror
+        if mirror is None:
+            continue
+        try:
+            mirror.sync()
+        except Exception:
+            # Back off so a failing source is not sent a full copy every interval
+            failures += 1
+            delay = min(_sync_interval() * 2 ** failures, max(_full_sync_interval(), _sync_interval()))
+            logger.exception("Inventory mirror sync failed; retrying in %.0fs, serving from the source once stale", delay)
+            continue
+        failures = 0
+        if not mirror.delta_sync:
+            _disable(mirror)
+
+
+def get_inventory_mirror() -> Optional[InventoryMirror]:
+    """
+    Get the inventory mirror once it is loaded.
+
+    The first call starts a daemon thread that loads the mirror and then
+    syncs it every MIRROR_SYNC_SECONDS, backing off after failures; tool
+    calls never wait on a full copy.
+
+    Returns:
+        The mirror, or None when disabled (INVENTORY_MIRROR=false), when the
+        repository is already local or its stock has no last_updated column,
+        or while the mirror is not loaded yet
+    """
+    global _mirror, _syncer
+    if not _enabled():
+        return None
+    source = get_repository()
+    if isinstance(source, LocalRepository) or source is _unsupported_source:
+        return None
+
+    mirror = _mirror
+    if mirror is None or mirror.source is not source:
+        with _lock:
+            if _mirror is None or _mirror.source is not source:
+                _mirror = InventoryMirror(source)
+                _wake.set()
+            if _syncer is None:
+                _syncer = threading.Thread(target=_sync_loop, name="inventory-mirror-sync", daemon=True)
+                _syncer.start()
+            mirror = _mirror
+    return mirror if mirror.repository is not None and mirror.delta_sync else None
+
+
+def wait_for_inventory_mirror(timeout: float = 60.0) -> Optional[InventoryMirror]:
+    """Start loading the mirror if needed and wait up to timeout for it, e.g. to warm up a benchmark."""
+    get_inventory_mirror()
+    mirror = _mirror
+    if mirror is not None:
+        mirror.loaded.wait(timeout)
+    return get_inventory_mirror()
+
+
+def inventory_source() -> Tuple[InventoryRepository, Optional[float]]:
+    """
+    Pick where stock lookups should be served from.
+
+    Returns:
+        Tuple of (repository, staleness_seconds). The mirror is used while it
+        is at most MIRROR_MAX_STALENESS_SECONDS old; otherwise the live
+        repository is returned with staleness None.
+    """
+    mirror = get_inventory_mirror()
+    if mirror is not None:
+        staleness = mirror.staleness()
+        if staleness is not None and staleness <= _max_staleness():
+            return mirror.repository, staleness
+    return get_repository(), None
+
+
+def staleness_note(staleness: Optional[float]) -> str:
+    """Footer telling the model how old mirrored stock levels may be."""
+    if staleness is None:
+        return ""
+    return f"\n\n(Stock levels as of {int(staleness)}s ago, refreshed every {int(_sync_interval())}s)"
@@ -1,10 +1,18 @@
 """List all available store IDs."""
-import os
-from google.cloud import bigquery
-from dotenv import load_dotenv
+from .cache import ttl_cache
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .output import compact_mode, render_compact
+from .repository import get_repository
 
-load_dotenv()
+@ttl_cache("list_store_ids")
+def _fetch_stores() -> list:
+    """Fetch all store rows, cached because the stores table rarely changes."""
+    return get_repository().list_stores()
 
+
+@instrumented
+@coalesced
 def list_store_ids() -> str:
     """
     List all available store IDs.
@@ -12,30 +20,17 @@ def list_store_ids() -> str:
     Returns:
         String with all available store IDs and their information
     """
-    project_id = os.getenv("BIGQUERY_PROJECT", "adk-demo-469711")
-    dataset = os.getenv("BIGQUERY_DATASET", "mobilis")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT 
-        store_id,
-        store_name,
-        address,
-        city,
-        state,
-        zip_code,
-        phone,
-        manager,
-        store_type
-    FROM `{project_id}.{dataset}.stores`
-    ORDER BY store_id
-    """
-    
     try:
-        results = client.query(query).result()
+        results = _fetch_stores()
+        
+        if compact_mode():
+            return render_compact(
+                "Available stores",
+                results,
+                ["store_id", "store_name", "city", "address", "state", "zip_code", "phone", "manager", "store_type"],
+            )
         
-        if not results.total_rows:
+        if not results:
             return "No stores found in the database"
         
         store_list = []
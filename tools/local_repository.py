@@ -0,0 +1,530 @@
+"""Embedded SQLite implementation of the inventory repository."""
+import datetime
+import decimal
+import json
+import os
+import pathlib
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .columnar import Columns
+from .instrumentation import record_query
+from .repository import PRODUCT_ORDERS, InventoryRepository, Page, Record
+from .settings import get_settings
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "data", "seed_catalog.json")
+
+TABLE_COLUMNS = {
+    "stores": [
+        "store_id", "store_name", "address", "city", "state", "zip_code",
+        "phone", "manager", "store_type",
+    ],
+    "products": [
+        "product_id", "product_name", "category", "subcategory", "brand",
+        "description", "base_price", "materials", "colors_available", "warranty_months",
+    ],
+    "stock": [
+        "store_id", "product_id", "color", "available_quantity", "location_in_store",
+    ],
+}
+
+INVENTORY_COLUMNS = """
+    st.store_name,
+    st.store_id,
+    st.address,
+    st.city,
+    st.state,
+    st.zip_code,
+    st.phone,
+    p.product_id,
+    p.product_name,
+    p.category,
+    p.subcategory,
+    p.brand,
+    p.description,
+    p.base_price,
+    p.materials,
+    p.colors_available,
+    p.warranty_months,
+    s.color,
+    s.available_quantity,
+    s.location_in_store"""
+
+STOCK_JOIN = """
+    FROM stock s
+    JOIN stores st ON s.store_id = st.store_id
+    JOIN products p ON s.product_id = p.product_id"""
+
+CATEGORIES_QUERY = """
+    SELECT category, subcategory, COUNT(*) AS product_count
+    FROM products
+    WHERE category IS NOT NULL
+    GROUP BY category, subcategory
+    ORDER BY category, subcategory"""
+
+BRANDS_QUERY = """
+    SELECT brand, product_name, category, subcategory, base_price
+    FROM products
+    WHERE brand IS NOT NULL
+    ORDER BY brand, product_name"""
+
+
+# Total matches on every row of a page; window functions run before LIMIT
+TOTAL_ROWS = ", COUNT(*) OVER () AS total_rows"
+PAGE_CLAUSE = "LIMIT @page_limit OFFSET @page_offset"
+
+
+_TABLE_REF = re.compile(r"`[\w-]+\.\w+\.(\w+)`")
+_CONCAT = re.compile(r"\bCONCAT\(([^()]*)\)", re.IGNORECASE)
+
+
+def from_bigquery_sql(query: str) -> str:
+    """
+    Rewrite simple BigQuery SQL for SQLite.
+
+    Fully qualified table names become bare names and CONCAT(a, b) becomes
+    (a || b); arguments must not contain commas or parentheses.
+    """
+    query = _TABLE_REF.sub(r"\1", query)
+    return _CONCAT.sub(lambda match: "(" + " || ".join(arg.strip() for arg in match.group(1).split(",")) + ")", query)
+
+
+def _product_filter(product_name: Optional[str], product_ids: Optional[Sequence[str]]):
+    """
+    Build the product match condition and its parameters.
+
+    Returns:
+        Tuple of (condition, params), or (None, {}) without a filter
+    """
+    if product_ids is not None:
+        return (
+            "p.product_id IN (SELECT value FROM json_each(@product_ids))",
+            {"product_ids": json.dumps(list(product_ids))},
+        )
+    if product_name:
+        return "LOWER(p.product_name) LIKE LOWER(@product_name)", {"product_name": f"%{product_name}%"}
+    return None, {}
+
+
+def load_snapshot(conn: sqlite3.Connection, snapshot: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Create one SQLite table per snapshot list, keeping any extra exported columns."""
+    for table, required in TABLE_COLUMNS.items():
+        rows = snapshot.get(table, [])
+        columns = list(required)
+        for row in rows:
+            columns.extend(column for column in row if column not in columns)
+
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        placeholders = ", ".join("?" for _ in columns)
+        conn.execute(f"CREATE TABLE {table} ({quoted})")
+        conn.executemany(
+            f"INSERT INTO {table} ({quoted}) VALUES ({placeholders})",
+            [tuple(row.get(column) for column in columns) for row in rows],
+        )
+
+    conn.execute("CREATE INDEX stock_store ON stock (store_id)")
+    conn.execute("CREATE INDEX stock_product ON stock (product_id)")
+    conn.commit()
+
+
+def write_database(snapshot: Dict[str, List[Dict[str, Any]]], path: str) -> None:
+    """
+    Write a snapshot as a SQLite database file for LocalRepository.from_database().
+
+    The database is in WAL mode, so one process can keep writing stock
+    changes to it while others read.
+    """
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA journal_mode = WAL")
+        load_snapshot(conn, snapshot)
+        conn.execute("CREATE TABLE sync_state (watermark TEXT, synced_at REAL)")
+        conn.execute("INSERT INTO sync_state VALUES (NULL, NULL)")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+class LocalRepository(InventoryRepository):
+    """
+    Serves every lookup from an in-memory SQLite copy of a snapshot.
+
+    A snapshot is a dict with "stores", "products" and "stock" row lists,
+    stored as JSON by export_snapshot(). from_database() serves from a
+    database file instead, without copying it.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        snapshot: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+        database: Optional[str] = None,
+        read_only: bool = True,
+    ):
+        self._lock = threading.Lock()
+        if database is None:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+            load_snapshot(self._conn, snapshot or {})
+        else:
+            uri = pathlib.Path(os.path.abspath(database)).as_uri() + ("?mode=ro" if read_only else "?mode=rw")
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._conn.execute(f"PRAGMA mmap_size = {os.path.getsize(database)}")
+        self._conn.row_factory = sqlite3.Row
+
+    @classmethod
+    def from_database(cls, path: str, read_only: bool = True) -> "LocalRepository":
+        """
+        Serve from a database file written by write_database().
+
+        The file is memory-mapped, so every process opening it shares its
+        pages through the OS page cache.
+
+        Args:
+            path: Database file
+            read_only: False for the one process that writes stock changes to it
+        """
+        return cls(database=path, read_only=read_only)
+
+    @classmethod
+    def from_file(cls, snapshot_path: str) -> "LocalRepository":
+        """Create a repository from a snapshot JSON file."""
+        with open(snapshot_path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def from_env(cls) -> "LocalRepository":
+        """Create a repository from LOCAL_SNAPSHOT_PATH (defaults to the bundled seed)."""
+        return cls.from_file(get_settings().local_snapshot_path or DEFAULT_SNAPSHOT_PATH)
+
+    def _run(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Record]:
+        """Run a query and return all rows as Records."""
+        with self._lock:
+            cursor = self._conn.execute(query, params or {})
+            rows = [Record(zip(row.keys(), row)) for row in cursor.fetchall()]
+        record_query(None, len(rows))
+        return rows
+
+    def _run_columns(self, query: str, params: Optional[Dict[str, Any]] = None) -> Columns:
+        """Run a query and return its result as Columns, without building Records."""
+        with self._lock:
+            cursor = self._conn.execute(query, params or {})
+            rows = cursor.fetchall()
+            names = [column[0] for column in cursor.description]
+        values = list(zip(*rows)) if rows else [()] * len(names)
+        record_query(None, len(rows))
+        return Columns({name: list(column) for name, column in zip(names, values)})
+
+    def fetch_table(self, table: str) -> List[Record]:
+        if table not in TABLE_COLUMNS:
+            raise ValueError(f"Unknown table '{table}'")
+        return self._run(f"SELECT * FROM {table}")
+
+    def list_stores(self) -> List[Record]:
+        return self._run("SELECT * FROM stores ORDER BY store_id")
+
+    def get_store(self, store_id: str) -> Optional[Record]:
+        rows = self._run("SELECT * FROM stores WHERE store_id = @store_id", {"store_id": store_id})
+        return rows[0] if rows else None
+
+    def store_diagnostics(self, store_id: str, sample_size: int = 5) -> Dict[str, Any]:
+        total = self._run("SELECT COUNT(*) AS total FROM stores")[0].total
+        sample = self._run("SELECT store_id FROM stores LIMIT @limit", {"limit": sample_size})
+        return {
+            "total_stores": total,
+            "sample_store_ids": [row.store_id for row in sample],
+            "found": self.get_store(store_id) is not None,
+        }
+
+    def our_store_inventory(
+        self,
+        store_id: str,
+        product_name: Optional[str] = None,
+        color: Optional[str] = None,
+        material: Optional[str] = None,
+        product_ids: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Record], List[Record]]:
+        product_condition, params = _product_filter(product_name, product_ids)
+        params["store_id"] = store_id
+        our_conditions = [product_condition] if product_condition else []
+        other_conditions = list(our_conditions)
+
+        if color:
+            params["color"] = f"%{color}%"
+            our_conditions.append("s.color LIKE @color")
+            other_conditions.append("(LOWER(s.color) LIKE LOWER(@color) OR LOWER(p.colors_available) LIKE LOWER(@color))")
+        if material:
+            params["material"] = f"%{material}%"
+            our_conditions.append("p.materials LIKE @material")
+            other_conditions.append("LOWER(p.materials) LIKE LOWER(@material)")
+
+        conditions = ["s.store_id = @store_id", "s.available_quantity > 0"] + our_conditions
+        if limit is None:
+            our_rows = self._run(
+                f"SELECT {INVENTORY_COLUMNS} {STOCK_JOIN} WHERE {' AND '.join(conditions)} "
+                "ORDER BY p.category, p.product_name, p.product_id, s.color",
+                params,
+            )
+        else:
+            our_rows = Page.from_rows(
+                self._run(
+                    f"SELECT {INVENTORY_COLUMNS}{TOTAL_ROWS} {STOCK_JOIN} WHERE {' AND '.join(conditions)} "
+                    f"ORDER BY p.category, p.product_name, p.product_id, s.color {PAGE_CLAUSE}",
+                    dict(params, page_limit=limit, page_offset=offset),
+                ),
+                offset,
+            )
+        # A page past the end is empty without our store lacking a match
+        if our_rows or offset or not other_conditions:
+            return our_rows, []
+
+        conditions = ["s.store_id != @store_id", "s.available_quantity > 0"] + other_conditions
+        other_rows = self._run(
+            f"""
+            SELECT * FROM (
+                SELECT {INVENTORY_COLUMNS},
+                    ROW_NUMBER() OVER (PARTITION BY st.store_id ORDER BY p.product_name) AS store_rank
+                {STOCK_JOIN}
+                WHERE {' AND '.join(conditions)}
+            )
+            WHERE store_rank = 1
+            ORDER BY store_name
+            """,
+            params,
+        )
+        return our_rows, other_rows
+
+    def product_availability(
+        self,
+        product_name: str,
+        product_ids: Optional[Sequence[str]] = None,
+        store_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Record]:
+        product_condition, params = _product_filter(product_name, product_ids)
+        conditions = [product_condition, "s.available_quantity > 0"]
+        if store_id:
+            conditions.append("s.store_id = @store_id")
+            params["store_id"] = store_id
+        query = f"""
+            SELECT {INVENTORY_COLUMNS}{TOTAL_ROWS if limit is not None else ""} {STOCK_JOIN}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY st.store_name, p.product_name, st.store_id, p.product_id, s.color
+            """
+        if limit is None:
+            return self._run(query, params)
+        return Page.from_rows(self._run(query + PAGE_CLAUSE, dict(params, page_limit=limit, page_offset=offset)), offset)
+
+    def batch_availability(self, product_names: Sequence[str], store_id: Optional[str] = None) -> List[Record]:
+        params: Dict[str, Any] = {"patterns": json.dumps([f"%{name}%" for name in product_names])}
+        conditions = ["s.available_quantity > 0"]
+        if store_id:
+            conditions.append("s.store_id = @store_id")
+            params["store_id"] = store_id
+        return self._run(
+            f"""
+            SELECT item.key AS item_index, {INVENTORY_COLUMNS}
+            FROM json_each(@patterns) item
+            JOIN products p ON LOWER(p.product_name) LIKE LOWER(item.value)
+            JOIN stock s ON s.product_id = p.product_id
+            JOIN stores st ON s.store_id = st.store_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY item_index, st.store_name, p.product_name
+            """,
+            params,
+        )
+
+    def search_products(
+        self, product_name: str, limit: int = 50, product_ids: Optional[Sequence[str]] = None, offset: int = 0
+    ) -> Page:
+        product_condition, params = _product_filter(product_name, product_ids)
+        params.update(page_limit=limit, page_offset=offset)
+        rows = self._run(
+            f"""
+            SELECT {INVENTORY_COLUMNS}{TOTAL_ROWS} {STOCK_JOIN}
+            WHERE {product_condition}
+                AND s.available_quantity > 0
+            ORDER BY p.product_name, st.store_name, st.store_id, p.product_id, s.color
+            {PAGE_CLAUSE}
+            """,
+            params,
+        )
+        return Page.from_rows(rows, offset)
+
+    def filter_products(
+        self,
+        product_name: Optional[str] = None,
+        product_ids: Optional[Sequence[str]] = None,
+        category: Optional[str] = None,
+        subcategory: Optional[str] = None,
+        brand: Optional[str] = None,
+        color: Optional[str] = None,
+        material: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        store_id: Optional[str] = None,
+        in_stock_only: bool = True,
+        order_by: str = "price",
+        limit: int = 10,
+    ) -> List[Record]:
+        product_condition, params = _product_filter(product_name, product_ids)
+        product_conditions = [product_condition] if product_condition else []
+        for column, value in (("category", category), ("subcategory", subcategory), ("brand", brand), ("materials", material)):
+            if value:
+                product_conditions.append(f"LOWER(p.{column}) LIKE LOWER(@{column})")
+                params[column] = f"%{value}%"
+        if min_price is not None:
+            product_conditions.append("p.base_price >= @min_price")
+            params["min_price"] = float(min_price)
+        if max_price is not None:
+            product_conditions.append("p.base_price <= @max_price")
+            params["max_price"] = float(max_price)
+
+        stock_conditions = ["s.product_id = p.product_id", "s.available_quantity > 0"]
+        if store_id:
+            stock_conditions.append("s.store_id = @store_id")
+            params["store_id"] = store_id
+        if color:
+            stock_conditions.append("LOWER(s.color) LIKE LOWER(@color)")
+            params["color"] = f"%{color}%"
+            if not in_stock_only:
+                product_conditions.append("LOWER(p.colors_available) LIKE LOWER(@color)")
+
+        params["limit"] = limit
+        return self._run(
+            f"""
+            SELECT
+                p.product_id,
+                p.product_name,
+                p.category,
+                p.subcategory,
+                p.brand,
+                p.base_price,
+                p.materials,
+                p.colors_available,
+                COALESCE(SUM(s.available_quantity), 0) AS available_quantity,
+                COUNT(DISTINCT s.store_id) AS stores_with_stock,
+                REPLACE(GROUP_CONCAT(DISTINCT s.color), ',', ', ') AS colors_in_stock,
+                MIN(s.location_in_store) AS location_in_store
+            FROM products p
+            {"JOIN" if in_stock_only else "LEFT JOIN"} stock s ON {" AND ".join(stock_conditions)}
+            WHERE {" AND ".join(product_conditions) or "1"}
+            GROUP BY p.product_id
+            ORDER BY {PRODUCT_ORDERS[order_by]}
+            LIMIT @limit
+            """,
+            params,
+        )
+
+    def product_categories(self) -> List[Record]:
+        return self._run(CATEGORIES_QUERY)
+
+    def brands_and_products(self) -> List[Record]:
+        return self._run(BRANDS_QUERY)
+
+    def product_categories_columns(self) -> Columns:
+        return self._run_columns(CATEGORIES_QUERY)
+
+    def brands_and_products_columns(self) -> Columns:
+        return self._run_columns(BRANDS_QUERY)
+
+    def run_statement(self, statement: str, parameters: Sequence[Tuple[str, str, Any]] = ()) -> List[Record]:
+        return self._run(from_bigquery_sql(statement), {name: value for name, _, value in parameters})
+
+    def stock_changes(self, since: Any) -> List[Record]:
+        return self._run("SELECT * FROM stock WHERE last_updated >= @since", {"since": since})
+
+    def upsert_stock(self, rows: Sequence[Any]) -> int:
+        """
+        Insert or replace stock rows, keyed by (store_id, product_id, color).
+
+        Args:
+            rows: Stock rows from any backend
+
+        Returns:
+            Number of rows written
+        """
+        with self._lock:
+            columns = [column[1] for column in self._conn.execute("PRAGMA table_info(stock)")]
+            quoted = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join("?" for _ in columns)
+            values = [{column: _json_value(row.get(column)) for column in columns} for row in rows]
+            self._conn.executemany(
+                "DELETE FROM stock WHERE store_id = ? AND product_id = ? AND color IS ?",
+                [(row["store_id"], row["product_id"], row["color"]) for row in values],
+            )
+            self._conn.executemany(
+                f"INSERT INTO stock ({quoted}) VALUES ({placeholders})",
+                [tuple(row[column] for column in columns) for row in values],
+            )
+            self._conn.commit()
+        return len(values)
+
+    def sync_state(self) -> Tuple[Optional[str], Optional[float]]:
+        """
+        The (watermark, synced_at) stored by set_sync_state() in a database from write_database().
+
+        Returns:
+            Tuple of (watermark, synced_at), both None before the first sync
+        """
+        rows = self._run("SELECT watermark, synced_at FROM sync_state")
+        return (rows[0].watermark, rows[0].synced_at) if rows else (None, None)
+
+    def set_sync_state(self, watermark: Optional[str], synced_at: float) -> None:
+        """Record how far stock has been synced, for every process reading the same database."""
+        with self._lock:
+            self._conn.execute("UPDATE sync_state SET watermark = ?, synced_at = ?", (watermark, synced_at))
+            self._conn.commit()
+
+
+def _json_value(value: Any) -> Any:
+    """Convert BigQuery values (Decimal, dates) to JSON-serializable ones."""
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    return value
+
+
+def copy_snapshot(source: InventoryRepository) -> Dict[str, List[Dict[str, Any]]]:
+    """Read every table of another repository into the snapshot format."""
+    return {
+        table: [{key: _json_value(value) for key, value in row.items()} for row in source.fetch_table(table)]
+        for table in TABLE_COLUMNS
+    }
+
+
+def export_snapshot(source: InventoryRepository, path: str) -> Dict[str, int]:
+    """
+    Write a snapshot file for LocalRepository from another repository.
+
+    Args:
+        source: Repository to copy from, usually BigQueryRepository
+        path: Destination JSON file
+
+    Returns:
+        Row count per table
+    """
+    snapshot = copy_snapshot(source)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+    return {table: len(rows) for table, rows in snapshot.items()}
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .bigquery_repository import BigQueryRepository
+
+    output_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SNAPSHOT_PATH
+    counts = export_snapshot(BigQueryRepository.from_env(), output_path)
+    print(f"Wrote {output_path}: " + ", ".join(f"{table}={count}" for table, count in counts.items()))
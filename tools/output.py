@@ -0,0 +1,143 @@
+"""Compact, token-budgeted structured output shared by all tools."""
+import decimal
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from .columnar import Columns
+from .settings import get_settings
+
+
+def compact_mode() -> bool:
+    """Whether tools should return compact JSON instead of bullet-point text (TOOL_OUTPUT_MODE)."""
+    return get_settings().tool_output_mode.lower() == "compact"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def _value(value: Any) -> Any:
+    """Convert a row value to a short JSON-serializable value."""
+    if isinstance(value, decimal.Decimal):
+        value = float(value)
+    if isinstance(value, float):
+        return round(value, 2)
+    if value is None or isinstance(value, (str, int, bool)):
+        return value
+    return str(value)
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def limited_note(rows: Any) -> str:
+    """Footer for results cut short by the query budget (see LimitedRows)."""
+    limit = getattr(rows, "limit", None)
+    if limit is None:
+        return ""
+    return f"\n\n(Showing the first {limit} results; the full list is over the query budget, so narrow the request to see more.)"
+
+
+def mark_stale(output: str, age: float) -> str:
+    """
+    Flag a tool result built from last known good data because the backend was degraded.
+
+    Compact results get stale_seconds (the older of this and any mirror
+    staleness) and "degraded": true; text results get a footer.
+    """
+    if compact_mode() and output.startswith("{"):
+        try:
+            payload = json.loads(output)
+        except ValueError:
+            payload = None
+        if isinstance(payload, dict):
+            payload["stale_seconds"] = max(int(age), payload.get("stale_seconds") or 0)
+            payload["degraded"] = True
+            return _dumps(payload)
+    return output + (
+        f"\n\n(The inventory database is not responding, so this is the last result it returned, {int(age)}s ago; "
+        "stock may have changed since.)"
+    )
+
+
+def render_compact(
+    title: str,
+    rows: Iterable[Any],
+    columns: Sequence[str],
+    store_columns: Sequence[str] = (),
+    extra: Optional[Dict[str, Any]] = None,
+    paging: Optional[Callable[[int], Dict[str, Any]]] = None,
+) -> str:
+    """
+    Render rows as compact JSON within the configured row and token budget.
+
+    Rows become arrays under a single "columns" header. Store details named in
+    store_columns are emitted once per store under "stores", keyed by
+    store_id, and rows reference the store by its ID only.
+
+    Args:
+        title: Short description of the result
+        rows: Row objects supporting attribute access, or Columns
+        columns: Row columns to include, in order
+        store_columns: Store columns to deduplicate into "stores"
+        extra: Additional top-level fields (e.g. the store a lookup was for)
+        paging: For one page of a paged result: called with the number of
+            rows shown, returns the paging fields (see paging.Pager), which
+            replace "total" and the truncation note
+
+    Returns:
+        JSON string; "truncated" reports how many rows were left out, and
+        "limited_to" that the query itself was cut short by its budget
+    """
+    settings = get_settings()
+    max_rows = settings.tool_output_max_rows
+    max_tokens = settings.tool_output_max_tokens
+
+    limit = getattr(rows, "limit", None)
+    if isinstance(rows, Columns):
+        # Only the rows that can be shown are turned into row objects
+        total, rows = len(rows), rows.head(max_rows)
+    else:
+        rows = list(rows)
+        total = len(rows)
+    columns = list(columns)
+    if store_columns and "store_id" not in columns:
+        columns.insert(0, "store_id")
+
+    table: List[List[Any]] = []
+    stores: Dict[str, Dict[str, Any]] = {}
+    for row in rows[:max_rows]:
+        table.append([_value(getattr(row, column, None)) for column in columns])
+        if store_columns and row.store_id not in stores:
+            stores[row.store_id] = {column: _value(getattr(row, column, None)) for column in store_columns}
+
+    def build(shown: int) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"result": title, "total": total}
+        if limit is not None:
+            payload["limited_to"] = limit
+        if extra:
+            payload.update(extra)
+        if store_columns:
+            used = {row[columns.index("store_id")] for row in table[:shown]}
+            payload["stores"] = {store_id: store for store_id, store in stores.items() if store_id in used}
+        payload["columns"] = columns
+        payload["rows"] = table[:shown]
+        if paging is not None:
+            payload.update(paging(shown))
+        elif shown < total:
+            payload["truncated"] = {
+                "shown": shown,
+                "omitted": total - shown,
+                "note": "Narrow the request (e.g. add a store, color or more specific name) to see the rest.",
+            }
+        return payload
+
+    # Drop rows from the end until the payload fits the token budget
+    shown = len(table)
+    text = _dumps(build(shown))
+    while shown > 1 and estimate_tokens(text) > max_tokens:
+        shown = max(1, shown * max_tokens // estimate_tokens(text)) if shown > 8 else shown - 1
+        text = _dumps(build(shown))
+    return text
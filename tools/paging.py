@@ -0,0 +1,87 @@
+"""Continuation cursors for tools that return long results a page at a time."""
+import base64
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from .coalesce import normalize
+from .repository import Page
+from .settings import get_settings
+
+
+class InvalidCursor(ValueError):
+    """A cursor that is malformed or was issued for different arguments."""
+
+
+class Pager:
+    """
+    Page size and position of one paged tool call.
+
+    A cursor encodes the offset of the next page and a fingerprint of the
+    tool and its arguments (normalized as for coalescing, page size
+    excluded), so a cursor passed back with different arguments is refused
+    instead of silently paging through another result.
+    """
+
+    def __init__(self, tool: str, arguments: Dict[str, Any], cursor: Optional[str] = None, page_size: Optional[int] = None):
+        """
+        Args:
+            tool: Tool name
+            arguments: Arguments that determine the result, including the store when it matters
+            cursor: Cursor returned by the previous page, if any
+            page_size: Rows per page requested by the caller; defaults to
+                TOOL_PAGE_SIZE (TOOL_PAGE_SIZE_<TOOL> per tool), capped at TOOL_MAX_PAGE_SIZE
+
+        Raises:
+            InvalidCursor: If cursor is malformed or belongs to other arguments
+        """
+        settings = get_settings()
+        key = json.dumps([tool, normalize(arguments)], default=str)
+        self.fingerprint = hashlib.sha1(key.encode("utf-8")).hexdigest()[:10]
+        self.size = max(1, min(int(page_size or settings.for_tool("tool_page_size", tool)), settings.tool_max_page_size))
+        self.offset = self._decode(cursor) if cursor else 0
+
+    def _decode(self, cursor: str) -> int:
+        try:
+            raw = base64.urlsafe_b64decode(cursor.strip() + "=" * (-len(cursor.strip()) % 4)).decode("ascii")
+            fingerprint, offset = raw.split(":")
+            offset = int(offset)
+        except ValueError:
+            raise InvalidCursor("the cursor is not valid; call again without it to start from the first page") from None
+        if fingerprint != self.fingerprint or offset < 0:
+            raise InvalidCursor(
+                "the cursor belongs to a search with different arguments; "
+                "repeat that search's arguments exactly, or call again without it to start from the first page"
+            )
+        return offset
+
+    def cursor(self, offset: int) -> str:
+        """Cursor resuming at offset."""
+        return base64.urlsafe_b64encode(f"{self.fingerprint}:{offset}".encode("ascii")).decode("ascii").rstrip("=")
+
+    def compact_fields(self, page: Page, shown: int) -> Dict[str, Any]:
+        """
+        Paging fields of a compact result.
+
+        Args:
+            page: The page fetched
+            shown: Rows of it that fit the output; the next cursor resumes after them
+        """
+        fields: Dict[str, Any] = {"total": page.total, "offset": page.offset}
+        end = page.offset + shown
+        if page.total is not None and end < page.total:
+            fields["next_cursor"] = self.cursor(end)
+        return fields
+
+    def note(self, page: Page) -> str:
+        """Footer for a text result: which rows are shown and how to get the next page."""
+        if page.total is None or (page.offset == 0 and page.next_offset is None):
+            return ""
+        shown = f"Showing results {page.offset + 1}-{page.offset + len(page)} of {page.total}"
+        if page.next_offset is None:
+            return f"\n\n({shown}; this is the last page.)"
+        return f'\n\n({shown}. For the next {min(self.size, page.total - page.next_offset)}, call again with the same arguments and cursor="{self.cursor(page.next_offset)}".)'
+
+    def past_end(self, page: Page) -> bool:
+        """Whether the page is empty because the cursor went past the last row."""
+        return not page and page.offset > 0
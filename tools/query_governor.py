@@ -0,0 +1,294 @@
+"""Per-tool byte and time budgets for BigQuery jobs, based on cached dry-run estimates."""
+import concurrent.futures
+import json
+import logging
+import time
+from typing import Any, List, Optional, Tuple
+
+from google.cloud import bigquery
+
+from .cache import _MISSING, TTLCache
+from .columnar import Columns, arrow_available, storage_api_available
+from .instrumentation import HEDGED, current_call, current_tool, record_query, record_stale, time_remaining
+from .repository import LimitedRows
+from .resilience import (
+    BackendUnavailable,
+    CircuitBreaker,
+    DeadlineExceeded,
+    LatencyTracker,
+    circuit_breaker,
+    is_backend_failure,
+)
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# How often jobs are checked while deciding whether to hedge and which copy won
+HEDGE_POLL_SECONDS = 0.05
+
+
+class QueryBudgetExceeded(Exception):
+    """A query was refused because its estimated scan is over the tool's hard limit."""
+
+
+def _size(num_bytes: float) -> str:
+    """Human-readable byte count, e.g. "1.5 GB"."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if num_bytes < 1000:
+            return f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1000
+    return f"{num_bytes:.1f} TB"
+
+
+class QueryGovernor:
+    """
+    Decides how each BigQuery job may run.
+
+    The first time a query text (its "shape"; parameter values are bound
+    separately) is seen, it is dry-run and the bytes estimate is cached for
+    QUERY_ESTIMATE_TTL_SECONDS. Every job then runs with the BigQuery cache
+    enabled, a maximum_bytes_billed cap and a timeout, all resolved per tool
+    from environment settings with optional _<TOOL> suffixes:
+
+    - estimate over QUERY_MAX_BYTES_BILLED: refused without starting a job
+    - estimate over QUERY_BYTES_BUDGET: rewritten with LIMIT
+      DEGRADED_ROW_LIMIT when the caller allows it, which bounds result size
+      and ORDER BY work even though BigQuery still bills the columns scanned
+
+    Jobs are also bounded by what is left of the tool's TOOL_DEADLINE_SECONDS.
+    A job still running after the p95 duration of its shape (at least
+    QUERY_HEDGE_MIN_SECONDS, once QUERY_HEDGE_MIN_SAMPLES are recorded) gets
+    a duplicate; whichever finishes first is used and the other cancelled.
+    Each dataset has a CircuitBreaker, so a failing backend is not sent
+    queries that would only time out.
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self._estimates = TTLCache(
+            "query_estimates",
+            ttl=settings.query_estimate_ttl_seconds,
+            max_entries=settings.cache_max_entries,
+        )
+        self._last_good = TTLCache(
+            "last_good_results",
+            ttl=settings.stale_fallback_max_age_seconds,
+            max_entries=settings.cache_max_entries,
+        )
+        self._latencies = LatencyTracker()
+
+    def estimate(self, client: Any, query: str, query_parameters: List[Any], dry_run: bool = True) -> Optional[int]:
+        """
+        Estimated bytes processed for a query shape, from cache or a dry run.
+
+        Args:
+            client: BigQuery client
+            query: SQL text
+            query_parameters: Bound parameters
+            dry_run: Whether a shape missing from the cache may be dry-run
+
+        Returns:
+            Byte estimate, or None when dry runs are disabled, skipped or failed
+        """
+        if not get_settings().query_dry_run:
+            return None
+        estimate = self._estimates.get(query)
+        if estimate is not _MISSING:
+            return estimate
+        if not dry_run:
+            return None
+
+        try:
+            job_config = bigquery.QueryJobConfig(
+                dry_run=True, use_query_cache=False, query_parameters=query_parameters
+            )
+            estimate = client.query(query, job_config=job_config).total_bytes_processed or 0
+        except Exception:
+            logger.warning("Dry run failed; running query without an estimate", exc_info=True)
+            return None
+        self._estimates.set(query, estimate)
+        return estimate
+
+    def run(
+        self,
+        client: Any,
+        query: str,
+        query_parameters: List[Any],
+        limitable: bool = False,
+        columnar: bool = False,
+        dataset: str = "",
+    ) -> Any:
+        """
+        Run a query within the calling tool's budgets and deadline.
+
+        When the backend is degraded (the dataset's circuit is open, the job
+        failed with a server error or ran out of time) and the same query
+        succeeded within STALE_FALLBACK_MAX_AGE_SECONDS, a tool call gets
+        that last known good result instead; its age is recorded on the call,
+        which marks the tool's output as stale.
+
+        Args:
+            client: BigQuery client
+            query: SQL text, ending in ORDER BY (or WHERE) when limitable
+            query_parameters: Bound parameters
+            limitable: Whether the query may be degraded to a LIMITed version
+            columnar: Return Columns, downloaded as an Arrow table (through the
+                Storage Read API when installed) if pyarrow is available
+            dataset: Circuit breaker name, e.g. "project.dataset"
+
+        Returns:
+            All rows, or LimitedRows when the query was degraded; Columns
+            (with limit set when degraded) when columnar
+
+        Raises:
+            QueryBudgetExceeded: If the estimate is over the hard byte limit
+            BackendUnavailable: If the backend is degraded (timeouts and
+                server errors included) and no recent result can stand in
+        """
+        key = (query, _parameters_key(query_parameters), columnar)
+        try:
+            rows = self._run(client, query, query_parameters, limitable, columnar, circuit_breaker(dataset or "bigquery"))
+        except Exception as e:
+            if not is_backend_failure(e):
+                raise
+            # Background refreshes keep their previous snapshot instead
+            serve_stale = get_settings().stale_fallback and current_call() is not None
+            entry = self._last_good.get(key) if serve_stale else _MISSING
+            if entry is _MISSING:
+                if isinstance(e, BackendUnavailable):
+                    raise
+                raise BackendUnavailable(
+                    f"the inventory database is not responding ({e}); retrying right away is unlikely to help"
+                ) from e
+            stored_at, rows = entry
+            age = time.monotonic() - stored_at
+            logger.warning("Serving %ds old result for %s: %s", age, current_tool(), e)
+            record_stale(age)
+            return rows
+        # Only tool calls are served stale results, so background table copies are not kept
+        if current_call() is not None:
+            self._last_good.set(key, (time.monotonic(), rows))
+        return rows
+
+    def _run(
+        self,
+        client: Any,
+        query: str,
+        query_parameters: List[Any],
+        limitable: bool,
+        columnar: bool,
+        breaker: CircuitBreaker,
+    ) -> Any:
+        settings = get_settings()
+        tool = current_tool()
+        max_bytes = int(settings.for_tool("query_max_bytes_billed", tool))
+        budget = int(settings.for_tool("query_bytes_budget", tool))
+        timeout = settings.for_tool("query_timeout_seconds", tool)
+        remaining = time_remaining()
+        if remaining is not None:
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{tool} ran out of time before its query could start")
+            timeout = min(timeout, remaining)
+
+        # While the circuit is not closed, use cached estimates rather than wait on dry runs
+        limit = None
+        estimate = self.estimate(client, query, query_parameters, dry_run=breaker.state == "closed")
+        if estimate is not None and estimate > max_bytes:
+            raise QueryBudgetExceeded(
+                f"query would scan about {_size(estimate)}, over the {_size(max_bytes)} limit"
+                + (f" for {tool}" if tool else "")
+                + "; try a more specific search"
+            )
+        if estimate is not None and estimate > budget and limitable:
+            limit = settings.degraded_row_limit
+            query = f"{query.rstrip()}\n        LIMIT {limit}"
+            logger.info("Query for %s over budget (%d bytes); limiting to %d rows", tool, estimate, limit)
+
+        # Duplicating a job doubles its cost, so only queries within budget are hedged
+        hedge_after = None
+        if settings.query_hedging and (estimate is None or estimate <= budget):
+            p95 = self._latencies.percentile(query, 95, settings.query_hedge_min_samples)
+            if p95 is not None and max(p95, settings.query_hedge_min_seconds) < timeout:
+                hedge_after = max(p95, settings.query_hedge_min_seconds)
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=query_parameters,
+            use_query_cache=settings.query_use_cache,
+            maximum_bytes_billed=max_bytes,
+            job_timeout_ms=int(timeout * 1000),
+        )
+        breaker.check()
+        deadline = time.monotonic() + timeout
+        jobs: List[Tuple[Any, float]] = []
+        try:
+            jobs.append((client.query(query, job_config=job_config), time.monotonic()))
+            job, started = jobs[0]
+            if hedge_after is not None and not _wait(job, hedge_after):
+                jobs.append((client.query(query, job_config=job_config), time.monotonic()))
+                HEDGED.inc(tool or "")
+                logger.info("Query for %s still running after %.2fs; started a hedged duplicate", tool, hedge_after)
+                job, started = _first_done(jobs, deadline)
+            result = job.result(timeout=max(0.0, deadline - time.monotonic()))
+            if columnar and settings.arrow_fetch and arrow_available():
+                rows = Columns.from_arrow(result.to_arrow(create_bqstorage_client=storage_api_available()))
+            else:
+                rows = list(result)
+        except Exception as e:
+            for other, _ in jobs:
+                if not other.done():
+                    other.cancel()
+            # Any answer from BigQuery, even an error about the query, shows it is up
+            if is_backend_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            raise
+        for other, _ in jobs:
+            if other is not job:
+                if not other.done():
+                    other.cancel()
+                record_query(other, 0)
+        breaker.record_success()
+        self._latencies.record(query, time.monotonic() - started)
+        record_query(job, len(rows))
+
+        limited = limit is not None and len(rows) >= limit
+        if isinstance(rows, Columns):
+            rows.limit = limit if limited else None
+            return rows
+        if columnar:
+            return Columns.from_rows(LimitedRows(rows, limit) if limited else rows)
+        return LimitedRows(rows, limit) if limited else rows
+
+
+def _parameters_key(query_parameters: List[Any]) -> str:
+    return json.dumps([parameter.to_api_repr() for parameter in query_parameters], sort_keys=True, default=str)
+
+
+def _wait(job: Any, seconds: float) -> bool:
+    """Whether job finished within seconds (successfully or not)."""
+    end = time.monotonic() + seconds
+    while not job.done():
+        if time.monotonic() >= end:
+            return False
+        time.sleep(min(HEDGE_POLL_SECONDS, max(0.0, end - time.monotonic())))
+    return True
+
+
+def _first_done(jobs: List[Tuple[Any, float]], deadline: float) -> Tuple[Any, float]:
+    """
+    The first of several identical jobs to succeed, or the last to fail.
+
+    Raises:
+        concurrent.futures.TimeoutError: If none finished by deadline
+    """
+    while True:
+        finished = [entry for entry in jobs if entry[0].done()]
+        for entry in finished:
+            if entry[0].error_result is None:
+                return entry
+        if len(finished) == len(jobs):
+            return finished[-1]
+        if time.monotonic() >= deadline:
+            raise concurrent.futures.TimeoutError("query did not finish before its timeout")
+        time.sleep(HEDGE_POLL_SECONDS)
@@ -0,0 +1,245 @@
+"""Data-access interface shared by all tools, with a pluggable backend."""
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from .settings import get_settings
+
+if TYPE_CHECKING:
+    from .columnar import Columns
+
+
+# ORDER BY for filter_products, by sort name; each ends in product_id so the top k is stable
+PRODUCT_ORDERS = {
+    "price": "p.base_price ASC, p.product_name, p.product_id",
+    "price_desc": "p.base_price DESC, p.product_name, p.product_id",
+    "stock": "available_quantity DESC, p.base_price ASC, p.product_id",
+    "name": "p.product_name, p.product_id",
+}
+
+
+class Record(dict):
+    """Result row supporting both row["column"] and row.column access, like bigquery.Row."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class LimitedRows(list):
+    """Rows cut off at limit because the full result was over the query budget."""
+
+    def __init__(self, rows, limit: int):
+        super().__init__(rows)
+        self.limit = limit
+
+
+class Page(list):
+    """
+    One page of an ordered result, starting at row offset.
+
+    total counts the rows across all pages (queries add it to each row as a
+    total_rows window count); it is None when the page is empty because
+    offset is past the end.
+    """
+
+    def __init__(self, rows, offset: int, total: Optional[int]):
+        super().__init__(rows)
+        self.offset = offset
+        self.total = total
+
+    @classmethod
+    def from_rows(cls, rows: List[Any], offset: int) -> "Page":
+        """Page of rows carrying a total_rows column."""
+        if rows:
+            return cls(rows, offset, rows[0].total_rows)
+        return cls(rows, offset, 0 if offset == 0 else None)
+
+    @property
+    def next_offset(self) -> Optional[int]:
+        """Offset of the following page, or None on the last one."""
+        end = self.offset + len(self)
+        return end if self.total is not None and end < self.total else None
+
+
+class InventoryRepository:
+    """
+    Queries the tools need, independent of where the data lives.
+
+    Rows returned by every method support attribute access (row.store_name)
+    so tools can format them the same way regardless of backend.
+    """
+
+    name = "base"
+
+    def fetch_table(self, table: str) -> List[Any]:
+        """Return every row of the stores, products or stock table."""
+        raise NotImplementedError
+
+    def list_stores(self) -> List[Any]:
+        """Return all stores ordered by store_id."""
+        raise NotImplementedError
+
+    def get_store(self, store_id: str) -> Optional[Any]:
+        """Return one store row, or None if it does not exist."""
+        raise NotImplementedError
+
+    def store_diagnostics(self, store_id: str, sample_size: int = 5) -> Dict[str, Any]:
+        """Return total store count, a sample of store IDs and whether store_id exists."""
+        raise NotImplementedError
+
+    def our_store_inventory(
+        self,
+        store_id: str,
+        product_name: Optional[str] = None,
+        color: Optional[str] = None,
+        material: Optional[str] = None,
+        product_ids: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Tuple[List[Any], List[Any]]:
+        """
+        Return in-stock rows for our store and, when our store has no match
+        for the given filters, one row per other store that does (all of
+        them, ordered by store name; callers rank and trim the list).
+
+        product_ids, when given, replaces the product_name match with an exact
+        ID filter (resolved locally by the catalog index). With limit, our
+        rows are one Page of at most limit rows starting at offset.
+
+        Returns:
+            Tuple of (our_rows, other_store_rows)
+        """
+        raise NotImplementedError
+
+    def product_availability(
+        self,
+        product_name: str,
+        product_ids: Optional[Sequence[str]] = None,
+        store_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Any]:
+        """
+        Return in-stock rows for matching products (or product_ids), optionally at one store.
+
+        With limit, the rows are one Page of at most limit rows starting at offset.
+        """
+        raise NotImplementedError
+
+    def batch_availability(self, product_names: Sequence[str], store_id: Optional[str] = None) -> List[Any]:
+        """
+        Return in-stock rows for several product-name patterns in one lookup.
+
+        Each row carries item_index, the position in product_names it matched;
+        a row matching several names is returned once per name.
+        """
+        raise NotImplementedError
+
+    def search_products(
+        self, product_name: str, limit: int = 50, product_ids: Optional[Sequence[str]] = None, offset: int = 0
+    ) -> Page:
+        """Return a Page of up to limit in-stock rows for matching products (or product_ids) across all stores."""
+        raise NotImplementedError
+
+    def filter_products(
+        self,
+        product_name: Optional[str] = None,
+        product_ids: Optional[Sequence[str]] = None,
+        category: Optional[str] = None,
+        subcategory: Optional[str] = None,
+        brand: Optional[str] = None,
+        color: Optional[str] = None,
+        material: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        store_id: Optional[str] = None,
+        in_stock_only: bool = True,
+        order_by: str = "price",
+        limit: int = 10,
+    ) -> List[Any]:
+        """
+        Return the top limit products matching every given filter, in one query.
+
+        Text filters match case-insensitively anywhere in the column, and
+        product_ids replaces the product_name match as elsewhere. Stock rows
+        count when they are in stock, at store_id and in color (when given):
+        each row carries their available_quantity, stores_with_stock,
+        colors_in_stock and (first) location_in_store. in_stock_only drops
+        products without such stock.
+
+        Args:
+            order_by: A PRODUCT_ORDERS key
+            limit: Rows to return at most
+        """
+        raise NotImplementedError
+
+    def product_categories(self) -> List[Any]:
+        """Return (category, subcategory, product_count) rows."""
+        raise NotImplementedError
+
+    def brands_and_products(self) -> List[Any]:
+        """Return (brand, product_name, category, subcategory, base_price) rows."""
+        raise NotImplementedError
+
+    def product_categories_columns(self) -> "Columns":
+        """product_categories() as columns; backends override this with a bulk fetch."""
+        from .columnar import Columns
+        return Columns.from_rows(self.product_categories(), ("category", "subcategory", "product_count"))
+
+    def brands_and_products_columns(self) -> "Columns":
+        """brands_and_products() as columns; backends override this with a bulk fetch."""
+        from .columnar import Columns
+        return Columns.from_rows(
+            self.brands_and_products(), ("brand", "product_name", "category", "subcategory", "base_price")
+        )
+
+    def run_statement(self, statement: str, parameters: Sequence[Tuple[str, str, Any]] = ()) -> List[Any]:
+        """
+        Run a read-only SQL statement written for BigQuery (e.g. from tools.yaml).
+
+        Args:
+            statement: SQL text with @name parameters and fully qualified tables
+            parameters: (name, BigQuery type, value) triples
+        """
+        raise NotImplementedError
+
+    def stock_changes(self, since: Any) -> List[Any]:
+        """Return stock rows whose last_updated is at or after since (a previous last_updated value)."""
+        raise NotImplementedError
+
+
+_repository: Optional[InventoryRepository] = None
+_lock = threading.Lock()
+
+
+def _create_repository() -> InventoryRepository:
+    """Build the backend selected by DATA_BACKEND ("bigquery" or "local")."""
+    backend = get_settings().data_backend.lower()
+    if backend == "bigquery":
+        from .bigquery_repository import BigQueryRepository
+        return BigQueryRepository.from_env()
+    if backend in ("local", "sqlite"):
+        from .local_repository import LocalRepository
+        return LocalRepository.from_env()
+    raise ValueError(f"Unknown DATA_BACKEND '{backend}' (expected 'bigquery' or 'local')")
+
+
+def get_repository() -> InventoryRepository:
+    """Get the process-wide repository, creating it on first use."""
+    global _repository
+    if _repository is not None:
+        return _repository
+
+    with _lock:
+        if _repository is None:
+            _repository = _create_repository()
+        return _repository
+
+
+def set_repository(repository: Optional[InventoryRepository]) -> None:
+    """Replace the process-wide repository (None re-reads DATA_BACKEND on next use)."""
+    global _repository
+    with _lock:
+        _repository = repository
@@ -0,0 +1,136 @@
+"""Circuit breakers, latency tracking and failure classification for backend queries."""
+import concurrent.futures
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from .settings import get_settings
+
+
+class BackendUnavailable(Exception):
+    """The backend is degraded, so the query was not run or was given up on."""
+
+
+class DeadlineExceeded(BackendUnavailable):
+    """The calling tool's deadline passed before the query finished."""
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    Whether an error means the backend is slow or unhealthy, rather than the
+    query being wrong (bad SQL, missing table, over budget).
+
+    Only these failures open circuit breakers and are answered from the
+    last known good result.
+    """
+    if isinstance(error, (BackendUnavailable, concurrent.futures.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        from google.api_core import exceptions
+    except ImportError:
+        return False
+    return isinstance(error, (exceptions.ServerError, exceptions.TooManyRequests, exceptions.DeadlineExceeded))
+
+
+class CircuitBreaker:
+    """
+    Stops sending queries to a dataset that keeps failing.
+
+    After BREAKER_FAILURE_THRESHOLD consecutive backend failures the circuit
+    opens and calls are refused for BREAKER_RESET_SECONDS. Then one trial
+    call is let through: its success closes the circuit, its failure opens
+    it for another period.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """"closed", "open" or "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < get_settings().breaker_reset_seconds:
+            return "open"
+        return "half_open"
+
+    def check(self) -> None:
+        """
+        Raise unless a call may go to the backend now.
+
+        Raises:
+            BackendUnavailable: While the circuit is open, or while the
+                half-open trial call is still in flight
+        """
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return
+            retry_in = max(0.0, self.opened_at + get_settings().breaker_reset_seconds - time.monotonic())
+        raise BackendUnavailable(
+            f"the inventory database ({self.name}) is not responding; "
+            f"it will be tried again in about {int(retry_in) + 1}s, so do not retry before then"
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= get_settings().breaker_failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    """The process-wide breaker for a dataset (e.g. "project.dataset")."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+class LatencyTracker:
+    """Recent successful job durations per query shape, for hedging thresholds."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, shape: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(shape)
+            if samples is None:
+                samples = self._samples[shape] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, shape: str, pct: float, min_samples: int = 1) -> Optional[float]:
+        """
+        Nearest-rank percentile of a shape's recent durations.
+
+        Returns:
+            Seconds, or None with fewer than min_samples recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(shape, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, max(0, int(round(pct / 100 * len(samples))) - 1))]
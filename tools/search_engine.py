@@ -0,0 +1,206 @@
+"""Ranked, typo-tolerant product search (BM25 with fuzzy and compound matching)."""
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from .catalog_index import CatalogIndex, get_catalog_index, tokenize
+
+# Field weights: a hit in the product name matters more than one in the description
+FIELD_WEIGHTS = {"product_name": 3.0, "category": 1.5, "description": 1.0, "materials": 1.0}
+K1 = 1.2
+B = 0.75
+FUZZY_PENALTY = {1: 0.7, 2: 0.5}
+
+
+def normalize(token: str) -> str:
+    """Fold simple plurals so "chairs" matches "chair"."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def analyze(text: str) -> List[str]:
+    """Tokenize and normalize text the same way for documents and queries."""
+    return [normalize(token) for token in tokenize(text)]
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, returning limit + 1 as soon as it must exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def max_edits(token: str) -> int:
+    """Allowed typos for a query token: none for short words, up to two for long ones."""
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 6 else 2
+
+
+class SearchEngine:
+    """
+    BM25 ranking over name, category, description and materials.
+
+    Adjacent name tokens are also indexed joined ("bar stool" -> "barstool")
+    so compound spellings match both ways, and unknown query tokens are
+    expanded to vocabulary terms within a small edit distance.
+    """
+
+    def __init__(self, index: CatalogIndex):
+        self.index = index
+        self.postings: Dict[str, Dict[str, Dict[str, int]]] = {field: defaultdict(dict) for field in FIELD_WEIGHTS}
+        self.lengths: Dict[str, Dict[str, int]] = {field: {} for field in FIELD_WEIGHTS}
+        self.document_frequency: Counter = Counter()
+
+        for product_id, row in index.products.items():
+            terms_in_doc = set()
+            for field in FIELD_WEIGHTS:
+                terms = analyze(getattr(row, field, None) or "")
+                if field == "product_name":
+                    terms += [left + right for left, right in zip(terms, terms[1:])]
+                self.lengths[field][product_id] = len(terms)
+                for term, frequency in Counter(terms).items():
+                    self.postings[field][term][product_id] = frequency
+                terms_in_doc.update(terms)
+            self.document_frequency.update(terms_in_doc)
+
+        self.document_count = max(len(index.products), 1)
+        self.average_length = {
+            field: (sum(lengths.values()) / len(lengths) if lengths else 0.0) or 1.0
+            for field, lengths in self.lengths.items()
+        }
+        self.vocabulary_by_length: Dict[int, List[str]] = defaultdict(list)
+        for term in self.document_frequency:
+            self.vocabulary_by_length[len(term)].append(term)
+
+    def _idf(self, term: str) -> float:
+        frequency = self.document_frequency.get(term, 0)
+        return math.log(1 + (self.document_count - frequency + 0.5) / (frequency + 0.5))
+
+    def _fuzzy_terms(self, token: str) -> List[Tuple[str, int]]:
+        """Vocabulary terms within the allowed edit distance of token."""
+        limit = max_edits(token)
+        letters = set(token)
+        matches = []
+        for length in range(len(token) - limit, len(token) + limit + 1):
+            for term in self.vocabulary_by_length.get(length, ()):
+                # Each edit changes at most two entries of the character-set difference
+                if len(letters.symmetric_difference(term)) > 2 * limit:
+                    continue
+                distance = edit_distance(token, term, limit)
+                if distance <= limit:
+                    matches.append((term, distance))
+        return matches
+
+    def _split_compound(self, token: str) -> Optional[Tuple[str, str]]:
+        """Split an unknown token into two known terms, e.g. "barstool" -> ("bar", "stool")."""
+        for i in range(2, len(token) - 1):
+            left, right = token[:i], normalize(token[i:])
+            if left in self.document_frequency and right in self.document_frequency:
+                return left, right
+        return None
+
+    def expand_query(self, query: str) -> Tuple[Dict[str, float], Dict[str, str]]:
+        """
+        Turn a query into weighted index terms.
+
+        Returns:
+            Tuple of (term -> weight, corrections) where corrections maps
+            query words to what they were interpreted as
+        """
+        tokens = analyze(query)
+        weights: Dict[str, float] = {}
+        corrections: Dict[str, str] = {}
+
+        def add(term: str, weight: float) -> None:
+            weights[term] = max(weights.get(term, 0.0), weight)
+
+        for token in tokens:
+            if token in self.document_frequency:
+                add(token, 1.0)
+                continue
+            compound = self._split_compound(token)
+            if compound:
+                add(compound[0], 1.0)
+                add(compound[1], 1.0)
+                corrections[token] = " ".join(compound)
+                continue
+            fuzzy = self._fuzzy_terms(token)
+            for term, distance in fuzzy:
+                add(term, FUZZY_PENALTY[distance])
+            if fuzzy:
+                corrections[token] = min(fuzzy, key=lambda match: match[1])[0]
+
+        for left, right in zip(tokens, tokens[1:]):
+            if left + right in self.document_frequency:
+                add(left + right, 1.0)
+
+        return weights, corrections
+
+    def search(self, query: str, top_k: int = 10) -> Tuple[List[Tuple[float, str]], Dict[str, str]]:
+        """
+        Rank products for a free-text query.
+
+        Args:
+            query: Customer wording, typos and all
+            top_k: Number of results to return
+
+        Returns:
+            Tuple of ([(score, product_id), ...] best first, corrections)
+        """
+        weights, corrections = self.expand_query(query)
+        scores: Dict[str, float] = defaultdict(float)
+
+        for term, term_weight in weights.items():
+            idf = self._idf(term) * term_weight
+            for field, field_weight in FIELD_WEIGHTS.items():
+                lengths = self.lengths[field]
+                average_length = self.average_length[field]
+                for product_id, frequency in self.postings[field].get(term, {}).items():
+                    norm = K1 * (1 - B + B * lengths[product_id] / average_length)
+                    scores[product_id] += field_weight * idf * frequency * (K1 + 1) / (frequency + norm)
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(score, product_id) for product_id, score in best], corrections
+
+
+_engine: Optional[SearchEngine] = None
+_lock = threading.Lock()
+
+
+def get_search_engine() -> Optional[SearchEngine]:
+    """
+    Get a search engine for the current catalog snapshot.
+
+    The engine is rebuilt whenever the catalog index has been refreshed.
+
+    Returns:
+        The engine, or None when the catalog index is unavailable
+    """
+    global _engine
+    index = get_catalog_index()
+    if index is None:
+        return None
+    engine = _engine
+    if engine is not None and engine.index is index:
+        return engine
+
+    with _lock:
+        if _engine is None or _engine.index is not index:
+            _engine = SearchEngine(index)
+        return _engine
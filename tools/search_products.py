@@ -1,61 +1,50 @@
 """Search for products across all stores."""
-import os
-from google.cloud import bigquery
-from dotenv import load_dotenv
+import functools
+from typing import Optional
+from .catalog_index import match_product_ids
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .output import compact_mode, render_compact
+from .paging import Pager
+from .repository import Page, get_repository
 
-load_dotenv()
-
-def search_products(product_name: str) -> str:
+@instrumented
+@coalesced
+def search_products(product_name: str, page_size: Optional[int] = None, cursor: Optional[str] = None) -> str:
     """
     Search for products across all stores.
     
     Args:
         product_name: Product name to search for
+        page_size: Optional number of results per page (default 20)
+        cursor: Optional cursor from the previous page's output, to get the next page
         
     Returns:
-        String with product information across all stores
+        String with product information across all stores, one page at a time
     """
-    project_id = os.getenv("BIGQUERY_PROJECT", "adk-demo-469711")
-    dataset = os.getenv("BIGQUERY_DATASET", "mobilis")
-    
-    client = bigquery.Client(project=project_id)
-    
-    query = f"""
-    SELECT 
-        st.store_name,
-        st.store_id,
-        st.address,
-        st.city,
-        st.state,
-        st.zip_code,
-        st.phone,
-        p.product_name,
-        p.category,
-        p.subcategory,
-        p.brand,
-        p.base_price,
-        s.available_quantity,
-        s.color,
-        s.location_in_store
-    FROM `{project_id}.{dataset}.stock` s
-    JOIN `{project_id}.{dataset}.stores` st ON s.store_id = st.store_id
-    JOIN `{project_id}.{dataset}.products` p ON s.product_id = p.product_id
-    WHERE LOWER(p.product_name) LIKE LOWER(@product_name)
-        AND s.available_quantity > 0
-    ORDER BY p.product_name, st.store_name
-    LIMIT 50
-    """
-    
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("product_name", "STRING", f"%{product_name}%"),
-        ]
-    )
-    
     try:
-        results = client.query(query, job_config=job_config).result()
+        pager = Pager("search_products", {"product_name": product_name}, cursor, page_size)
+        product_ids = match_product_ids(product_name)
+        results = Page([], pager.offset, 0)
+        if product_ids != []:
+            results = get_repository().search_products(
+                product_name, limit=pager.size, product_ids=product_ids, offset=pager.offset
+            )
+        
+        if compact_mode():
+            return render_compact(
+                f"Products matching '{product_name}'",
+                results,
+                ["product_name", "category", "subcategory", "brand", "base_price",
+                 "available_quantity", "color", "location_in_store"],
+                store_columns=("store_name", "address", "city", "state", "zip_code", "phone"),
+                paging=functools.partial(pager.compact_fields, results),
+            )
+        
+        if pager.past_end(results):
+            return f"No more products matching '{product_name}' after the first {pager.offset}; call again without cursor to start over"
         
-        if not results.total_rows:
+        if not results:
             return f"No products found matching '{product_name}'"
         
         products_list = []
@@ -71,7 +60,7 @@ def search_products(product_name: str) -> str:
                 f"  Location in Store: {row.location_in_store}\n"
             )
         
-        return f"Products matching '{product_name}':\n" + "\n\n".join(products_list)
+        return f"Products matching '{product_name}':\n" + "\n\n".join(products_list) + pager.note(results)
         
     except Exception as e:
         return f"Error searching products: {str(e)}"
\ No newline at end of file
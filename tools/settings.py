@@ -0,0 +1,200 @@
+"""Typed configuration for the agent and tools, read from the environment once."""
+import dataclasses
+import logging
+import os
+import threading
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Older variable names still accepted for the renamed settings
+_ALIASES = {
+    "BIGQUERY_PROJECT": "PROJECT_ID",
+    "BIGQUERY_DATASET": "DATASET",
+}
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+@dataclasses.dataclass(frozen=True)
+class Settings:
+    """
+    Every setting the agent and tools read, with its default.
+
+    Each field is read from the upper-cased environment variable of the same
+    name (store_id from STORE_ID, and so on).
+    """
+
+    # Agent
+    store_id: str = "STORE_001"
+    agent_name: str = "searcher_agent"
+    root_agent_model: str = "gemini-2.0-flash"
+
+    # Data access
+    data_backend: str = "bigquery"
+    bigquery_project: str = "adk-demo-469711"
+    bigquery_dataset: str = "mobilis"
+    bigquery_pool_size: int = 32
+    local_snapshot_path: Optional[str] = None
+    inventory_single_query: bool = True
+    other_stores_limit: int = 5
+    arrow_fetch: bool = True
+
+    # Caching and local indexes
+    cache_ttl_seconds: Optional[float] = None
+    cache_max_entries: int = 256
+    catalog_index: bool = True
+    catalog_refresh_seconds: float = 900.0
+    catalog_index_max_ids: int = 5000
+    shared_snapshot_dir: Optional[str] = None
+    shared_snapshot_refresh_seconds: float = 900.0
+    shared_snapshot_check_seconds: float = 5.0
+    inventory_mirror: bool = True
+    mirror_sync_seconds: float = 30.0
+    mirror_full_sync_seconds: float = 3600.0
+    mirror_max_staleness_seconds: float = 120.0
+    mirror_max_delta_rows: int = 50000
+    store_proximity: bool = True
+    zip_centroids_path: Optional[str] = None
+
+    # Query governor
+    query_bytes_budget: float = 1e9
+    query_max_bytes_billed: float = 10e9
+    query_timeout_seconds: float = 30.0
+    degraded_row_limit: int = 100
+    query_dry_run: bool = True
+    query_estimate_ttl_seconds: float = 86400.0
+    query_use_cache: bool = True
+    query_hedging: bool = True
+    query_hedge_min_seconds: float = 1.0
+    query_hedge_min_samples: int = 20
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    stale_fallback: bool = True
+    stale_fallback_max_age_seconds: float = 3600.0
+
+    # Tool execution and output
+    tool_max_concurrency: int = 16
+    tool_deadline_seconds: float = 15.0
+    tool_coalescing: bool = True
+    tool_output_mode: str = "text"
+    tool_output_max_rows: int = 25
+    tool_output_max_tokens: int = 1500
+    tool_page_size: int = 20
+    tool_max_page_size: int = 100
+    metrics_port: int = 0
+    agent_context: bool = True
+    agent_context_max_tokens: int = 1200
+    agent_context_refresh_seconds: float = 900.0
+    yaml_tools: bool = True
+    tools_yaml_path: Optional[str] = None
+
+    # Raw variables, for per-tool overrides such as QUERY_BYTES_BUDGET_<TOOL>
+    environ: Mapping[str, str] = dataclasses.field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        """
+        Build settings from environment variables.
+
+        Args:
+            environ: Variables to read; defaults to os.environ
+
+        Returns:
+            Settings with every unset field at its default
+        """
+        environ = dict(os.environ if environ is None else environ)
+        values: Dict[str, object] = {"environ": environ}
+        for field in dataclasses.fields(cls):
+            if field.name == "environ":
+                continue
+            name = field.name.upper()
+            raw = environ.get(name)
+            if not raw and name in _ALIASES and environ.get(_ALIASES[name]):
+                raw = environ[_ALIASES[name]]
+                logger.warning("%s is deprecated; set %s instead", _ALIASES[name], name)
+            if raw:
+                values[field.name] = _parse(raw, field.type, name)
+        return cls(**values)
+
+    def for_tool(self, name: str, tool: Optional[str]) -> float:
+        """
+        A numeric setting with its per-tool override applied.
+
+        Args:
+            name: Field name, e.g. "query_bytes_budget"
+            tool: Tool name; NAME_<TOOL> overrides NAME when set
+
+        Returns:
+            The override when present, otherwise the field value
+        """
+        if tool:
+            raw = self.environ.get(f"{name.upper()}_{tool.upper()}")
+            if raw:
+                return float(raw)
+        return getattr(self, name)
+
+    def cache_ttl(self, name: str, default_ttl: float) -> float:
+        """TTL for a named cache: CACHE_TTL_<NAME>, then CACHE_TTL_SECONDS, then default_ttl."""
+        raw = self.environ.get(f"CACHE_TTL_{name.upper()}")
+        if raw:
+            return float(raw)
+        return self.cache_ttl_seconds if self.cache_ttl_seconds is not None else default_ttl
+
+
+def _parse(raw: str, field_type: str, name: str):
+    """Convert an environment string to the field's annotated type."""
+    field_type = str(field_type)
+    try:
+        if "bool" in field_type:
+            return raw.strip().lower() in _TRUE
+        if "int" in field_type:
+            return int(float(raw))
+        if "float" in field_type:
+            return float(raw)
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: {raw!r}") from None
+    return raw
+
+
+_settings: Optional[Settings] = None
+_lock = threading.Lock()
+
+
+def load_settings(env_file: Optional[str] = None) -> Settings:
+    """
+    Read .env files into the environment and (re)build the settings.
+
+    The nearest .env is loaded without overriding existing variables, then
+    env_file, when given, overrides them.
+
+    Args:
+        env_file: Optional extra .env file, e.g. the agent's own
+
+    Returns:
+        The new process-wide settings
+    """
+    global _settings
+    from dotenv import load_dotenv
+
+    with _lock:
+        load_dotenv()
+        if env_file and os.path.exists(env_file):
+            load_dotenv(dotenv_path=env_file, override=True)
+        _settings = Settings.from_env()
+        return _settings
+
+
+def get_settings() -> Settings:
+    """Get the process-wide settings, loading them on first use."""
+    settings = _settings
+    if settings is not None:
+        return settings
+    return load_settings()
+
+
+def reset_settings() -> None:
+    """Forget the loaded settings so the next get_settings() re-reads the environment."""
+    global _settings
+    with _lock:
+        _settings = None
@@ -0,0 +1,455 @@
+"""Catalog and stock tables in a memory-mapped columnar file shared by every worker process."""
+import functools
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .repository import InventoryRepository, get_repository
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"INVSNAP1"
+FORMAT_VERSION = 1
+
+# Pointer file naming the current snapshot, and the lock held by the one process that refreshes it
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = "refresh.lock"
+
+NULL_CODE = 0xFFFFFFFF
+STRING_CACHE_SIZE = 4096
+
+# array typecodes per column type; snapshots are read on the host that wrote them (native byte order)
+TYPECODES = {"str": "I", "int": "q", "bool": "q", "float": "d"}
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _column_type(values: List[Any]) -> str:
+    kinds = {type(value) for value in values if value is not None}
+    if kinds and kinds <= {bool}:
+        return "bool"
+    if kinds and kinds <= {int, bool}:
+        return "int"
+    if kinds and kinds <= {int, float, bool}:
+        return "float"
+    return "str"
+
+
+def encode_snapshot(tables: Dict[str, List[Dict[str, Any]]]) -> Tuple[str, List[bytes]]:
+    """
+    Lay tables out in the snapshot format.
+
+    Each column is stored as one fixed-width array: string columns hold
+    codes into a string pool shared by all tables, so a store name or color
+    repeated on every stock row is stored once. Numeric columns with nulls
+    get a one-byte-per-row null mask.
+
+    Args:
+        tables: Rows per table, in the LocalRepository snapshot format
+
+    Returns:
+        Tuple of (version, file contents as chunks); the version is a hash
+        of the data, so unchanged data gives the same version
+    """
+    strings: Dict[str, int] = {}
+    sections: List[bytes] = []
+    size = 0
+
+    def add(data: bytes) -> int:
+        nonlocal size
+        offset = size
+        padded = data + b"\0" * (_align(len(data)) - len(data))
+        sections.append(padded)
+        size += len(padded)
+        return offset
+
+    def intern(value: Any) -> int:
+        value = value if isinstance(value, str) else str(value)
+        code = strings.get(value)
+        if code is None:
+            code = strings[value] = len(strings)
+        return code
+
+    manifest_tables: Dict[str, Any] = {}
+    for table, rows in tables.items():
+        names: List[str] = []
+        for row in rows:
+            names.extend(name for name in row if name not in names)
+        columns = {}
+        for name in names:
+            values = [row.get(name) for row in rows]
+            kind = _column_type(values)
+            if kind == "str":
+                data = array("I", [NULL_CODE if value is None else intern(value) for value in values])
+            else:
+                data = array(TYPECODES[kind], [0 if value is None else value for value in values])
+            column = {"type": kind, "offset": add(data.tobytes())}
+            if kind != "str" and None in values:
+                column["nulls"] = add(bytes(value is None for value in values))
+            columns[name] = column
+        manifest_tables[table] = {"rows": len(rows), "columns": columns}
+
+    encoded = [value.encode("utf-8") for value in strings]
+    string_offsets = array("Q", [0])
+    for value in encoded:
+        string_offsets.append(string_offsets[-1] + len(value))
+    pool = {"count": len(encoded), "offsets": add(string_offsets.tobytes()), "data": add(b"".join(encoded))}
+
+    digest = hashlib.sha1()
+    for section in sections:
+        digest.update(section)
+    digest.update(json.dumps(manifest_tables, sort_keys=True).encode("utf-8"))
+    version = f"v{FORMAT_VERSION}-{digest.hexdigest()[:12]}"
+
+    manifest = json.dumps({
+        "version": version,
+        "created_at": time.time(),
+        "strings": pool,
+        "tables": manifest_tables,
+    }).encode("utf-8")
+    header = MAGIC + struct.pack("<Q", len(manifest)) + manifest
+    header += b"\0" * (_align(len(header)) - len(header))
+    return version, [header] + sections
+
+
+class MappedColumn(Sequence):
+    """One column of a MappedSnapshot table, read from the mapped file on access."""
+
+    def __init__(self, snapshot: "MappedSnapshot", kind: str, data: memoryview, nulls: Optional[memoryview]):
+        self._snapshot = snapshot
+        self._kind = kind
+        self._data = data
+        self._nulls = nulls
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = self._data[index]
+        if self._kind == "str":
+            return None if value == NULL_CODE else self._snapshot.string(value)
+        if self._nulls is not None and self._nulls[index]:
+            return None
+        return bool(value) if self._kind == "bool" else value
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class MappedRow(Mapping):
+    """
+    A row view supporting row["column"] and row.column, like Record.
+
+    Values are read from the mapped file when accessed, so holding many rows
+    costs no per-row copy of the data.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "MappedTable", index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, name: str) -> Any:
+        return self._table.column(name)[self._index]
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._table.column(name)[self._index]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table.names)
+
+    def __len__(self) -> int:
+        return len(self._table.names)
+
+    def __repr__(self) -> str:
+        return f"MappedRow({dict(self)!r})"
+
+
+class MappedTable:
+    """One table of a MappedSnapshot."""
+
+    def __init__(self, name: str, rows: int, columns: Dict[str, MappedColumn]):
+        self.name = name
+        self.rows = rows
+        self._columns = columns
+        self.names = list(columns)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> MappedColumn:
+        return self._columns[name]
+
+    def row_views(self) -> List[MappedRow]:
+        """Every row as a MappedRow."""
+        return [MappedRow(self, i) for i in range(self.rows)]
+
+
+class MappedSnapshot:
+    """
+    A snapshot file opened read-only with mmap.
+
+    Every process mapping the same file shares its pages through the OS page
+    cache, so workers added to a host do not each hold a copy of the data.
+    Decoded strings are cached per process up to STRING_CACHE_SIZE.
+
+    The same tables are published as a SQLite database at database_path,
+    which the inventory mirror opens read-only instead of copying them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.database_path = _database_path(path)
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        (length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        manifest = json.loads(bytes(view[start:start + length]))
+        base = _align(start + length)
+
+        self.version: str = manifest["version"]
+        self.created_at: float = manifest["created_at"]
+
+        pool = manifest["strings"]
+        self._string_offsets = view[base + pool["offsets"]:base + pool["offsets"] + 8 * (pool["count"] + 1)].cast("Q")
+        self._string_data = view[base + pool["data"]:base + pool["data"] + self._string_offsets[-1]]
+        self.string = functools.lru_cache(maxsize=STRING_CACHE_SIZE)(self._decode)
+
+        self.tables: Dict[str, MappedTable] = {}
+        for name, spec in manifest["tables"].items():
+            rows = spec["rows"]
+            columns = {}
+            for column, info in spec["columns"].items():
+                typecode = TYPECODES[info["type"]]
+                width = array(typecode).itemsize
+                data = view[base + info["offset"]:base + info["offset"] + width * rows].cast(typecode)
+                nulls = None
+                if "nulls" in info:
+                    nulls = view[base + info["nulls"]:base + info["nulls"] + rows]
+                columns[column] = MappedColumn(self, info["type"], data, nulls)
+            self.tables[name] = MappedTable(name, rows, columns)
+
+    def _decode(self, code: int) -> str:
+        return bytes(self._string_data[self._string_offsets[code]:self._string_offsets[code + 1]]).decode("utf-8")
+
+    def table(self, name: str) -> MappedTable:
+        return self.tables[name]
+
+
+def _database_path(path: str) -> str:
+    """The SQLite database published alongside the snapshot file at path."""
+    return os.path.splitext(path)[0] + ".db"
+
+
+def _read_pointer(directory: str) -> Optional[str]:
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def write_snapshot(tables: Dict[str, List[Dict[str, Any]]], directory: str) -> str:
+    """
+    Write tables as a new snapshot and make it the current one.
+
+    The snapshot file and its SQLite database are written under temporary
+    names and renamed, then the CURRENT pointer is replaced the same way,
+    so readers only ever see a complete snapshot. Snapshots other than the
+    new and the previous one are deleted; processes that still have them
+    open keep reading them.
+
+    Args:
+        tables: Rows per table, in the LocalRepository snapshot format
+        directory: SHARED_SNAPSHOT_DIR
+
+    Returns:
+        The version now current
+    """
+    from .local_repository import write_database
+
+    version, chunks = encode_snapshot(tables)
+    filename = f"snapshot-{version}.bin"
+    path = os.path.join(directory, filename)
+    previous = _read_pointer(directory)
+    if previous == filename and os.path.exists(_database_path(path)):
+        return version
+
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+    database_tmp = f"{_database_path(path)}.{os.getpid()}.tmp"
+    if os.path.exists(database_tmp):
+        os.remove(database_tmp)
+    write_database(tables, database_tmp)
+    os.replace(database_tmp, _database_path(path))
+
+    pointer_tmp = os.path.join(directory, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(pointer_tmp, "w", encoding="utf-8") as f:
+        f.write(filename)
+    os.replace(pointer_tmp, os.path.join(directory, CURRENT_FILE))
+
+    keep = {os.path.splitext(name)[0] for name in (filename, previous) if name}
+    for name in os.listdir(directory):
+        stem, extension = os.path.splitext(name)
+        if name.startswith("snapshot-") and extension in (".bin", ".db", ".db-wal", ".db-shm") and stem not in keep:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return version
+
+
+def publish_shared_snapshot(source: Optional[InventoryRepository] = None) -> str:
+    """Copy the stores, products and stock tables from source (the repository by default) into a new snapshot."""
+    from .local_repository import copy_snapshot
+
+    settings = get_settings()
+    started = time.monotonic()
+    version = write_snapshot(copy_snapshot(source or get_repository()), settings.shared_snapshot_dir)
+    logger.info("Published shared snapshot %s in %.1fs", version, time.monotonic() - started)
+    return version
+
+
+_snapshot: Optional[MappedSnapshot] = None
+_pointer: Optional[str] = None
+_checked_at = 0.0
+_lock = threading.Lock()
+_refresher: Optional[threading.Thread] = None
+_lock_file: Any = None
+# When this process last tried to publish; unchanged data keeps the old file and its created_at
+_published_at = 0.0
+
+
+def _hold_refresh_lock(directory: str) -> bool:
+    """
+    Whether this process is the one that refreshes the snapshot.
+
+    The first process to take an exclusive lock on LOCK_FILE keeps it for
+    its lifetime; when it exits, the next process to try takes over.
+    """
+    global _lock_file
+    if _lock_file is not None:
+        return True
+    try:
+        import fcntl
+    except ImportError:
+        # No advisory locks (Windows): every process refreshes, which stays correct, only redundant
+        return True
+    os.makedirs(directory, exist_ok=True)
+    f = open(os.path.join(directory, LOCK_FILE), "a+")
+    try:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return False
+    _lock_file = f
+    return True
+
+
+def holds_refresh_lock() -> bool:
+    """Whether this process publishes the shared snapshot and writes stock changes to its database."""
+    directory = get_settings().shared_snapshot_dir
+    return bool(directory) and _hold_refresh_lock(directory)
+
+
+def _load_current(directory: str) -> None:
+    """Map the snapshot CURRENT points at, if it is not the one already mapped."""
+    global _snapshot, _pointer, _checked_at
+    _checked_at = time.monotonic()
+    pointer = _read_pointer(directory)
+    if pointer is None or pointer == _pointer:
+        return
+    try:
+        snapshot = MappedSnapshot(os.path.join(directory, pointer))
+    except Exception:
+        logger.exception("Could not map shared snapshot %s; keeping %s", pointer, _pointer)
+        return
+    _snapshot, _pointer = snapshot, pointer
+    logger.info("Mapped shared snapshot %s", snapshot.version)
+
+
+def _publish_if_due(directory: str) -> None:
+    """Publish a new snapshot when SHARED_SNAPSHOT_REFRESH_SECONDS have passed since the last one or the last attempt."""
+    global _published_at
+    settings = get_settings()
+    if not _hold_refresh_lock(directory):
+        return
+    _load_current(directory)
+    last = max(_snapshot.created_at if _snapshot is not None else 0.0, _published_at)
+    if time.time() - last >= settings.shared_snapshot_refresh_seconds:
+        # Recorded before publishing, so a failing source is retried once per interval too
+        _published_at = time.time()
+        publish_shared_snapshot()
+        _load_current(directory)
+
+
+def _refresh_loop(directory: str) -> None:
+    while True:
+        try:
+            _publish_if_due(directory)
+        except Exception:
+            logger.exception("Shared snapshot refresh failed; workers keep the current one")
+        time.sleep(get_settings().shared_snapshot_check_seconds)
+
+
+def get_shared_snapshot() -> Optional[MappedSnapshot]:
+    """
+    Get the current shared snapshot, mapping a newer one when it has been published.
+
+    The first call starts a daemon thread that, in the process holding the
+    refresh lock, publishes the first snapshot and then a new one every
+    SHARED_SNAPSHOT_REFRESH_SECONDS, so tool calls never wait on a copy;
+    every process checks the CURRENT pointer at most every
+    SHARED_SNAPSHOT_CHECK_SECONDS and swaps to the new snapshot, so all
+    workers converge on the same version.
+
+    Returns:
+        The snapshot, or None when SHARED_SNAPSHOT_DIR is unset or none has
+        been published yet
+    """
+    global _refresher
+    settings = get_settings()
+    directory = settings.shared_snapshot_dir
+    if not directory:
+        return None
+
+    if _refresher is None:
+        with _lock:
+            if _refresher is None:
+                _refresher = threading.Thread(
+                    target=_refresh_loop, args=(directory,), name="shared-snapshot-refresh", daemon=True
+                )
+                _refresher.start()
+
+    if _snapshot is None or time.monotonic() - _checked_at >= settings.shared_snapshot_check_seconds:
+        with _lock:
+            _load_current(directory)
+    return _snapshot
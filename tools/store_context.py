@@ -0,0 +1,65 @@
+"""Which store "our store" means for the current session."""
+import contextlib
+import contextvars
+from typing import Any, Iterator, Mapping, Optional
+
+from .cache import ttl_cache
+from .repository import get_repository
+from .settings import get_settings
+
+# Session state key holding the session's store ID
+STORE_STATE_KEY = "store_id"
+
+_current_store: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_store", default=None)
+
+
+def current_store_id() -> str:
+    """The store bound to the running tool call, or STORE_ID when none is."""
+    return _current_store.get() or get_settings().store_id
+
+
+def session_store_id(state: Optional[Mapping[str, Any]]) -> str:
+    """The store ID in a session's state, or STORE_ID when it has none."""
+    store_id = state.get(STORE_STATE_KEY) if state is not None else None
+    return str(store_id).strip() if store_id else get_settings().store_id
+
+
+def bind_store(store_id: Optional[str]) -> contextvars.Token:
+    """
+    Make store_id "our store" for the rest of the current context.
+
+    Args:
+        store_id: Store ID; None goes back to STORE_ID
+
+    Returns:
+        Token for resetting the binding
+    """
+    return _current_store.set(store_id)
+
+
+@contextlib.contextmanager
+def store_scope(store_id: Optional[str]) -> Iterator[None]:
+    """Bind store_id for the duration of a with block, e.g. in scripts and benchmarks."""
+    token = bind_store(store_id)
+    try:
+        yield
+    finally:
+        _current_store.reset(token)
+
+
+def bind_session_store(tool: Any, args: Mapping[str, Any], tool_context: Any) -> None:
+    """
+    ADK before_tool_callback binding the session's store for the tool call.
+
+    ADK runs the callback and then the tool in the same context, and
+    async_tools.make_async carries it into the worker thread.
+    """
+    bind_store(session_store_id(tool_context.state))
+    return None
+
+
+# Cache name kept from get_our_store_info so CACHE_TTL_GET_OUR_STORE_INFO still applies
+@ttl_cache("get_our_store_info")
+def store_details(store_id: str) -> Optional[Any]:
+    """Fetch the row for one store, cached because store details rarely change."""
+    return get_repository().get_store(store_id)
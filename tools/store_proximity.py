@@ -0,0 +1,131 @@
+"""Distances between stores, from an offline zip code centroid table, for ranking alternatives."""
+import csv
+import logging
+import math
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cache import ttl_cache
+from .inventory_mirror import inventory_source
+from .repository import Record
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CENTROIDS_PATH = os.path.join(os.path.dirname(__file__), "data", "zip_centroids.csv")
+
+EARTH_RADIUS_MILES = 3958.8
+
+Coordinates = Tuple[float, float]
+
+
+def haversine_miles(a: Coordinates, b: Coordinates) -> float:
+    """Great-circle distance in miles between two (latitude, longitude) points."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * math.asin(math.sqrt(h))
+
+
+def load_zip_centroids(path: Optional[str] = None) -> Dict[str, Coordinates]:
+    """
+    Read a zip,latitude,longitude CSV.
+
+    Rows may hold a 5-digit zip code or a 3-digit prefix; prefixes are the
+    fallback for zip codes missing from the table.
+
+    Args:
+        path: CSV file; defaults to ZIP_CENTROIDS_PATH or the bundled table
+
+    Returns:
+        Dict mapping zip code (or prefix) to (latitude, longitude)
+    """
+    path = path or get_settings().zip_centroids_path or DEFAULT_CENTROIDS_PATH
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row["zip"].strip(): (float(row["latitude"]), float(row["longitude"])) for row in csv.DictReader(f)}
+
+
+def locate(zip_code: Any, centroids: Dict[str, Coordinates]) -> Optional[Coordinates]:
+    """Centroid of a zip code (ZIP+4 allowed), falling back to its 3-digit prefix."""
+    if not zip_code:
+        return None
+    digits = str(zip_code).strip()[:5].zfill(5)
+    return centroids.get(digits) or centroids.get(digits[:3])
+
+
+class StoreProximity:
+    """
+    Precomputed distance matrix between stores.
+
+    Built once per store list; ranking alternatives is then a dictionary
+    lookup per candidate, with no queries.
+    """
+
+    def __init__(self, stores: Iterable[Any], centroids: Dict[str, Coordinates]):
+        locations = {}
+        for store in stores:
+            coordinates = locate(store.zip_code, centroids)
+            if coordinates is None:
+                logger.warning("No centroid for store %s (zip %s)", store.store_id, store.zip_code)
+                continue
+            locations[store.store_id] = coordinates
+
+        self.distances: Dict[str, Dict[str, float]] = {
+            origin: {
+                store_id: haversine_miles(origin_coordinates, coordinates)
+                for store_id, coordinates in locations.items()
+            }
+            for origin, origin_coordinates in locations.items()
+        }
+
+    def distance(self, origin: str, store_id: str) -> Optional[float]:
+        """Miles between two stores, or None when either could not be located."""
+        return self.distances.get(origin, {}).get(store_id)
+
+    def rank(self, origin: str, rows: Iterable[Any]) -> List[Record]:
+        """
+        Order store rows nearest first.
+
+        Args:
+            origin: Store the distances are measured from
+            rows: Rows with store_id and store_name
+
+        Returns:
+            Records with a distance_miles column (None when unknown, sorted
+            last), ties broken by store name
+        """
+        ranked = [Record(row, distance_miles=self.distance(origin, row.store_id)) for row in rows]
+        ranked.sort(key=lambda row: (row.distance_miles is None, row.distance_miles or 0.0, row.store_name))
+        return ranked
+
+
+@ttl_cache("store_proximity")
+def get_store_proximity() -> StoreProximity:
+    """Distance matrix for the current store list, rebuilt when the cache expires."""
+    repository, _ = inventory_source()
+    return StoreProximity(repository.list_stores(), load_zip_centroids())
+
+
+def nearest_stores(origin: str, rows: Iterable[Any], limit: Optional[int] = None) -> List[Record]:
+    """
+    Rank other-store rows by distance from origin and keep the nearest.
+
+    Falls back to store name order when STORE_PROXIMITY is off or the
+    distances cannot be built.
+
+    Args:
+        origin: Our store ID
+        rows: One row per candidate store
+        limit: How many to keep; defaults to OTHER_STORES_LIMIT
+
+    Returns:
+        Records with a distance_miles column
+    """
+    settings = get_settings()
+    limit = settings.other_stores_limit if limit is None else limit
+    if settings.store_proximity:
+        try:
+            return get_store_proximity().rank(origin, rows)[:limit]
+        except Exception:
+            logger.warning("Store distances unavailable; ordering alternatives by name", exc_info=True)
+    ranked = sorted((Record(row, distance_miles=None) for row in rows), key=lambda row: row.store_name)
+    return ranked[:limit]
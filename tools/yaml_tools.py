@@ -0,0 +1,140 @@
+"""Build Python tools from the bigquery-sql definitions in tools.yaml."""
+import inspect
+import logging
+import os
+import re
+import textwrap
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .coalesce import coalesced
+from .instrumentation import instrumented
+from .output import compact_mode, render_compact
+from .repository import get_repository
+from .settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOOLS_YAML = os.path.join(os.path.dirname(os.path.dirname(__file__)), "tools.yaml")
+
+# tools.yaml parameter type -> (Python annotation, BigQuery parameter type)
+PARAMETER_TYPES = {
+    "string": (str, "STRING"),
+    "integer": (int, "INT64"),
+    "float": (float, "FLOAT64"),
+    "boolean": (bool, "BOOL"),
+}
+
+_TABLE_REF = re.compile(r"`[\w-]+\.\w+\.([\w.]+)`")
+
+
+def compile_statement(statement: str, project_id: str, dataset: str) -> str:
+    """
+    Normalize a statement once so every call sends byte-identical SQL.
+
+    Tables are re-pointed at the configured project and dataset, indentation
+    is removed and trailing whitespace stripped; parameter values are always
+    bound separately, so the text only varies by tool.
+    """
+    statement = _TABLE_REF.sub(lambda match: f"`{project_id}.{dataset}.{match.group(1)}`", statement)
+    lines = [line.rstrip() for line in textwrap.dedent(statement).strip().splitlines()]
+    return "\n".join(lines)
+
+
+def _docstring(description: str, parameters: List[Dict[str, Any]]) -> str:
+    """Google-style docstring so ADK describes the tool and its arguments."""
+    doc = description.strip()
+    if parameters:
+        doc += "\n\nArgs:\n" + "\n".join(
+            f"    {param['name']}: {param.get('description', '').strip()}" for param in parameters
+        )
+    return doc + "\n\nReturns:\n    String with the matching rows"
+
+
+def _format_rows(title: str, rows: List[Any]) -> str:
+    if compact_mode():
+        columns = list(rows[0].keys()) if rows else []
+        return render_compact(title, rows, columns)
+    if not rows:
+        return f"{title}: no rows found"
+    lines = [", ".join(f"{key}: {value}" for key, value in row.items()) for row in rows]
+    return f"{title}:\n" + "\n".join(f"• {line}" for line in lines)
+
+
+def build_tool(name: str, spec: Dict[str, Any], project_id: str, dataset: str) -> Callable[..., str]:
+    """
+    Compile one bigquery-sql definition into a tool function.
+
+    Args:
+        name: Tool name from tools.yaml
+        spec: Its definition (statement, description, parameters)
+        project_id: Project the statement's tables are pointed at
+        dataset: Dataset the statement's tables are pointed at
+
+    Returns:
+        Instrumented, coalesced function with a typed signature
+    """
+    statement = compile_statement(spec["statement"], project_id, dataset)
+    parameters = spec.get("parameters") or []
+    for param in parameters:
+        if param.get("type", "string") not in PARAMETER_TYPES:
+            raise ValueError(f"Tool '{name}': unsupported parameter type '{param.get('type')}'")
+    title = spec.get("description", name).strip().split(". ")[0].rstrip(".")
+
+    signature = inspect.Signature(
+        [
+            inspect.Parameter(
+                param["name"],
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+                annotation=PARAMETER_TYPES[param.get("type", "string")][0],
+            )
+            for param in parameters
+        ],
+        return_annotation=str,
+    )
+
+    def tool(*args, **kwargs) -> str:
+        try:
+            arguments = signature.bind(*args, **kwargs).arguments
+            bound = [
+                (param["name"], PARAMETER_TYPES[param.get("type", "string")][1], arguments[param["name"]])
+                for param in parameters
+            ]
+            return _format_rows(title, get_repository().run_statement(statement, bound))
+        except Exception as e:
+            return f"Error running {name}: {str(e)}"
+
+    tool.__name__ = tool.__qualname__ = name
+    tool.__doc__ = _docstring(spec.get("description", ""), parameters)
+    tool.__signature__ = signature
+    tool.statement = statement
+    return instrumented(coalesced(tool))
+
+
+def load_yaml_tools(path: Optional[str] = None, exclude: Iterable[str] = ()) -> List[Callable[..., str]]:
+    """
+    Compile every bigquery-sql tool in tools.yaml.
+
+    Args:
+        path: YAML file; defaults to TOOLS_YAML_PATH or the repository's tools.yaml
+        exclude: Tool names to skip, e.g. those already implemented in Python
+
+    Returns:
+        Tool functions in file order
+    """
+    import yaml
+
+    settings = get_settings()
+    path = path or settings.tools_yaml_path or DEFAULT_TOOLS_YAML
+    with open(path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    exclude = set(exclude)
+    tools = []
+    for name, spec in (config.get("tools") or {}).items():
+        if name in exclude:
+            continue
+        if spec.get("kind") != "bigquery-sql":
+            logger.warning("Skipping tool '%s' of unsupported kind '%s'", name, spec.get("kind"))
+            continue
+        tools.append(build_tool(name, spec, settings.bigquery_project, settings.bigquery_dataset))
+    return tools